@@ -7,8 +7,11 @@ from station.models import (
     Train,
     Crew,
     Journey,
+    JourneyInventory,
     Order,
-    Ticket
+    OrderSummary,
+    Ticket,
+    SeatHold,
 )
 
 admin.site.register(Station)
@@ -17,5 +20,8 @@ admin.site.register(TrainType)
 admin.site.register(Train)
 admin.site.register(Crew)
 admin.site.register(Journey)
+admin.site.register(JourneyInventory)
 admin.site.register(Order)
+admin.site.register(OrderSummary)
 admin.site.register(Ticket)
+admin.site.register(SeatHold)
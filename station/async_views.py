@@ -0,0 +1,199 @@
+import asyncio
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import aprefetch_related_objects
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from station.models import Journey
+from station.seat_events import broker
+from station.seat_map import aget_seat_map
+from station.serializers import JourneySeatMapSerializer
+from station.views import JourneyViewSet, StationViewSet
+
+
+def _json_response(data, status=200) -> HttpResponse:
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status,
+        content_type="application/json",
+    )
+
+
+def _error_response(viewset, request, exc) -> HttpResponse:
+    """Same body, status and headers as DRF's exception handling"""
+    status = exc.status_code
+    headers = {}
+    if isinstance(
+        exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+    ):
+        auth_header = viewset.get_authenticate_header(request)
+        if auth_header:
+            headers["WWW-Authenticate"] = auth_header
+        else:
+            status = 403
+    if getattr(exc, "wait", None):
+        headers["Retry-After"] = str(int(exc.wait))
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {"detail": exc.detail}
+    response = _json_response(data, status=status)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def async_read_action(viewset_class, action):
+    """Turn a coroutine into an async GET view of a viewset action.
+
+    The viewset supplies authentication, permissions, throttling,
+    filtering and serializers, so responses and access rules match the
+    sync endpoints; the coroutine reads through the async ORM and
+    returns data to render as JSON, or a response of its own.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            viewset = viewset_class(
+                action=action, args=args, kwargs=kwargs, format_kwarg=None
+            )
+            drf_request = Request(
+                request,
+                parsers=viewset.get_parsers(),
+                authenticators=viewset.get_authenticators(),
+                negotiator=viewset.get_content_negotiator(),
+                parser_context=viewset.get_parser_context(request),
+            )
+            # Responses are always rendered as JSON
+            drf_request.accepted_renderer = JSONRenderer()
+            drf_request.accepted_media_type = JSONRenderer.media_type
+            viewset.request = drf_request
+            try:
+                if request.method not in ("GET", "HEAD"):
+                    raise exceptions.MethodNotAllowed(request.method)
+                await sync_to_async(viewset.perform_authentication)(
+                    drf_request
+                )
+                viewset.check_permissions(drf_request)
+                await sync_to_async(viewset.check_throttles)(drf_request)
+                try:
+                    data = await handler(viewset, drf_request, **kwargs)
+                except Http404 as exc:
+                    raise exceptions.NotFound(*exc.args)
+            except exceptions.APIException as exc:
+                return _error_response(viewset, drf_request, exc)
+            if isinstance(data, HttpResponseBase):
+                return data
+            return _json_response(data)
+
+        return view
+
+    return decorator
+
+
+@async_read_action(JourneyViewSet, "list")
+async def journey_list(viewset, request):
+    queryset = viewset.filter_queryset(
+        await sync_to_async(viewset.get_queryset)()
+    )
+    paginator = viewset.paginator
+    journeys = paginator.build_page(
+        [
+            journey
+            async for journey in paginator.get_page_queryset(
+                queryset, request
+            )
+        ]
+    )
+    serializer = viewset.get_serializer(journeys, many=True)
+    return {"next": paginator.get_next_link(), "results": serializer.data}
+
+
+@async_read_action(JourneyViewSet, "retrieve")
+async def journey_detail(viewset, request, pk):
+    queryset = await sync_to_async(viewset.get_queryset)()
+    try:
+        journey = await queryset.aget(pk=pk)
+    except Journey.DoesNotExist:
+        raise Http404("No Journey matches the given query.")
+
+    context = viewset.get_serializer_context()
+    if viewset.get_serializer_class() is JourneySeatMapSerializer:
+        await aprefetch_related_objects([journey], "crew")
+        context["seat_map"] = await aget_seat_map(journey)
+    else:
+        await aprefetch_related_objects([journey], "crew", "tickets")
+    return viewset.get_serializer(journey, context=context).data
+
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _release_connection() -> None:
+    # The request's thread, and its connection, last as long as the stream
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+async def _seat_events(journey):
+    # Subscribing before the snapshot is read means no change falls in
+    # between; one that is already in the snapshot is simply reapplied
+    subscription = broker.subscribe(journey.id)
+    try:
+        await broker.ready()
+        reconnect = int(settings.SEAT_EVENTS_RECONNECT * 1000)
+        yield f"retry: {reconnect}\n\n"
+        yield _event("snapshot", await broker.snapshot(journey))
+        await sync_to_async(_release_connection)()
+        while True:
+            try:
+                change = await asyncio.wait_for(
+                    subscription.get(), settings.SEAT_EVENTS_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if change is None:
+                return
+            yield _event("update", change)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@async_read_action(JourneyViewSet, "retrieve")
+async def journey_seat_events(viewset, request, pk):
+    """Stream the seat map of a journey, then each seat taken or released"""
+    try:
+        journey = await Journey.objects.select_related("train").aget(pk=pk)
+    except Journey.DoesNotExist:
+        raise Http404("No Journey matches the given query.")
+
+    events = _seat_events(journey) if request.method == "GET" else ()
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@async_read_action(StationViewSet, "list")
+async def station_list(viewset, request):
+    headers, response = await sync_to_async(viewset.versioned_list)(request)
+    if response is not None:
+        return response
+    stations = [station async for station in viewset.get_queryset()]
+    response = _json_response(
+        viewset.get_serializer(stations, many=True).data
+    )
+    return await sync_to_async(viewset.cache_versioned_list)(
+        request, headers, response
+    )
@@ -0,0 +1,436 @@
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Optional
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.distances import haversine_km
+from station.geo import encode_geohash
+from station.inventory import rebuild_inventory
+from station.models import (
+    Crew,
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.order_history import rebuild_order_history
+from station.planner import invalidate_timetable
+from station.search import invalidate_station_index
+from station.seat_map import invalidate_seat_maps
+from station.versions import bump_versions
+
+CITIES = [
+    ("Kyiv", 50.4501, 30.5234),
+    ("Kharkiv", 49.9935, 36.2304),
+    ("Odesa", 46.4825, 30.7233),
+    ("Dnipro", 48.4647, 35.0462),
+    ("Lviv", 49.8397, 24.0297),
+    ("Zaporizhzhia", 47.8388, 35.1396),
+    ("Vinnytsia", 49.2331, 28.4682),
+    ("Poltava", 49.5883, 34.5514),
+    ("Chernihiv", 51.4982, 31.2893),
+    ("Ivano-Frankivsk", 48.9226, 24.7111),
+    ("Uzhhorod", 48.6208, 22.2879),
+    ("Ternopil", 49.5535, 25.5948),
+    ("Zhytomyr", 50.2547, 28.6587),
+    ("Rivne", 50.6199, 26.2516),
+    ("Lutsk", 50.7472, 25.3254),
+    ("Sumy", 50.9077, 34.7981),
+    ("Cherkasy", 49.4444, 32.0598),
+    ("Mykolaiv", 46.9750, 31.9946),
+    ("Khmelnytskyi", 49.4230, 26.9871),
+    ("Chernivtsi", 48.2921, 25.9358),
+]
+TRAIN_TYPES = ["Intercity+", "Intercity", "Regional", "Night express"]
+FIRST_NAMES = ["Olena", "Taras", "Iryna", "Andrii", "Oksana", "Petro",
+               "Mariia", "Dmytro", "Sofiia", "Bohdan"]
+LAST_NAMES = ["Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko",
+              "Kravchenko", "Melnyk", "Boiko", "Lysenko", "Rudenko"]
+# Departures cluster around the morning and evening peaks
+DEPARTURE_HOUR_WEIGHTS = [1, 1, 1, 1, 2, 4, 8, 10, 9, 6, 4, 4,
+                          4, 4, 5, 6, 8, 10, 9, 7, 5, 4, 3, 2]
+ORDER_SIZES = [1, 2, 3, 4]
+ORDER_SIZE_WEIGHTS = [60, 25, 10, 5]
+BENCHMARK_EMAIL = "benchmark-{}@example.com"
+
+
+def zipf_weights(count: int) -> list[float]:
+    """A few very popular items and a long tail of quiet ones"""
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def seed_data(stations: int = 200, routes: int = 1000, trains: int = 150,
+              crews: int = 400, journeys: int = 2000, users: int = 500,
+              days: int = 60, load: float = 0.3,
+              seed: int = 0) -> dict[str, int]:
+    """Generate a timetable with bookings, same seed gives same data.
+
+    Station and route popularity follow a Zipf distribution, departures
+    cluster around rush hours and every journey is booked to a load
+    factor drawn around load. The first user is staff, orders the most
+    and is the one the benchmark scenarios run as.
+    """
+    rng = random.Random(seed)
+    start = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    with transaction.atomic():
+        station_objects = []
+        for number in range(stations):
+            name, latitude, longitude = CITIES[number % len(CITIES)]
+            if number >= len(CITIES):
+                name = f"{name} {number // len(CITIES) + 1}"
+                latitude += rng.gauss(0, 0.3)
+                longitude += rng.gauss(0, 0.3)
+            station_objects.append(Station(
+                name=name,
+                latitude=latitude,
+                longitude=longitude,
+                geohash=encode_geohash(latitude, longitude),
+            ))
+        station_objects = Station.objects.bulk_create(station_objects)
+
+        station_weights = zipf_weights(stations)
+        pairs = {}
+        while len(pairs) < min(routes, stations * (stations - 1)):
+            source, destination = rng.choices(
+                range(stations), station_weights, k=2
+            )
+            if source != destination:
+                pairs[source, destination] = (
+                    station_weights[source] * station_weights[destination]
+                )
+        sources = [station_objects[source] for source, _ in pairs]
+        destinations = [station_objects[target] for _, target in pairs]
+        distances = haversine_km(
+            [station.latitude for station in sources],
+            [station.longitude for station in sources],
+            [station.latitude for station in destinations],
+            [station.longitude for station in destinations],
+        ).tolist()
+        route_objects = Route.objects.bulk_create(
+            Route(source=source, destination=destination, distance=distance)
+            for source, destination, distance
+            in zip(sources, destinations, distances)
+        )
+
+        train_types = TrainType.objects.bulk_create(
+            TrainType(name=name) for name in TRAIN_TYPES
+        )
+        train_objects = Train.objects.bulk_create(
+            Train(
+                name=f"{rng.choice('EHKSU')}{rng.randint(100, 999)}-{number}",
+                cargo_num=rng.randint(4, 12),
+                places_in_cargo=rng.choice([36, 54, 58, 68, 69]),
+                train_type=rng.choice(train_types),
+            )
+            for number in range(trains)
+        )
+        crew_objects = Crew.objects.bulk_create(
+            Crew(first_name=rng.choice(FIRST_NAMES),
+                 last_name=rng.choice(LAST_NAMES))
+            for _ in range(crews)
+        )
+
+        journey_objects = []
+        for route in rng.choices(route_objects, list(pairs.values()),
+                                 k=journeys):
+            departure_time = start + timedelta(
+                days=rng.randrange(days),
+                hours=rng.choices(range(24), DEPARTURE_HOUR_WEIGHTS)[0],
+                minutes=rng.choice([0, 15, 30, 45]),
+            )
+            hours = max(route.distance / rng.uniform(60, 120), 0.5)
+            journey_objects.append(Journey(
+                route=route,
+                train=rng.choice(train_objects),
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=hours),
+            ))
+        journey_objects = Journey.objects.bulk_create(journey_objects)
+        Journey.crew.through.objects.bulk_create(
+            Journey.crew.through(journey=journey, crew=crew)
+            for journey in journey_objects
+            for crew in rng.sample(crew_objects, rng.randint(2, 4))
+        )
+
+        user_model = get_user_model()
+        user_objects = [
+            user_model(email=BENCHMARK_EMAIL.format(number),
+                       is_staff=number == 0)
+            for number in range(users)
+        ]
+        for user in user_objects:
+            user.set_unusable_password()
+        user_objects = user_model.objects.bulk_create(user_objects)
+
+        # Beta distribution with the mean at load
+        beta = 2 * (1 - load) / load
+        user_weights = zipf_weights(users)
+        orders, order_seats = [], []
+        for journey in journey_objects:
+            train = journey.train
+            capacity = train.capacity
+            sold = int(capacity * rng.betavariate(2, beta))
+            seats = rng.sample(range(capacity), sold)
+            while seats:
+                size = rng.choices(ORDER_SIZES, ORDER_SIZE_WEIGHTS)[0]
+                seats, booked = seats[size:], seats[:size]
+                orders.append(Order(
+                    user=rng.choices(user_objects, user_weights)[0],
+                    created_at=journey.departure_time - timedelta(
+                        hours=rng.uniform(1, 24 * 30)
+                    ),
+                ))
+                order_seats.append([
+                    (journey, divmod(seat, train.places_in_cargo))
+                    for seat in booked
+                ])
+        # Keep the booking moments instead of stamping the current time
+        with mock.patch.object(
+            Order._meta.get_field("created_at"), "auto_now_add", False
+        ):
+            orders = Order.objects.bulk_create(orders, batch_size=1000)
+        tickets = Ticket.objects.bulk_create(
+            (
+                Ticket(journey=journey, order=order, cargo=cargo + 1,
+                       seat=seat + 1)
+                for order, seats in zip(orders, order_seats)
+                for journey, (cargo, seat) in seats
+            ),
+            batch_size=1000,
+        )
+
+        rebuild_inventory()
+        rebuild_order_history()
+        bump_versions(Station, Route, TrainType, Train)
+        invalidate_seat_maps(journey.id for journey in journey_objects)
+        transaction.on_commit(invalidate_station_index)
+        transaction.on_commit(invalidate_timetable)
+
+    return {
+        "stations": len(station_objects),
+        "routes": len(route_objects),
+        "trains": len(train_objects),
+        "crews": len(crew_objects),
+        "journeys": len(journey_objects),
+        "users": len(user_objects),
+        "orders": len(orders),
+        "tickets": len(tickets),
+    }
+
+
+@dataclass
+class BenchmarkRequest:
+    method: str
+    path: str
+    data: Optional[dict] = None
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    rows_scanned: Optional[int] = None
+
+    def percentile(self, value: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * value / 100))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "queries": max(self.queries, default=0),
+            "rows_scanned": self.rows_scanned,
+        }
+
+
+class BenchmarkData:
+    """Ids and names the scenarios draw their requests from"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.user = get_user_model().objects.get(
+            email=BENCHMARK_EMAIL.format(0)
+        )
+        now = timezone.now()
+        self.journeys = list(
+            Journey.objects.filter(departure_time__gte=now)
+            .order_by("id")
+            .values_list("id", "route__source__name", "departure_time")
+        )
+        if not self.journeys:
+            raise ValueError("No upcoming journeys, run seed_data first")
+
+    def journey_search(self) -> BenchmarkRequest:
+        _, source_name, departure_time = self.rng.choice(self.journeys)
+        date = timezone.localtime(departure_time).date().isoformat()
+        query = urlencode({"source_name": source_name, "date": date})
+        return BenchmarkRequest(
+            "GET", f"{reverse('station:journey-list')}?{query}"
+        )
+
+    def journey_detail(self) -> BenchmarkRequest:
+        journey_id = self.rng.choice(self.journeys)[0]
+        return BenchmarkRequest(
+            "GET", reverse("station:journey-detail", args=[journey_id])
+        )
+
+    def order_create(self) -> BenchmarkRequest:
+        while True:
+            journey = Journey.objects.select_related("train").get(
+                id=self.rng.choice(self.journeys)[0]
+            )
+            train = journey.train
+            taken = set(
+                journey.tickets.values_list("cargo", "seat")
+            ) | set(journey.seat_holds.values_list("cargo", "seat"))
+            free = [
+                (cargo, seat)
+                for cargo in range(1, train.cargo_num + 1)
+                for seat in range(1, train.places_in_cargo + 1)
+                if (cargo, seat) not in taken
+            ]
+            if free:
+                break
+        cargo, seat = self.rng.choice(free)
+        return BenchmarkRequest(
+            "POST",
+            reverse("station:order-list"),
+            {"tickets": [{"journey": journey.id, "cargo": cargo,
+                          "seat": seat}]},
+        )
+
+    def order_list(self) -> BenchmarkRequest:
+        return BenchmarkRequest(
+            "GET", f"{reverse('station:order-list')}?page_size=10"
+        )
+
+
+SCENARIOS: dict[str, Callable[[BenchmarkData], BenchmarkRequest]] = {
+    "journey_search": BenchmarkData.journey_search,
+    "journey_detail": BenchmarkData.journey_detail,
+    "order_create": BenchmarkData.order_create,
+    "order_list": BenchmarkData.order_list,
+}
+
+
+def count_rows_scanned(queries: list[dict]) -> Optional[int]:
+    """Rows read by the scan nodes of the queries, PostgreSQL only"""
+    if connection.vendor != "postgresql":
+        return None
+    scanned = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query["sql"].lstrip().upper().startswith("SELECT"):
+                continue
+            cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query['sql']}")
+            (plan,), = cursor.fetchone()
+            nodes = [plan["Plan"]]
+            while nodes:
+                node = nodes.pop()
+                nodes.extend(node.get("Plans", []))
+                if node["Node Type"].endswith("Scan"):
+                    scanned += node["Actual Loops"] * (
+                        node["Actual Rows"]
+                        + node.get("Rows Removed by Filter", 0)
+                    )
+    return scanned
+
+
+def run_benchmarks(scenarios: list[str], requests: int = 50,
+                   warmup: int = 5, seed: int = 0) -> dict[str, dict]:
+    """Drive the scenarios through the URL routes, return their summaries.
+
+    Requests go through the full middleware and view stack with the
+    Django test client, throttling disabled. Orders the run creates are
+    deleted afterwards.
+    """
+    data = BenchmarkData(random.Random(seed))
+    client = Client(
+        headers={"Authorization": f"Bearer {AccessToken.for_user(data.user)}"}
+    )
+    results = {}
+    created_orders = []
+    # Views copy the throttle classes from the settings when defined
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+    ), mock.patch.object(APIView, "throttle_classes", []):
+        try:
+            for name in scenarios:
+                result = ScenarioResult(name)
+                for number in range(warmup + requests):
+                    request = SCENARIOS[name](data)
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = client.generic(
+                            request.method,
+                            request.path,
+                            json.dumps(request.data) if request.data else "",
+                            content_type="application/json",
+                        )
+                        elapsed = time.perf_counter() - started
+                    if response.status_code >= 400:
+                        raise ValueError(
+                            f"{name}: {request.method} {request.path} "
+                            f"returned {response.status_code}"
+                        )
+                    if request.method == "POST":
+                        created_orders.append(response.json()["id"])
+                    if number < warmup:
+                        continue
+                    result.latencies.append(elapsed)
+                    result.queries.append(len(queries))
+                    if result.rows_scanned is None:
+                        result.rows_scanned = count_rows_scanned(
+                            queries.captured_queries
+                        )
+                results[name] = result.summary()
+        finally:
+            Order.objects.filter(id__in=created_orders).delete()
+    return results
+
+
+def find_regressions(results: dict[str, dict], baseline: dict[str, dict],
+                     tolerance: float) -> list[str]:
+    """Describe every metric worse than the baseline beyond tolerance"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "rows_scanned"):
+            if current[metric] is None or previous.get(metric) is None:
+                continue
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {previous[metric]} -> {current[metric]}"
+                )
+        if current["queries"] > previous["queries"]:
+            regressions.append(
+                f"{name}: queries {previous['queries']} -> "
+                f"{current['queries']}"
+            )
+    return regressions
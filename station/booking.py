@@ -0,0 +1,182 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from station.inventory import lock_journeys, record_tickets_sold
+from station.models import Order, SeatHold, Ticket
+from station.order_history import record_order_summaries
+from station.seat_events import publish_seat_changes
+from station.seat_map import invalidate_seat_maps
+
+
+def _seat_key(seat_data) -> tuple[int, int, int]:
+    return seat_data["journey"].id, seat_data["cargo"], seat_data["seat"]
+
+
+def _seat_filter(keys) -> dict:
+    return {
+        "journey_id__in": {journey_id for journey_id, _, _ in keys},
+        "seat__in": {seat for _, _, seat in keys},
+    }
+
+
+def _taken_seats(keys) -> set[tuple[int, int, int]]:
+    """Seats of the given keys that already have a ticket, in one query"""
+    keys = set(keys)
+    return set(
+        Ticket.objects.filter(**_seat_filter(keys))
+        .order_by()
+        .values_list("journey_id", "cargo", "seat")
+    ) & keys
+
+
+def _held_seats(keys, user) -> set[tuple[int, int, int]]:
+    """Seats of the given keys under a live hold of another user"""
+    keys = set(keys)
+    return set(
+        SeatHold.objects.filter(
+            expires_at__gt=timezone.now(), **_seat_filter(keys)
+        )
+        .exclude(user=user)
+        .order_by()
+        .values_list("journey_id", "cargo", "seat")
+    ) & keys
+
+
+def _raise_for_conflicts(keys, taken, field="tickets") -> None:
+    """Raise an error aligned with the request's list of seats"""
+    errors = []
+    seen = set()
+    for journey_id, cargo, seat in keys:
+        key = (journey_id, cargo, seat)
+        if key in taken:
+            errors.append({"seat": [
+                f"Seat {seat} in cargo {cargo} of journey {journey_id} "
+                f"is already taken"
+            ]})
+        elif key in seen:
+            errors.append({"seat": [
+                f"Seat {seat} in cargo {cargo} of journey {journey_id} "
+                f"is requested twice"
+            ]})
+        else:
+            errors.append({})
+        seen.add(key)
+    if any(errors):
+        raise ValidationError({field: errors})
+
+
+def _release_own_holds(keys, user) -> None:
+    keys = set(keys)
+    hold_ids = [
+        pk
+        for pk, *key in SeatHold.objects.filter(
+            user=user, **_seat_filter(keys)
+        ).values_list("pk", "journey_id", "cargo", "seat")
+        if tuple(key) in keys
+    ]
+    if hold_ids:
+        SeatHold.objects.filter(pk__in=hold_ids).delete()
+
+
+def _raise_for_hold_limit(keys, user, now) -> None:
+    """Keep a user to SEAT_HOLD_LIMIT live holds per journey"""
+    requested = Counter(journey_id for journey_id, _, _ in set(keys))
+    held = Counter(dict(
+        SeatHold.objects.filter(
+            user=user, journey_id__in=requested, expires_at__gt=now
+        )
+        .order_by()
+        .values_list("journey_id")
+        .annotate(Count("id"))
+    ))
+    over = sorted(
+        journey_id for journey_id, count in (requested + held).items()
+        if count > settings.SEAT_HOLD_LIMIT
+    )
+    if over:
+        raise ValidationError({"holds": [
+            f"At most {settings.SEAT_HOLD_LIMIT} seats of journey "
+            f"{journey_id} can be held at once"
+            for journey_id in over
+        ]})
+
+
+def hold_seats(user, holds_data) -> list[SeatHold]:
+    """Reserve seats for the user for SEAT_HOLD_TTL seconds.
+
+    Holding a seat the user already holds extends the hold. A user holds
+    at most SEAT_HOLD_LIMIT seats of a journey, so nobody can lock up a
+    journey's inventory.
+    """
+    keys = [_seat_key(hold_data) for hold_data in holds_data]
+    with transaction.atomic():
+        lock_journeys(journey_id for journey_id, _, _ in keys)
+        now = timezone.now()
+        SeatHold.objects.filter(
+            journey_id__in={journey_id for journey_id, _, _ in keys},
+            expires_at__lte=now,
+        ).delete()
+        _raise_for_conflicts(
+            keys,
+            _taken_seats(keys) | _held_seats(keys, user),
+            field="holds",
+        )
+        _release_own_holds(keys, user)
+        _raise_for_hold_limit(keys, user, now)
+        expires_at = now + timedelta(seconds=settings.SEAT_HOLD_TTL)
+        return SeatHold.objects.bulk_create(
+            SeatHold(**{**hold_data, "user": user, "expires_at": expires_at})
+            for hold_data in holds_data
+        )
+
+
+def sweep_expired_holds() -> int:
+    """Delete every expired hold with a single statement"""
+    deleted, _ = SeatHold.objects.filter(
+        expires_at__lte=timezone.now()
+    ).delete()
+    return deleted
+
+
+def create_order_tickets(order: Order, tickets_data) -> list[Ticket]:
+    """Insert all tickets of an order with a single bulk INSERT.
+
+    Seat and cargo bounds are validated by TicketSerializer beforehand;
+    here the seats are checked against tickets already sold and seats
+    held by other users. The buyer's own holds on those seats are
+    converted into the tickets, the order history entry is written and
+    seat event subscribers learn about the seats on commit.
+    """
+    keys = [_seat_key(ticket_data) for ticket_data in tickets_data]
+    lock_journeys(journey_id for journey_id, _, _ in keys)
+    _raise_for_conflicts(
+        keys, _taken_seats(keys) | _held_seats(keys, order.user)
+    )
+
+    tickets = [
+        Ticket(order=order, **ticket_data) for ticket_data in tickets_data
+    ]
+    try:
+        with transaction.atomic():
+            Ticket.objects.bulk_create(tickets)
+    except IntegrityError:
+        # Seats sold outside the journey lock, e.g. through the admin
+        _raise_for_conflicts(keys, _taken_seats(keys))
+        raise
+
+    _release_own_holds(keys, order.user)
+    record_tickets_sold(journey_id for journey_id, _, _ in keys)
+    invalidate_seat_maps(journey_id for journey_id, _, _ in keys)
+    record_order_summaries([order.id])
+    seats = defaultdict(list)
+    for journey_id, cargo, seat in keys:
+        seats[journey_id].append((cargo, seat))
+    for journey_id, taken in seats.items():
+        publish_seat_changes(journey_id, taken=taken)
+    return tickets
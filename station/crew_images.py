@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from station.image_variants import VARIANTS, render_variants, variant_name
+from station.models import Crew
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Spawned workers, forking a threaded server process is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.CREW_IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def submit(fn, *args) -> Future:
+    """Submit to the pool, replacing it if a worker died"""
+    global _executor
+    try:
+        return get_executor().submit(fn, *args)
+    except BrokenProcessPool:
+        _executor.shutdown(wait=False)
+        _executor = None
+        return get_executor().submit(fn, *args)
+
+
+def save_crew_image(serializer) -> Crew:
+    """Store the uploaded original and queue its variants.
+
+    The variants are rendered once the transaction commits, in the
+    process pool or, with CREW_IMAGE_WORKERS = 0, right away. Clearing
+    the image only drops the old variants.
+    """
+    stale = list(serializer.instance.image_variants.values())
+    cleared = not serializer.validated_data.get("image")
+    with transaction.atomic():
+        crew = serializer.save(
+            image_status="" if cleared else Crew.ImageStatus.PROCESSING,
+            image_variants={},
+        )
+        storage = crew.image.storage
+        transaction.on_commit(partial(delete_files, storage, stale))
+        if crew.image:
+            transaction.on_commit(
+                partial(render_crew_image, crew.id, crew.image.name)
+            )
+    return crew
+
+
+def delete_files(storage, names) -> None:
+    for name in names:
+        storage.delete(name)
+
+
+def render_crew_image(crew_id: int, name: str) -> None:
+    try:
+        path = Crew.image.field.storage.path(name)
+        if settings.CREW_IMAGE_WORKERS:
+            future = submit(render_variants, path)
+        else:
+            future = None
+            render_variants(path)
+    except Exception as error:
+        record_variants(crew_id, name, error)
+        return
+    if future is None:
+        record_variants(crew_id, name)
+    else:
+        future.add_done_callback(partial(record_future, crew_id, name))
+
+
+def record_future(crew_id: int, name: str, future: Future) -> None:
+    # Done callbacks run in the executor's thread, outside any request
+    try:
+        record_variants(crew_id, name, future.exception())
+    finally:
+        connection.close()
+
+
+def record_variants(crew_id: int, name: str,
+                    error: Optional[BaseException] = None) -> None:
+    """Mark the variants ready, unless another image replaced this one"""
+    if error is None:
+        status = Crew.ImageStatus.READY
+        variants = {
+            variant: variant_name(name, variant) for variant in VARIANTS
+        }
+    else:
+        logger.error("Rendering variants of %s failed", name,
+                     exc_info=error)
+        status, variants = Crew.ImageStatus.FAILED, {}
+    Crew.objects.filter(id=crew_id, image=name).update(
+        image_status=status, image_variants=variants
+    )
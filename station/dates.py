@@ -0,0 +1,25 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def start_of_day(day) -> datetime:
+    """Midnight of a date in the current time zone"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_moment(value: str, param: str) -> datetime:
+    """Aware datetime from a date or date/time query parameter"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError(
+                {param: "Enter a valid date or date/time."}
+            )
+        return start_of_day(day)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
@@ -0,0 +1,71 @@
+from itertools import islice
+from typing import Iterable, Optional
+
+import numpy as np
+from django.db.models import Q
+
+from station.models import Route
+from station.versions import bump_versions
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distances in kilometers over arrays of coordinates"""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(values, dtype=np.float64))
+        for values in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized Route.calculate_distance, whole kilometers"""
+    return haversine(lat1, lon1, lat2, lon2).astype(np.int64)
+
+
+def recompute_route_distances(
+    station_ids: Optional[Iterable[int]] = None,
+    batch_size: int = 2000,
+    only_changed: bool = True,
+) -> int:
+    """Recompute distances of routes touching the stations (all if None).
+
+    Coordinates are read with one joined query per batch and results are
+    written back with bulk_update, which saves no signals, so the Route
+    version is bumped here. Returns the number of routes written.
+    """
+    routes = Route.objects.order_by()
+    if station_ids is not None:
+        station_ids = list(station_ids)
+        routes = routes.filter(
+            Q(source_id__in=station_ids) | Q(destination_id__in=station_ids)
+        )
+    rows = routes.values_list(
+        "id",
+        "distance",
+        "source__latitude",
+        "source__longitude",
+        "destination__latitude",
+        "destination__longitude",
+    ).iterator(chunk_size=batch_size)
+
+    written = 0
+    while batch := list(islice(rows, batch_size)):
+        coordinates = np.array([row[2:] for row in batch], dtype=np.float64)
+        distances = haversine_km(*coordinates.T).tolist()
+        changed = [
+            Route(id=row[0], distance=distance)
+            for row, distance in zip(batch, distances)
+            if not only_changed or row[1] != distance
+        ]
+        Route.objects.bulk_update(changed, ["distance"], batch_size)
+        written += len(changed)
+    if written:
+        bump_versions(Route)
+    return written
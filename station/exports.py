@@ -0,0 +1,134 @@
+import csv
+import json
+from datetime import datetime
+from itertools import groupby, islice
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from station.models import Ticket
+
+EXPORT_COLUMNS = (
+    "order_id",
+    "created_at",
+    "user",
+    "ticket_id",
+    "journey_id",
+    "cargo",
+    "seat",
+)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Lets ?format=ndjson select the streamed export"""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+class CSVRenderer(BaseRenderer):
+    """Lets ?format=csv select the streamed export"""
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+def iter_ticket_rows(created_after: datetime, created_before: datetime,
+                     chunk_size: int = 2000) -> Iterator[tuple]:
+    """Tickets of orders created in [after, before), one row each.
+
+    Rows come through a server-side cursor in chunks, ordered by order,
+    so memory use does not depend on the size of the export.
+    """
+    return (
+        Ticket.objects.filter(
+            order__created_at__gte=created_after,
+            order__created_at__lt=created_before,
+        )
+        .order_by("order_id", "id")
+        .values_list(
+            "order_id",
+            "order__created_at",
+            "order__user__email",
+            "id",
+            "journey_id",
+            "cargo",
+            "seat",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_orders(rows) -> Iterator[dict]:
+    """One dict per order with its tickets nested"""
+    for (order_id, created_at, user), tickets in groupby(
+        rows, key=lambda row: row[:3]
+    ):
+        yield {
+            "id": order_id,
+            "created_at": created_at.isoformat(),
+            "user": user,
+            "tickets": [
+                {"id": ticket_id, "journey": journey, "cargo": cargo,
+                 "seat": seat}
+                for _, _, _, ticket_id, journey, cargo, seat in tickets
+            ],
+        }
+
+
+def iter_ndjson(rows) -> Iterator[str]:
+    """One JSON line per order"""
+    for order in iter_orders(rows):
+        yield json.dumps(order) + "\n"
+
+
+def iter_json(rows) -> Iterator[str]:
+    """A single JSON array of orders, written an order at a time"""
+    separator = "["
+    for order in iter_orders(rows):
+        yield separator + json.dumps(order)
+        separator = ",\n"
+    yield "[]\n" if separator == "[" else "]\n"
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows) -> Iterator[str]:
+    """Header line and one line per ticket"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for order_id, created_at, *rest in rows:
+        yield writer.writerow([order_id, created_at.isoformat(), *rest])
+
+
+def iter_chunks(lines: Iterator[str], size: int = 500) -> Iterator[str]:
+    """Join lines into larger chunks to cut per-write overhead"""
+    while chunk := "".join(islice(lines, size)):
+        yield chunk
+
+
+async def aiter_chunks(chunks: Iterator[str]) -> AsyncIterator[str]:
+    """Serve a sync iterator to ASGI one chunk at a time.
+
+    Django would otherwise read a sync iterator to the end before
+    sending anything; the rows are still fetched on the thread that
+    owns the database connection.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, NDJSONRenderer.media_type),
+    "csv": (iter_csv, CSVRenderer.media_type),
+    "json": (iter_json, JSONRenderer.media_type),
+}
@@ -0,0 +1,75 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+KM_PER_DEGREE = 111.32
+MAX_PRECISION = 12
+
+
+def encode_geohash(latitude: float, longitude: float,
+                   precision: int = MAX_PRECISION) -> str:
+    """Standard base32 geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            bounds, coordinate = lon_range, longitude
+        else:
+            bounds, coordinate = lat_range, latitude
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(height, width) of a geohash cell in degrees"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covered_radius_km(latitude: float, precision: int) -> float:
+    """Radius around a point guaranteed to lie inside its 3x3 cells"""
+    if precision == 0:
+        return math.inf
+    height, width = cell_size(precision)
+    widest_latitude = min(abs(latitude) + height, 90.0)
+    return KM_PER_DEGREE * min(
+        height, width * math.cos(math.radians(widest_latitude))
+    )
+
+
+def neighbourhood(latitude: float, longitude: float,
+                  precision: int) -> set[str]:
+    """Geohash of the point's cell and its eight neighbours"""
+    height, width = cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        for lon_step in (-1, 0, 1):
+            lat = min(max(latitude + lat_step * height, -90.0), 90.0)
+            lon = (longitude + lon_step * width + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lon, precision))
+    return cells
+
+
+def precision_for_radius(latitude: float, radius_km: float) -> int:
+    """Finest precision whose 3x3 cells still cover the radius"""
+    for precision in range(MAX_PRECISION, 0, -1):
+        if covered_radius_km(latitude, precision) >= radius_km:
+            return precision
+    return 0
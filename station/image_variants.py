@@ -0,0 +1,36 @@
+import os
+
+from PIL import Image, ImageOps
+
+# Variant name: bounding box, Pillow format and file extension
+VARIANTS = {
+    "medium_webp": ((640, 640), "WEBP", "webp"),
+    "thumbnail": ((160, 160), "JPEG", "jpg"),
+    "thumbnail_webp": ((160, 160), "WEBP", "webp"),
+}
+QUALITY = 80
+
+
+def variant_name(name: str, variant: str) -> str:
+    """File name of a variant, next to the original"""
+    root, _ = os.path.splitext(name)
+    return f"{root}-{variant.replace('_', '-')}.{VARIANTS[variant][2]}"
+
+
+def render_variants(path: str) -> None:
+    """Write every variant of the image at path.
+
+    Runs in worker processes, so it only imports Pillow and touches
+    files. Variants are resized from the largest to the smallest, each
+    from the previous one, and JPEGs are decoded at a reduced scale.
+    """
+    largest = max(size for size, _, _ in VARIANTS.values())
+    with Image.open(path) as original:
+        original.draft("RGB", largest)
+        image = ImageOps.exif_transpose(original).convert("RGB")
+    for variant, (size, image_format, _) in sorted(
+        VARIANTS.items(), key=lambda item: item[1][0], reverse=True
+    ):
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        image.save(variant_name(path, variant), image_format,
+                   quality=QUALITY)
@@ -0,0 +1,176 @@
+import functools
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger("station.requests")
+
+
+@dataclass
+class RequestStats:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db: float = 0.0
+    serialize: float = 0.0
+    serializing: bool = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the query to the request stats"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db += time.perf_counter() - started
+        stats.queries += 1
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Connections are per thread, so sync_to_async workers get one too;
+    # a reconnect reuses the wrapper object and its wrapper list
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed_serialization():
+    """Add the time spent in the block to the request's serializer time"""
+    stats = _current.get()
+    if stats is None or stats.serializing:
+        yield
+        return
+    stats.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize += time.perf_counter() - started
+        stats.serializing = False
+
+
+@functools.cache
+def _timed_class(serializer_class: type) -> type:
+    data = serializer_class.data
+
+    def timed_data(self):
+        with timed_serialization():
+            return data.fget(self)
+
+    return type(
+        serializer_class.__name__,
+        (serializer_class,),
+        {
+            "__module__": serializer_class.__module__,
+            "__qualname__": serializer_class.__qualname__,
+            "data": property(timed_data),
+        },
+    )
+
+
+def timed_serializer(serializer):
+    """Count the serializer's .data, many=True lists included, in the
+    serializer time of the current request
+    """
+    if _current.get() is not None:
+        serializer.__class__ = _timed_class(type(serializer))
+    return serializer
+
+
+class TimedSerializerMixin:
+    """Time the .data of serializers a view gets from get_serializer"""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if getattr(self, "swagger_fake_view", False):
+            return serializer
+        return timed_serializer(serializer)
+
+
+def server_timing(stats: RequestStats, view: float) -> str:
+    return (
+        f'db;dur={stats.db * 1000:.1f};desc="{stats.queries} queries", '
+        f"serialize;dur={stats.serialize * 1000:.1f}, "
+        f"view;dur={view * 1000:.1f}"
+    )
+
+
+class RequestTimingMiddleware:
+    """Measure queries, database, serializer and view time per request.
+
+    Results go to the Server-Timing header and, for a sample of
+    requests, to a JSON line on the station.requests logger. Keep it
+    last in MIDDLEWARE so view time covers the view and its rendering.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, stats)
+
+    @staticmethod
+    def report(request, response, stats: RequestStats):
+        view = stats.elapsed()
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = server_timing(stats, view)
+        if random.random() < settings.REQUEST_LOG_SAMPLE_RATE:
+            match = request.resolver_match
+            logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                "queries": stats.queries,
+                "db_ms": round(stats.db * 1000, 2),
+                "serialize_ms": round(stats.serialize * 1000, 2),
+                "view_ms": round(view * 1000, 2),
+            }))
+        return response
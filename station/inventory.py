@@ -0,0 +1,105 @@
+from collections import Counter
+from typing import Iterable
+
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce
+
+from station.models import Journey, JourneyInventory, Ticket
+
+
+def tickets_available_expression():
+    """Expression for free seats of a journey read from its inventory row"""
+    return (
+        F("train__cargo_num") * F("train__places_in_cargo")
+        - Coalesce(F("inventory__tickets_sold"), Value(0))
+    )
+
+
+def lock_journeys(journey_ids: Iterable[int]) -> None:
+    """Lock the counter rows of the journeys until the transaction ends.
+
+    Seat changes are serialized per journey; unrelated journeys never wait.
+    """
+    journey_ids = sorted(set(journey_ids))
+    JourneyInventory.objects.bulk_create(
+        [JourneyInventory(journey_id=pk) for pk in journey_ids],
+        ignore_conflicts=True,
+    )
+    list(
+        JourneyInventory.objects.select_for_update()
+        .filter(journey_id__in=journey_ids)
+        .order_by("journey_id")
+        .only("journey_id")
+    )
+
+
+def record_tickets_sold(journey_ids: Iterable[int]) -> None:
+    """Add sold tickets to the counters, one journey id per ticket.
+
+    Must be called inside the transaction that inserts the tickets.
+    """
+    for journey_id, count in Counter(journey_ids).items():
+        updated = JourneyInventory.objects.filter(
+            journey_id=journey_id
+        ).update(tickets_sold=F("tickets_sold") + count)
+        if not updated:
+            JourneyInventory.objects.get_or_create(journey_id=journey_id)
+            JourneyInventory.objects.filter(journey_id=journey_id).update(
+                tickets_sold=F("tickets_sold") + count
+            )
+
+
+def record_tickets_released(journey_ids: Iterable[int]) -> None:
+    """Subtract deleted tickets from the counters.
+
+    Missing rows are left alone: the journey is being deleted itself
+    or has never sold anything through the counters.
+    """
+    for journey_id, count in Counter(journey_ids).items():
+        JourneyInventory.objects.filter(
+            journey_id=journey_id,
+            tickets_sold__gte=count,
+        ).update(tickets_sold=F("tickets_sold") - count)
+
+
+def count_tickets_sold() -> dict[int, int]:
+    """Count tickets per journey straight from the Ticket table"""
+    counts = dict.fromkeys(Journey.objects.values_list("id", flat=True), 0)
+    counts.update(
+        Ticket.objects.order_by()
+        .values_list("journey_id")
+        .annotate(sold=Count("id"))
+    )
+    return counts
+
+
+def find_inventory_mismatches() -> list[tuple[int, int, int]]:
+    """Return (journey_id, stored, actual) for every stale counter.
+
+    Journeys get their row on their first booking, so a missing row
+    stands for a counter of 0.
+    """
+    stored = dict(
+        JourneyInventory.objects.values_list("journey_id", "tickets_sold")
+    )
+    return [
+        (journey_id, stored.get(journey_id, 0), sold)
+        for journey_id, sold in count_tickets_sold().items()
+        if stored.get(journey_id, 0) != sold
+    ]
+
+
+def rebuild_inventory(batch_size: int = 1000) -> int:
+    """Recount every journey's tickets and overwrite the counters"""
+    inventories = [
+        JourneyInventory(journey_id=journey_id, tickets_sold=sold)
+        for journey_id, sold in count_tickets_sold().items()
+    ]
+    JourneyInventory.objects.bulk_create(
+        inventories,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["journey"],
+        update_fields=["tickets_sold"],
+    )
+    return len(inventories)
@@ -0,0 +1,198 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class LoadResult:
+    url: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    throttled: int = 0
+    elapsed: float = 0.0
+
+    def percentile(self, value: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * value / 100))
+        return ordered[index]
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+
+class HttpConnection:
+    """Bare HTTP/1.1 keep-alive client so the load generator stays cheap"""
+
+    def __init__(self, url: str, headers: dict[str, str]):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = {"Host": parts.netloc, **headers}
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(
+            self.host, self.port
+        )
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    def send(self, path: str, extra_headers=None) -> None:
+        headers = {**self.headers, **(extra_headers or {})}
+        lines = [f"GET {path} HTTP/1.1"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+
+    async def read_head(self) -> tuple[int, dict[str, str]]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    async def read_body(self, headers) -> bytes:
+        if headers.get("transfer-encoding") == "chunked":
+            body = b""
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    return body
+                body += chunk[:-2]
+        return await self.reader.readexactly(
+            int(headers.get("content-length", 0))
+        )
+
+    async def get(self, path: str) -> int:
+        if self.writer is None:
+            await self.connect()
+        self.send(path)
+        await self.writer.drain()
+        status, headers = await self.read_head()
+        await self.read_body(headers)
+        if headers.get("connection") == "close":
+            await self.close()
+        return status
+
+
+async def run_load(url: str, requests: int, concurrency: int,
+                   headers: dict[str, str]) -> LoadResult:
+    """Send requests GETs to url over concurrency keep-alive connections"""
+    result = LoadResult(url)
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    remaining = iter(range(requests))
+
+    async def worker():
+        connection = HttpConnection(url, headers)
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status = await connection.get(path)
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                await connection.close()
+                result.errors += 1
+                continue
+            if status >= 400:
+                result.errors += 1
+                result.throttled += status == 429
+            else:
+                result.latencies.append(time.perf_counter() - started)
+        await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_load_in_process(url: str, requests: int, concurrency: int,
+                        headers: dict[str, str]) -> LoadResult:
+    """run_load for a child process, away from an in-process server"""
+    return asyncio.run(run_load(url, requests, concurrency, headers))
+
+
+@dataclass
+class SubscribeResult:
+    url: str
+    connected: int = 0
+    errors: int = 0
+    connect_elapsed: float = 0.0
+    # time.time() at which each subscriber received each update
+    arrivals: list[list[float]] = field(default_factory=list)
+
+
+async def _read_event(connection: HttpConnection) -> bytes:
+    size = int((await connection.reader.readline()).strip(), 16)
+    if not size:
+        raise ConnectionError("Stream ended")
+    return (await connection.reader.readexactly(size + 2))[:-2]
+
+
+async def run_subscribers(url: str, count: int, headers: dict[str, str],
+                          updates: int, timeout: float,
+                          concurrency: int = 500) -> SubscribeResult:
+    """Hold count event streams open and time updates reaching each one.
+
+    Every stream is connected and has read its snapshot before the
+    function reports it as connected; it then waits for updates events
+    or timeout seconds of silence, ignoring keep-alive comments.
+    """
+    result = SubscribeResult(url)
+    parts = urlsplit(url)
+    connecting = asyncio.Semaphore(concurrency)
+
+    async def subscriber():
+        connection = HttpConnection(url, headers)
+        arrivals = []
+        try:
+            async with connecting:
+                await connection.connect()
+                connection.send(parts.path, {"Accept": "text/event-stream"})
+                await connection.writer.drain()
+                status, _ = await connection.read_head()
+                if status != 200:
+                    raise ConnectionError(f"HTTP {status}")
+                while not (await _read_event(connection)).startswith(
+                    b"event: snapshot"
+                ):
+                    pass
+            result.connected += 1
+            while len(arrivals) < updates:
+                event = await asyncio.wait_for(
+                    _read_event(connection), timeout
+                )
+                if event.startswith(b"event: update"):
+                    arrivals.append(time.time())
+        except (OSError, ValueError, asyncio.IncompleteReadError,
+                asyncio.TimeoutError):
+            result.errors += 1
+        finally:
+            await connection.close()
+        result.arrivals.append(arrivals)
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(subscriber()) for _ in range(count)]
+    while result.connected + result.errors < count:
+        await asyncio.sleep(0.01)
+    result.connect_elapsed = time.perf_counter() - started
+    await asyncio.gather(*tasks)
+    return result
+
+
+def run_subscribers_in_process(url: str, count: int,
+                               headers: dict[str, str], updates: int,
+                               timeout: float) -> SubscribeResult:
+    """run_subscribers for a child process, away from an in-process server"""
+    return asyncio.run(run_subscribers(url, count, headers, updates, timeout))
@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management import BaseCommand
+from django.test.utils import override_settings
+from django.urls import path
+from django.views.static import serve
+
+from station.loadtest import run_load_in_process
+from train_station.media import serve_media
+
+# The command doubles as the URLconf of the benchmark, so both views get
+# the same middleware and only differ in how they send the file
+urlpatterns = [
+    path(
+        "static-serve/<path:path>",
+        lambda request, path: serve(request, path, settings.MEDIA_ROOT),
+    ),
+    path("media/<path:path>", serve_media),
+]
+VIEWS = {"static.serve": "/static-serve/", "serve_media": "/media/"}
+SIZES = {"thumbnail": 16 * 1024, "photo": 4 * 1024 * 1024}
+
+
+class Command(BaseCommand):
+    """Django command to compare media serving views.
+
+    Both django.views.static.serve and serve_media answer from a uvicorn
+    server started in this process, as in production, and every file is
+    fetched over keep-alive connections by the loadtest client, which
+    runs in a child process so it does not compete for the GIL. Peak
+    memory is traced separately, over one request per connection.
+    """
+
+    help = "Measure media file throughput of static.serve and serve_media"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=8)
+
+    def handle(self, *args, **options):
+        import uvicorn
+
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            MEDIA_ROOT=root,
+            MEDIA_OFFLOAD="",
+            ROOT_URLCONF=__name__,
+            ALLOWED_HOSTS=["*"],
+            REQUEST_LOG_SAMPLE_RATE=0,
+        ):
+            names = {}
+            for label, size in SIZES.items():
+                names[label] = f"crew-{uuid.uuid4()}.jpg"
+                with open(os.path.join(root, names[label]), "wb") as file:
+                    file.write(os.urandom(size))
+
+            listener = socket.socket()
+            listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            listener.bind(("127.0.0.1", 0))
+            server = uvicorn.Server(uvicorn.Config(
+                get_asgi_application(),
+                lifespan="off",
+                access_log=False,
+                log_level="warning",
+            ))
+            thread = threading.Thread(
+                target=server.run, kwargs={"sockets": [listener]}
+            )
+            thread.start()
+            while not server.started:
+                time.sleep(0.01)
+            try:
+                self.measure(listener.getsockname()[1], names, options)
+            finally:
+                server.should_exit = True
+                thread.join()
+                listener.close()
+
+    def measure(self, port: int, names: dict[str, str], options) -> None:
+        self.stdout.write(
+            f"{'file':>9} {'view':>12} {'requests/s':>10} {'MB/s':>8} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8} {'errors':>7}"
+        )
+        client = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        )
+        for label, name in names.items():
+            for view, prefix in VIEWS.items():
+                url = f"http://127.0.0.1:{port}{prefix}{name}"
+                result = client.submit(
+                    run_load_in_process,
+                    url,
+                    options["requests"],
+                    options["concurrency"],
+                    {},
+                ).result()
+                tracemalloc.start()
+                client.submit(
+                    run_load_in_process,
+                    url,
+                    options["concurrency"],
+                    options["concurrency"],
+                    {},
+                ).result()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                rate = result.requests_per_second
+                self.stdout.write(
+                    f"{label:>9} {view:>12} {rate:>10.1f} "
+                    f"{rate * SIZES[label] / 2 ** 20:>8.1f} "
+                    f"{result.percentile(50) * 1000:>8.1f} "
+                    f"{result.percentile(99) * 1000:>8.1f} "
+                    f"{peak / 2 ** 20:>8.1f} "
+                    f"{result.errors:>7}"
+                )
+        client.shutdown()
@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from station.booking import create_order_tickets, hold_seats
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    SeatHold,
+    Station,
+    Train,
+    TrainType,
+)
+
+
+class Command(BaseCommand):
+    """Django command to measure seat holds and checkout under contention.
+
+    Run it against a local PostgreSQL database: every worker thread
+    holds random seats on a few journeys and converts them into an order.
+    Everything the benchmark creates is deleted afterwards.
+    """
+
+    help = "Multi-threaded seat hold and checkout contention benchmark"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--attempts", type=int, default=200,
+                            help="Hold and checkout attempts per thread")
+        parser.add_argument("--journeys", type=int, default=4)
+        parser.add_argument("--seats", type=int, default=2,
+                            help="Seats per attempt")
+        parser.add_argument("--places", type=int, default=69,
+                            help="Places in each of the 9 cargos")
+
+    def handle(self, *args, **options):
+        station = Station.objects.create(
+            name="Benchmark station", latitude=50.0, longitude=30.0
+        )
+        route = Route.objects.create(source=station, destination=station)
+        train = Train.objects.create(
+            name="Benchmark train",
+            cargo_num=9,
+            places_in_cargo=options["places"],
+            train_type=TrainType.objects.create(name="Benchmark"),
+        )
+        journeys = [
+            Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=timezone.now(),
+                arrival_time=timezone.now(),
+            )
+            for _ in range(options["journeys"])
+        ]
+        users = [
+            get_user_model().objects.create_user(
+                email=f"benchmark-{i}@example.com"
+            )
+            for i in range(options["threads"])
+        ]
+        try:
+            self.run(journeys, train, users, options)
+        finally:
+            # Holds, orders and tickets go with the journeys and users
+            Journey.objects.filter(pk__in=[j.pk for j in journeys]).delete()
+            train.train_type.delete()
+            station.delete()
+            get_user_model().objects.filter(
+                pk__in=[u.pk for u in users]
+            ).delete()
+
+    def run(self, journeys, train, users, options) -> None:
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def worker(user):
+            rng = random.Random(user.id)
+            try:
+                for _ in range(options["attempts"]):
+                    journey = rng.choice(journeys)
+                    seats = [
+                        {
+                            "journey": journey,
+                            "cargo": rng.randint(1, train.cargo_num),
+                            "seat": rng.randint(1, train.places_in_cargo),
+                        }
+                        for _ in range(options["seats"])
+                    ]
+                    outcome = self.attempt(user, seats)
+                    with lock:
+                        outcomes[outcome] += 1
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(user,)) for user in users
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = sum(outcomes.values())
+        aborted = total - outcomes["booked"]
+        self.stdout.write(
+            f"{total} attempts by {len(threads)} threads "
+            f"in {elapsed:.2f}s\n"
+            f"booked: {outcomes['booked']} "
+            f"({outcomes['booked'] / elapsed:.1f} orders/s)\n"
+            f"seat conflicts: {outcomes['conflict']}, "
+            f"database errors: {outcomes['error']}\n"
+            f"abort rate: {aborted / total:.1%}"
+        )
+
+    @staticmethod
+    def attempt(user, seats) -> str:
+        try:
+            hold_seats(user, seats)
+            with transaction.atomic():
+                order = Order.objects.create(user=user)
+                create_order_tickets(order, seats)
+        except ValidationError:
+            # Holds of a failed checkout would count against the limit
+            SeatHold.objects.filter(user=user).delete()
+            return "conflict"
+        except DatabaseError:
+            return "error"
+        return "booked"
@@ -0,0 +1,135 @@
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from station.fast_serializers import (
+    JourneyListValuesSerializer,
+    RouteListValuesSerializer,
+    TrainListValuesSerializer,
+)
+from station.inventory import tickets_available_expression
+from station.models import Journey, Route, Station, Train, TrainType
+from station.serializers import (
+    JourneyListSerializer,
+    RouteListSerializer,
+    TrainListSerializer,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Django command to compare list serializers on generated rows"""
+
+    help = (
+        "Measure rows/s of the DRF list serializers and their .values() "
+        "counterparts for journeys, routes and trains; generated rows "
+        "are rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options["rows"])
+                for line in self.measure(options["rows"], options["repeat"]):
+                    self.stdout.write(line)
+                raise Rollback
+        except Rollback:
+            pass
+
+    @staticmethod
+    def seed(rows: int) -> None:
+        stations = Station.objects.bulk_create(
+            Station(name=f"Station {number}", latitude=50, longitude=30)
+            for number in range(100)
+        )
+        train_type = TrainType.objects.create(name="Benchmark")
+        trains = Train.objects.bulk_create(
+            Train(name=f"Train {number}", cargo_num=8, places_in_cargo=50,
+                  train_type=train_type)
+            for number in range(rows)
+        )
+        routes = Route.objects.bulk_create(
+            Route(source=stations[number % 100],
+                  destination=stations[(number * 7 + 1) % 100],
+                  distance=number)
+            for number in range(rows)
+        )
+        start = timezone.now()
+        Journey.objects.bulk_create(
+            Journey(route=routes[number], train=trains[number],
+                    departure_time=start + timedelta(minutes=number),
+                    arrival_time=start + timedelta(minutes=number + 90))
+            for number in range(rows)
+        )
+
+    def measure(self, rows: int, repeat: int):
+        cases = [
+            (
+                "journeys",
+                JourneyListSerializer,
+                JourneyListValuesSerializer,
+                Journey.objects.select_related(
+                    "route__source", "route__destination", "train"
+                ).annotate(
+                    tickets_available=tickets_available_expression()
+                ),
+            ),
+            (
+                "routes",
+                RouteListSerializer,
+                RouteListValuesSerializer,
+                Route.objects.select_related("source", "destination"),
+            ),
+            (
+                "trains",
+                TrainListSerializer,
+                TrainListValuesSerializer,
+                Train.objects.select_related("train_type"),
+            ),
+        ]
+        yield (f"{'':10}{'serializer':>14}{'values':>14}{'speedup':>9}"
+               f"{'with query':>14}{'values':>14}{'speedup':>9}  rows/s")
+        for name, serializer_class, values_class, queryset in cases:
+            queryset = queryset.order_by("id")[:rows]
+            instances = list(queryset)
+            values = list(values_class.select(queryset))
+            model = self.rate(
+                lambda: serializer_class(instances, many=True).data,
+                len(instances), repeat,
+            )
+            fast = self.rate(
+                lambda: values_class(values, many=True).data,
+                len(values), repeat,
+            )
+            model_total = self.rate(
+                lambda: serializer_class(list(queryset), many=True).data,
+                len(instances), repeat,
+            )
+            fast_total = self.rate(
+                lambda: values_class(
+                    list(values_class.select(queryset)), many=True
+                ).data,
+                len(values), repeat,
+            )
+            yield (f"{name:10}{model:14.0f}{fast:14.0f}{fast / model:8.1f}x"
+                   f"{model_total:14.0f}{fast_total:14.0f}"
+                   f"{fast_total / model_total:8.1f}x")
+
+    @staticmethod
+    def rate(run, rows: int, repeat: int) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        return rows / best
@@ -0,0 +1,68 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.core.management import BaseCommand, CommandError
+
+# Runs in a fresh interpreter, so every import is paid again
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+result = {"startup": time.perf_counter() - started}
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment(debug=settings.DEBUG)
+client = Client()
+for path in sys.argv[1:]:
+    started = time.perf_counter()
+    client.get(path)
+    result[path] = time.perf_counter() - started
+result["modules"] = len(sys.modules)
+print(json.dumps(result))
+"""
+
+
+class Command(BaseCommand):
+    """Django command to measure process startup and first requests.
+
+    Each run starts a new interpreter with the current settings, loads
+    Django, the WSGI application and the URLconf, then sends one request
+    to every path, so the times include lazy imports and warm-up work.
+    """
+
+    help = "Measure import time and cold-start first-request latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*",
+                            default=["/api/station/journeys/", "/api/schema/"])
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **options):
+        runs = []
+        for _ in range(options["runs"]):
+            child = subprocess.run(
+                [sys.executable, "-c", CHILD, *options["paths"]],
+                capture_output=True,
+                text=True,
+            )
+            if child.returncode:
+                raise CommandError(child.stderr)
+            runs.append(json.loads(child.stdout.splitlines()[-1]))
+
+        self.stdout.write(f"median of {len(runs)} runs")
+        for name in ["startup", *options["paths"]]:
+            median = statistics.median(run[name] for run in runs)
+            label = name if name == "startup" else f"first GET {name}"
+            self.stdout.write(f"{median * 1000:10.1f} ms  {label}")
+        self.stdout.write(
+            f"{statistics.median(run['modules'] for run in runs):10.0f}"
+            f"     modules loaded"
+        )
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from train_station.schema import SCHEMA_FORMATS, render_schema
+
+
+class Command(BaseCommand):
+    """Django command to prebuild the OpenAPI document.
+
+    Run it at build time: /api/schema/ then serves the files as they
+    are instead of introspecting every view in each worker.
+    """
+
+    help = "Write the OpenAPI schema as YAML and JSON to OPENAPI_SCHEMA_DIR"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=settings.OPENAPI_SCHEMA_DIR,
+                            help="Directory for schema.yaml and schema.json")
+
+    def handle(self, *args, **options):
+        directory = Path(options["output"])
+        directory.mkdir(parents=True, exist_ok=True)
+        for schema_format, (file_name, _) in SCHEMA_FORMATS.items():
+            (directory / file_name).write_bytes(render_schema(schema_format))
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote the OpenAPI schema to {directory}")
+        )
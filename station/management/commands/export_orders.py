@@ -0,0 +1,63 @@
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from station.dates import parse_moment
+from station.exports import EXPORT_FORMATS, iter_chunks, iter_ticket_rows
+
+
+class Command(BaseCommand):
+    """Django command to export orders with their tickets"""
+
+    help = "Write orders created in a time range as NDJSON, CSV or JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--after",
+            required=True,
+            help="Orders created at or after this date or date/time",
+        )
+        parser.add_argument(
+            "--before",
+            help="Orders created before this date or date/time, now "
+                 "by default",
+        )
+        parser.add_argument(
+            "--format",
+            choices=list(EXPORT_FORMATS),
+            default="ndjson",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write, standard output by default",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database at a time",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            created_after = parse_moment(options["after"], "after")
+            created_before = (
+                parse_moment(options["before"], "before")
+                if options["before"]
+                else timezone.now()
+            )
+        except ValidationError as error:
+            raise CommandError(error.detail)
+
+        serialize, _ = EXPORT_FORMATS[options["format"]]
+        rows = iter_ticket_rows(
+            created_after, created_before, options["chunk_size"]
+        )
+        if not options["output"]:
+            for chunk in iter_chunks(serialize(rows)):
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as output:
+            for chunk in iter_chunks(serialize(rows)):
+                output.write(chunk)
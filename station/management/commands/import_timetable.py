@@ -0,0 +1,40 @@
+from django.core.management import BaseCommand, CommandError
+
+from station.timetable import TimetableError, import_timetable, read_timetable
+
+
+class Command(BaseCommand):
+    """Django command to bulk import stations, routes and journeys"""
+
+    help = (
+        "Import a timetable from a JSON file or a directory of CSV files "
+        "(stations, trains, crews, routes and journeys)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON file or directory of CSVs")
+
+    def handle(self, *args, **options):
+        try:
+            result = import_timetable(read_timetable(options["path"]))
+        except (OSError, ValueError, TimetableError) as error:
+            raise CommandError(error)
+
+        for label, count in result.created.items():
+            self.stdout.write(
+                f"{label}: {count} created"
+                + (
+                    f", {result.updated[label]} updated"
+                    if label in result.updated
+                    else ""
+                )
+            )
+        self.stdout.write(
+            f"route distances: {result.updated['route distances']} updated"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.rows} rows in {result.elapsed:.2f}s "
+                f"({result.rows_per_second:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,55 @@
+import asyncio
+
+from django.core.management import BaseCommand
+
+from station.loadtest import run_load
+
+
+class Command(BaseCommand):
+    """Django command to compare throughput and latency of endpoints.
+
+    Point it at the same endpoint served by a WSGI and an ASGI server,
+    or at a sync and an async URL, e.g.:
+    loadtest http://localhost:8000/api/station/journeys/
+             http://localhost:8001/api/station/async/journeys/ --token ...
+    The servers should run with THROTTLING=False, otherwise nearly every
+    request is answered 429 by the rate limits.
+    """
+
+    help = "Measure requests/sec and latency percentiles of GET endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--token", help="JWT access token")
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+
+        self.stdout.write(
+            f"{'requests/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'errors':>7}  url"
+        )
+        for url in options["urls"]:
+            result = asyncio.run(
+                run_load(
+                    url,
+                    options["requests"],
+                    options["concurrency"],
+                    headers,
+                )
+            )
+            self.stdout.write(
+                f"{result.requests_per_second:>10.1f} "
+                f"{result.percentile(50) * 1000:>8.1f} "
+                f"{result.percentile(99) * 1000:>8.1f} "
+                f"{result.errors:>7}  {url}"
+            )
+            if result.throttled:
+                self.stderr.write(
+                    f"{result.throttled} requests to {url} were throttled, "
+                    "run the server with THROTTLING=False"
+                )
@@ -0,0 +1,201 @@
+import multiprocessing
+import resource
+import socket
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.booking import create_order_tickets
+from station.loadtest import run_subscribers_in_process
+from station.models import Journey, Order
+from station.seat_events import broker
+from station.seat_map import build_seat_map
+from station.views import JourneyViewSet
+
+
+def _percentile(values: list[float], value: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * value / 100))]
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class Command(BaseCommand):
+    """Django command to load the seat events stream of a journey.
+
+    A uvicorn server started in this process serves the stream to idle
+    subscribers opened from a child process; once all of them have their
+    snapshot, seats are booked and then cancelled one order at a time
+    and each update is timed from commit to arrival at every subscriber.
+    All subscribers use one account, so throttling is off for the run.
+    """
+
+    help = "Measure memory and fan-out latency of journey seat events"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=5000)
+        parser.add_argument("--changes", type=int, default=5)
+        parser.add_argument("--journey", type=int)
+        parser.add_argument("--interval", type=float, default=0.5)
+        parser.add_argument(
+            "--tracemalloc",
+            action="store_true",
+            help="Also trace Python allocations, slowing the server down",
+        )
+
+    def handle(self, *args, **options):
+        import uvicorn
+
+        user = get_user_model().objects.order_by("id").first()
+        journeys = Journey.objects.select_related("train").order_by("id")
+        if options["journey"]:
+            journeys = journeys.filter(id=options["journey"])
+        journey = journeys.first()
+        if user is None or journey is None:
+            raise CommandError("Run seed_data first")
+        seats = [
+            (int(cargo), seat)
+            for cargo, flags in build_seat_map(journey).items()
+            for seat, flag in enumerate(flags, 1)
+            if flag == "0"
+        ][:options["changes"]]
+        if len(seats) < options["changes"]:
+            raise CommandError("Not enough free seats on the journey")
+
+        # Both ends hold a socket per subscriber
+        _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        with override_settings(
+            ALLOWED_HOSTS=["*"], REQUEST_LOG_SAMPLE_RATE=0
+        ), mock.patch.object(JourneyViewSet, "throttle_classes", []):
+            listener = socket.socket()
+            listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            listener.bind(("127.0.0.1", 0))
+            server = uvicorn.Server(uvicorn.Config(
+                get_asgi_application(),
+                lifespan="off",
+                access_log=False,
+                log_level="warning",
+                backlog=4096,
+            ))
+            thread = threading.Thread(
+                target=server.run, kwargs={"sockets": [listener]}
+            )
+            thread.start()
+            while not server.started:
+                time.sleep(0.01)
+            try:
+                url = "http://127.0.0.1:{}{}".format(
+                    listener.getsockname()[1],
+                    reverse(
+                        "station:async-journey-seat-events",
+                        args=(journey.id,),
+                    ),
+                )
+                self.measure(url, user, journey, seats, options)
+            finally:
+                server.should_exit = True
+                thread.join()
+                listener.close()
+
+    def subscribed(self) -> int:
+        # The server thread may be changing the journeys meanwhile
+        try:
+            return broker.subscribers
+        except RuntimeError:
+            return 0
+
+    def measure(self, url, user, journey, seats, options) -> None:
+        count = options["subscribers"]
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        client = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Start the child before tracing, spawning allocates here too
+        client.submit(int).result()
+
+        rss = _rss_mb()
+        if options["tracemalloc"]:
+            tracemalloc.start()
+        future = client.submit(
+            run_subscribers_in_process,
+            url,
+            count,
+            headers,
+            2 * len(seats),
+            30.0,
+        )
+        while self.subscribed() < count and not future.done():
+            time.sleep(0.05)
+        time.sleep(0.5)
+        rss = _rss_mb() - rss
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        subscribed = self.subscribed()
+
+        sent = []
+        orders = []
+        for cargo, seat in seats:
+            with transaction.atomic():
+                order = Order.objects.create(user=user)
+                create_order_tickets(
+                    order, [{"journey": journey, "cargo": cargo, "seat": seat}]
+                )
+                sent.append(time.time())
+            orders.append(order)
+            time.sleep(options["interval"])
+        for order in orders:
+            with transaction.atomic():
+                order.delete()
+                sent.append(time.time())
+            time.sleep(options["interval"])
+
+        result = future.result()
+        client.shutdown()
+
+        latencies = []
+        slowest = []
+        for index, committed in enumerate(sent):
+            arrived = [
+                arrivals[index] - committed
+                for arrivals in result.arrivals
+                if len(arrivals) > index
+            ]
+            latencies += arrived
+            slowest.append(max(arrived, default=0.0))
+        received = sum(
+            len(arrivals) == len(sent) for arrivals in result.arrivals
+        )
+
+        memory = f"{rss * 1024 / count:.1f} KiB RSS"
+        if options["tracemalloc"]:
+            memory += f", {traced / count / 1024:.1f} KiB traced"
+        self.stdout.write(
+            f"subscribers {subscribed}/{count} connected in "
+            f"{result.connect_elapsed:.2f} s, {result.errors} errors\n"
+            f"server memory per subscriber: {memory}\n"
+            f"{received} subscribers received all {len(sent)} updates\n"
+            f"commit to delivery: p50 {_percentile(latencies, 50) * 1000:.1f}"
+            f" ms, p99 {_percentile(latencies, 99) * 1000:.1f} ms, "
+            f"last subscriber p50 {_percentile(slowest, 50) * 1000:.1f} ms, "
+            f"max {max(slowest, default=0.0) * 1000:.1f} ms"
+        )
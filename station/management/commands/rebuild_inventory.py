@@ -0,0 +1,38 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from station.inventory import find_inventory_mismatches, rebuild_inventory
+
+
+class Command(BaseCommand):
+    """Django command to rebuild or verify journey seat counters"""
+
+    help = "Recount journey seat counters from the Ticket table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare counters with tickets, do not write",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            mismatches = find_inventory_mismatches()
+            for journey_id, stored, actual in mismatches:
+                self.stdout.write(
+                    f"Journey {journey_id}: stored {stored}, actual {actual}"
+                )
+            if mismatches:
+                raise CommandError(
+                    f"{len(mismatches)} journey counters are out of date"
+                )
+            self.stdout.write(self.style.SUCCESS("All counters match"))
+            return
+
+        with transaction.atomic():
+            rebuilt = rebuild_inventory()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt counters for {rebuilt} journeys")
+        )
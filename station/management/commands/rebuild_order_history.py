@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+
+from station.order_history import rebuild_order_history
+
+
+class Command(BaseCommand):
+    """Django command to rewrite the order history summaries"""
+
+    help = (
+        "Rewrite order history summaries from orders and tickets, e.g. "
+        "after stations or trains were renamed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild_order_history(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt history of {written} orders")
+        )
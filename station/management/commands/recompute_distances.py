@@ -0,0 +1,73 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from station.distances import recompute_route_distances
+from station.models import Route
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Django command to recompute route distances in bulk"""
+
+    help = "Recompute route distances from station coordinates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--station",
+            type=int,
+            nargs="*",
+            help="Only routes touching these station ids",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Time the bulk and the per-row Route.save paths "
+                 "over all routes and roll both back",
+        )
+
+    def handle(self, *args, **options):
+        if options["benchmark"]:
+            self.benchmark(options["batch_size"])
+            return
+
+        with transaction.atomic():
+            written = recompute_route_distances(
+                options["station"], options["batch_size"]
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated distances of {written} routes")
+        )
+
+    def benchmark(self, batch_size):
+        routes = Route.objects.count()
+        bulk = self.timed(
+            lambda: recompute_route_distances(
+                batch_size=batch_size, only_changed=False
+            )
+        )
+        per_row = self.timed(
+            lambda: [route.save() for route in Route.objects.all()]
+        )
+        self.stdout.write(
+            f"{routes} routes\n"
+            f"bulk: {bulk:.3f}s ({routes / bulk:.0f} routes/s)\n"
+            f"Route.save: {per_row:.3f}s ({routes / per_row:.0f} routes/s)\n"
+            f"speedup: {per_row / bulk:.1f}x"
+        )
+
+    @staticmethod
+    def timed(run) -> float:
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                run()
+                elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            return elapsed
@@ -0,0 +1,77 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from station.benchmarks import SCENARIOS, find_regressions, run_benchmarks
+
+
+class Command(BaseCommand):
+    """Django command to benchmark API scenarios against a baseline.
+
+    Seed the database with seed_data first. Save a baseline once with
+    --save-baseline, later runs given --baseline fail when a scenario
+    got slower than the tolerance allows or runs more SQL queries.
+    """
+
+    help = (
+        "Measure latency percentiles, SQL queries and rows scanned of "
+        "journey search, journey detail, order creation and order listing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append",
+                            choices=list(SCENARIOS), dest="scenarios",
+                            help="Scenario to run, all by default")
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--baseline", help="JSON file to compare with")
+        parser.add_argument("--save-baseline",
+                            help="JSON file to write the results to")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed slowdown against the baseline")
+
+    def handle(self, *args, **options):
+        try:
+            results = run_benchmarks(
+                options["scenarios"] or list(SCENARIOS),
+                options["requests"],
+                options["warmup"],
+                options["seed"],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            f"{'':16}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'rows scanned':>14}"
+        )
+        for name, summary in results.items():
+            rows_scanned = summary["rows_scanned"]
+            self.stdout.write(
+                f"{name:16}{summary['p50_ms']:9.2f}{summary['p95_ms']:9.2f}"
+                f"{summary['p99_ms']:9.2f}{summary['queries']:9}"
+                f"{'-' if rows_scanned is None else rows_scanned:>14}"
+            )
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as file:
+                json.dump(
+                    {"vendor": connection.vendor, "scenarios": results},
+                    file,
+                    indent=2,
+                )
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+            regressions = find_regressions(
+                results, baseline["scenarios"], options["tolerance"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Regressions against the baseline:\n"
+                    + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions"))
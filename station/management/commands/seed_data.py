@@ -0,0 +1,50 @@
+import time
+
+from django.core.management import BaseCommand
+
+from station.benchmarks import seed_data
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with a synthetic timetable.
+
+    Run it on an empty database, e.g. after flush, so that benchmark
+    results stay comparable: the same options always generate the same
+    stations, journeys and bookings.
+    """
+
+    help = "Generate stations, routes, trains, crews, journeys and tickets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", type=int, default=200)
+        parser.add_argument("--routes", type=int, default=1000)
+        parser.add_argument("--trains", type=int, default=150)
+        parser.add_argument("--crews", type=int, default=400)
+        parser.add_argument("--journeys", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--days", type=int, default=60,
+                            help="Days ahead the journeys depart over")
+        parser.add_argument("--load", type=float, default=0.3,
+                            help="Mean share of seats sold, 0 to 1")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = seed_data(
+            stations=options["stations"],
+            routes=options["routes"],
+            trains=options["trains"],
+            crews=options["crews"],
+            journeys=options["journeys"],
+            users=options["users"],
+            days=options["days"],
+            load=options["load"],
+            seed=options["seed"],
+        )
+        elapsed = time.perf_counter() - started
+        created = ", ".join(
+            f"{count} {name}" for name, count in counts.items()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} in {elapsed:.1f}s")
+        )
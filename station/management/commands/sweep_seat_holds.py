@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from station.booking import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    """Django command to delete expired seat holds"""
+
+    help = "Delete every seat hold past its expiry time"
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired_holds()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired seat holds")
+        )
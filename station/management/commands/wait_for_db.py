@@ -1,20 +1,42 @@
 import time
-from django.db import connections
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.utils import OperationalError
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
     """Django command to pause execution until db is available"""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to keep trying before giving up",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
+        db_conn = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
+        delay = 0.1
+        while True:
             try:
-                db_conn = connections["default"]
+                with db_conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                break
             except OperationalError:
-                self.stdout.write("Database unavailable, waititng 1 second...")
-                time.sleep(1)
+                db_conn.close()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f"Database unavailable after {options['timeout']}s"
+                    )
+                delay = min(delay * 2, 5, remaining)
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:.1f} seconds..."
+                )
+                time.sleep(delay)
 
         self.stdout.write(self.style.SUCCESS("Database available!"))
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-17 11:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_inventory(apps, schema_editor):
+    Journey = apps.get_model("station", "Journey")
+    JourneyInventory = apps.get_model("station", "JourneyInventory")
+    JourneyInventory.objects.bulk_create(
+        [
+            JourneyInventory(journey_id=journey_id, tickets_sold=sold)
+            for journey_id, sold in Journey.objects.annotate(
+                sold=models.Count("tickets")
+            ).values_list("id", "sold")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0004_crew_image"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JourneyInventory",
+            fields=[
+                (
+                    "journey",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="inventory",
+                        serialize=False,
+                        to="station.journey",
+                    ),
+                ),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "journey inventories",
+            },
+        ),
+        migrations.RunPython(backfill_inventory, migrations.RunPython.noop),
+    ]
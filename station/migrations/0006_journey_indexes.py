@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0005_journeyinventory"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["departure_time", "id"], name="journey_departure_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["route", "departure_time"], name="journey_route_departure_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["train", "departure_time"], name="journey_train_departure_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-17 11:49
+
+from django.db import migrations, models
+
+from station.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    Station = apps.get_model("station", "Station")
+    stations = list(Station.objects.all())
+    for station in stations:
+        station.geohash = encode_geohash(station.latitude, station.longitude)
+    Station.objects.bulk_update(stations, ["geohash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0007_seathold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="station",
+            name="geohash",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=12
+            ),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0008_station_geohash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:07
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from rest_framework import serializers
+
+BATCH_SIZE = 1000
+
+
+def backfill_order_history(apps, schema_editor):
+    # A frozen copy of order_history.rebuild_order_history, kept to the
+    # models as they are at this migration
+    Order = apps.get_model("station", "Order")
+    Ticket = apps.get_model("station", "Ticket")
+    OrderSummary = apps.get_model("station", "OrderSummary")
+    to_representation = serializers.DateTimeField().to_representation
+
+    orders = list(
+        Order.objects.order_by("id").values_list("id", "user_id", "created_at")
+    )
+    for start in range(0, len(orders), BATCH_SIZE):
+        batch = orders[start : start + BATCH_SIZE]
+        entries = defaultdict(list)
+        for (
+            order_id,
+            ticket_id,
+            cargo,
+            seat,
+            journey_id,
+            source,
+            destination,
+            train,
+            departure_time,
+            arrival_time,
+            cargo_num,
+            places_in_cargo,
+        ) in (
+            Ticket.objects.filter(order_id__in=[row[0] for row in batch])
+            .order_by("order_id", "cargo", "seat")
+            .values_list(
+                "order_id",
+                "id",
+                "cargo",
+                "seat",
+                "journey_id",
+                "journey__route__source__name",
+                "journey__route__destination__name",
+                "journey__train__name",
+                "journey__departure_time",
+                "journey__arrival_time",
+                "journey__train__cargo_num",
+                "journey__train__places_in_cargo",
+            )
+        ):
+            entries[order_id].append(
+                {
+                    "id": ticket_id,
+                    "cargo": cargo,
+                    "seat": seat,
+                    "journey": {
+                        "id": journey_id,
+                        "route": f"{source} - {destination}",
+                        "train": train,
+                        "departure_time": to_representation(departure_time),
+                        "arrival_time": to_representation(arrival_time),
+                        "train_capacity": cargo_num * places_in_cargo,
+                    },
+                }
+            )
+        OrderSummary.objects.bulk_create(
+            [
+                OrderSummary(
+                    order_id=order_id,
+                    user_id=user_id,
+                    created_at=created_at,
+                    tickets=entries.get(order_id, []),
+                )
+                for order_id, user_id, created_at in batch
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0009_order_created_at_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderSummary",
+            fields=[
+                (
+                    "order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="station.order",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("tickets", models.JSONField(default=list)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="order_summaries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "order summaries",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created_at"],
+                        name="ordersummary_user_created_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_order_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0010_ordersummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crew",
+            name="image_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("processing", "Processing"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                editable=False,
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="crew",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
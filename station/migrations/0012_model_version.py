@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0011_crew_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ModelVersion",
+            fields=[
+                (
+                    "label",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("changed_at", models.DateTimeField()),
+            ],
+        ),
+    ]
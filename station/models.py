@@ -7,11 +7,21 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.text import slugify
 
+from station.geo import MAX_PRECISION, encode_geohash
+
 
 class Station(models.Model):
     name = models.CharField(max_length=255)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    # Prefix-searchable location, kept in sync with the coordinates
+    geohash = models.CharField(
+        max_length=MAX_PRECISION, db_index=True, editable=False, blank=True
+    )
+
+    def save(self, *args, **kwargs):
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return (f"{self.name}: {self.latitude} latitude, "
@@ -92,9 +102,21 @@ def image_file_path(instance, filename):
 
 
 class Crew(models.Model):
+    class ImageStatus(models.TextChoices):
+        PROCESSING = "processing"
+        READY = "ready"
+        FAILED = "failed"
+
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
     image = models.ImageField(null=True, upload_to=image_file_path)
+    # Resized copies of the image rendered in the background, by name
+    image_status = models.CharField(
+        max_length=16, choices=ImageStatus, blank=True, editable=False
+    )
+    image_variants = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
 
     @property
     def full_name(self) -> str:
@@ -116,10 +138,47 @@ class Journey(models.Model):
                 f"departure at {self.departure_time} "
                 )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"],
+                name="journey_departure_id_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="journey_route_departure_idx",
+            ),
+            models.Index(
+                fields=["train", "departure_time"],
+                name="journey_train_departure_idx",
+            ),
+        ]
+
+
+class JourneyInventory(models.Model):
+    """Seat counters for a journey, kept in step with its tickets"""
+    journey = models.OneToOneField(
+        Journey,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="inventory"
+    )
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    @property
+    def tickets_available(self) -> int:
+        return self.journey.train.capacity - self.tickets_sold
+
+    def __str__(self):
+        return f"{self.journey}: {self.tickets_sold} tickets sold"
+
+    class Meta:
+        verbose_name_plural = "journey inventories"
+
 
 class Order(models.Model):
     id = models.AutoField(primary_key=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
@@ -177,3 +236,69 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("journey", "cargo", "seat")
         ordering = ["cargo", "seat"]
+
+
+class SeatHold(models.Model):
+    """Seat reserved for a user for a short time before checkout"""
+    journey = models.ForeignKey(
+        Journey,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    cargo = models.IntegerField()
+    seat = models.IntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return (f"{self.journey}: cargo {self.cargo}, seat {self.seat} "
+                f"held until {self.expires_at}")
+
+    class Meta:
+        unique_together = ("journey", "cargo", "seat")
+        ordering = ["cargo", "seat"]
+
+
+class OrderSummary(models.Model):
+    """Order as shown in the order history, written with its tickets"""
+    order = models.OneToOneField(
+        Order,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="summary"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_summaries"
+    )
+    created_at = models.DateTimeField()
+    # Tickets with their journeys, as listed by OrderListSerializer
+    tickets = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"{self.order_id}: {len(self.tickets)} tickets"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="ordersummary_user_created_idx",
+            ),
+        ]
+        verbose_name_plural = "order summaries"
+
+
+class ModelVersion(models.Model):
+    """Change counter of a model, bumped in the transaction changing it"""
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
@@ -0,0 +1,60 @@
+from functools import reduce
+from operator import or_
+from typing import Optional
+
+from django.db.models import Q
+
+from station.distances import haversine
+from station.geo import (
+    MAX_PRECISION,
+    covered_radius_km,
+    neighbourhood,
+    precision_for_radius,
+)
+from station.models import Station
+
+
+def _stations_in_cells(latitude, longitude, precision) -> list[Station]:
+    stations = Station.objects.all()
+    if precision:
+        cells = neighbourhood(latitude, longitude, precision)
+        stations = stations.filter(
+            reduce(or_, (Q(geohash__startswith=cell) for cell in cells))
+        )
+    stations = list(stations)
+    if stations:
+        distances = haversine(
+            latitude,
+            longitude,
+            [station.latitude for station in stations],
+            [station.longitude for station in stations],
+        ).tolist()
+        for station, distance in zip(stations, distances):
+            station.distance = distance
+    return sorted(stations, key=lambda station: station.distance)
+
+
+def find_nearby_stations(latitude: float, longitude: float,
+                         k: int, radius_km: Optional[float] = None):
+    """Up to k stations nearest to the point, optionally within a radius.
+
+    Only the geohash cells around the point are read through the
+    geohash index; cells grow until they hold k stations for sure.
+    """
+    if radius_km is not None:
+        precision = precision_for_radius(latitude, radius_km)
+        return [
+            station
+            for station in _stations_in_cells(latitude, longitude, precision)
+            if station.distance <= radius_km
+        ][:k]
+
+    for precision in range(MAX_PRECISION - 6, -1, -1):
+        covered = covered_radius_km(latitude, precision)
+        nearest = [
+            station
+            for station in _stations_in_cells(latitude, longitude, precision)
+            if station.distance <= covered
+        ]
+        if len(nearest) >= k or precision == 0:
+            return nearest[:k]
@@ -0,0 +1,156 @@
+import weakref
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable
+
+from django.db import transaction
+from rest_framework import serializers
+
+from station.models import JourneyInventory, Order, OrderSummary, Ticket
+
+TICKET_FIELDS = (
+    "order_id",
+    "id",
+    "cargo",
+    "seat",
+    "journey_id",
+    "journey__route__source__name",
+    "journey__route__destination__name",
+    "journey__train__name",
+    "journey__departure_time",
+    "journey__arrival_time",
+    "journey__train__cargo_num",
+    "journey__train__places_in_cargo",
+)
+
+_datetime = serializers.DateTimeField()
+
+
+def ticket_entries(rows) -> dict[int, list[dict]]:
+    """History entries of TICKET_FIELDS rows, by order id"""
+    entries = defaultdict(list)
+    for (
+        order_id, ticket_id, cargo, seat, journey_id, source, destination,
+        train, departure_time, arrival_time, cargo_num, places_in_cargo,
+    ) in rows:
+        entries[order_id].append({
+            "id": ticket_id,
+            "cargo": cargo,
+            "seat": seat,
+            "journey": {
+                "id": journey_id,
+                "route": f"{source} - {destination}",
+                "train": train,
+                "departure_time": _datetime.to_representation(
+                    departure_time
+                ),
+                "arrival_time": _datetime.to_representation(arrival_time),
+                "train_capacity": cargo_num * places_in_cargo,
+            },
+        })
+    return entries
+
+
+def write_order_summaries(orders) -> int:
+    """Upsert summaries of the given orders"""
+    rows = list(orders.values_list("id", "user_id", "created_at"))
+    entries = ticket_entries(
+        Ticket.objects.filter(order_id__in=[row[0] for row in rows])
+        .order_by("order_id", "cargo", "seat")
+        .values_list(*TICKET_FIELDS)
+    )
+    OrderSummary.objects.bulk_create(
+        [
+            OrderSummary(
+                order_id=order_id,
+                user_id=user_id,
+                created_at=created_at,
+                tickets=entries.get(order_id, []),
+            )
+            for order_id, user_id, created_at in rows
+        ],
+        update_conflicts=True,
+        unique_fields=["order"],
+        update_fields=["tickets"],
+    )
+    return len(rows)
+
+
+def record_order_summaries(order_ids: Iterable[int]) -> int:
+    return write_order_summaries(
+        Order.objects.filter(id__in=order_ids).order_by()
+    )
+
+
+class _OrderIds(set):
+    pass
+
+
+# Ids waiting for the commit of each connection's transaction. Only the
+# queued flush holds a batch, so a rollback that discards the flush
+# drops the batch with it and the next refresh starts a new one.
+_pending = weakref.WeakKeyDictionary()
+
+
+def refresh_order_summaries(order_ids: Iterable[int]) -> None:
+    """Rewrite summaries of the orders once the transaction commits.
+
+    Calls within one transaction share a single flush, so deleting a
+    journey recomputes each affected order once, not once per ticket.
+    """
+    connection = transaction.get_connection()
+    pending = _pending.get(connection)
+    batch = pending() if pending is not None else None
+    if batch is not None:
+        batch.update(order_ids)
+        return
+
+    batch = _OrderIds(order_ids)
+    _pending[connection] = pending = weakref.ref(batch)
+
+    def flush():
+        if _pending.get(connection) is pending:
+            del _pending[connection]
+        record_order_summaries(batch)
+
+    transaction.on_commit(flush)
+
+
+def refresh_journey_orders(journey_id: int) -> int:
+    """Rewrite summaries of orders holding tickets for a changed journey"""
+    return record_order_summaries(
+        Ticket.objects.filter(journey_id=journey_id).values("order_id")
+    )
+
+
+def rebuild_order_history(batch_size: int = 1000) -> int:
+    order_ids = (
+        Order.objects.order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    written = 0
+    while batch := list(islice(order_ids, batch_size)):
+        with transaction.atomic():
+            written += write_order_summaries(
+                Order.objects.filter(id__in=batch).order_by()
+            )
+    return written
+
+
+def attach_tickets_available(summaries: list[OrderSummary]) -> None:
+    """Fill in live seat availability with one query for the whole page"""
+    journeys = [
+        ticket["journey"]
+        for summary in summaries
+        for ticket in summary.tickets
+    ]
+    sold = dict(
+        JourneyInventory.objects.filter(
+            journey_id__in={journey["id"] for journey in journeys}
+        ).values_list("journey_id", "tickets_sold")
+    )
+    for journey in journeys:
+        journey["tickets_available"] = (
+            journey["train_capacity"] - sold.get(journey["id"], 0)
+        )
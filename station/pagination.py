@@ -0,0 +1,109 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class JourneyKeysetPagination(BasePagination):
+    """Cursor pagination seeking on (departure_time, id).
+
+    Each page is a range read starting right after the last row of the
+    previous one, so deep pages cost the same as the first.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            departure_time, pk = json.loads(urlsafe_b64decode(encoded))
+            if type(pk) is not int or not 0 < pk < 2 ** 63:
+                raise ValueError("Cursor id out of range")
+            return datetime.fromisoformat(departure_time), pk
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_cursor(position) -> str:
+        departure_time, pk = position
+        raw = json.dumps([departure_time.isoformat(), pk])
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def get_position(row):
+        if isinstance(row, dict):
+            return row["departure_time"], row["id"]
+        return row.departure_time, row.id
+
+    def get_page_queryset(self, queryset, request):
+        """Lazy queryset for one page plus a single look-ahead row"""
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        queryset = queryset.order_by("departure_time", "id")
+        position = self.decode_cursor(request)
+        if position is not None:
+            departure_time, pk = position
+            queryset = queryset.filter(
+                Q(departure_time__gt=departure_time)
+                | Q(departure_time=departure_time, id__gt=pk)
+            )
+        return queryset[:self.page_size_value + 1]
+
+    def build_page(self, rows):
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.next_position = (
+            self.get_position(rows[-1]) if self.has_next else None
+        )
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.build_page(
+            list(self.get_page_queryset(queryset, request))
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
@@ -0,0 +1,198 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from station.models import Journey
+
+
+class Connection(NamedTuple):
+    """One journey as an edge of the timetable, times as POSIX seconds"""
+    departure: float
+    journey_id: int
+    arrival: float
+    source_id: int
+    destination_id: int
+
+
+class Timetable:
+    """Journeys departing in [since, until) sorted for connection scans"""
+
+    def __init__(self, rows, since: datetime, until: datetime):
+        self.since = since
+        self.until = until
+        self.connections = sorted(
+            Connection(
+                departure.timestamp(),
+                journey_id,
+                arrival.timestamp(),
+                source_id,
+                destination_id,
+            )
+            for journey_id, source_id, destination_id, departure, arrival
+            in rows
+            if arrival >= departure
+        )
+        self.by_journey = {
+            connection.journey_id: connection
+            for connection in self.connections
+        }
+        self.lock = threading.Lock()
+
+    def remove(self, journey_id: int) -> None:
+        with self.lock:
+            connection = self.by_journey.pop(journey_id, None)
+            if connection is not None:
+                index = bisect_left(self.connections, connection)
+                del self.connections[index]
+
+    def update(self, journey_id, source_id, destination_id,
+               departure: datetime, arrival: datetime) -> None:
+        self.remove(journey_id)
+        if arrival < departure or not self.since <= departure < self.until:
+            return
+        connection = Connection(
+            departure.timestamp(),
+            journey_id,
+            arrival.timestamp(),
+            source_id,
+            destination_id,
+        )
+        with self.lock:
+            insort(self.connections, connection)
+            self.by_journey[journey_id] = connection
+
+    def earliest_arrival(self, source_id: int, destination_id: int,
+                         departure_after: datetime,
+                         min_transfer: timedelta) -> Optional[list[int]]:
+        """Journey ids of the earliest arriving itinerary, or None.
+
+        A single pass over connections departing after the start time;
+        changing trains at a station needs at least min_transfer.
+        """
+        start = departure_after.timestamp()
+        transfer = min_transfer.total_seconds()
+        earliest = {source_id: start}
+        reached_by = {}
+        with self.lock:
+            first = bisect_left(self.connections, (start,))
+            for index in range(first, len(self.connections)):
+                connection = self.connections[index]
+                if connection.departure >= earliest.get(
+                    destination_id, float("inf")
+                ):
+                    break
+                reached = earliest.get(connection.source_id)
+                if reached is None:
+                    continue
+                if connection.source_id != source_id:
+                    reached += transfer
+                if connection.departure < reached:
+                    continue
+                if connection.arrival < earliest.get(
+                    connection.destination_id, float("inf")
+                ):
+                    earliest[connection.destination_id] = connection.arrival
+                    reached_by[connection.destination_id] = connection
+
+        if destination_id not in reached_by or source_id == destination_id:
+            return None
+        legs = []
+        station_id = destination_id
+        while station_id != source_id:
+            connection = reached_by[station_id]
+            legs.append(connection.journey_id)
+            station_id = connection.source_id
+        return legs[::-1]
+
+
+_timetable = None
+_timetable_built_at = 0.0
+_timetable_lock = threading.Lock()
+
+
+def timetable_window() -> tuple[datetime, datetime]:
+    """Departures the planner loads, as [since, until) around now"""
+    now = timezone.now()
+    return (
+        now - timedelta(days=settings.TIMETABLE_PAST_DAYS),
+        now + timedelta(days=settings.TIMETABLE_FUTURE_DAYS),
+    )
+
+
+def load_timetable() -> Timetable:
+    since, until = timetable_window()
+    return Timetable(
+        Journey.objects.filter(
+            departure_time__gte=since, departure_time__lt=until
+        )
+        .values_list(
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "arrival_time",
+        )
+        .iterator(),
+        since,
+        until,
+    )
+
+
+def get_timetable() -> Timetable:
+    """Return the process timetable, reloading it when stale or dropped"""
+    global _timetable, _timetable_built_at
+    timetable = _timetable
+    if (
+        timetable is not None
+        and time.monotonic() - _timetable_built_at < settings.TIMETABLE_TTL
+    ):
+        return timetable
+    with _timetable_lock:
+        if _timetable is timetable:
+            _timetable = load_timetable()
+            _timetable_built_at = time.monotonic()
+        return _timetable
+
+
+def refresh_journey(journey_id: int) -> None:
+    """Re-read a saved journey into the loaded timetable, if any"""
+    if _timetable is None:
+        return
+    row = (
+        Journey.objects.filter(pk=journey_id)
+        .values_list(
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "arrival_time",
+        )
+        .first()
+    )
+    if row is None:
+        _timetable.remove(journey_id)
+    else:
+        _timetable.update(*row)
+
+
+def forget_journey(journey_id: int) -> None:
+    if _timetable is not None:
+        _timetable.remove(journey_id)
+
+
+def invalidate_timetable() -> None:
+    global _timetable
+    _timetable = None
+
+
+def find_itinerary(source_id: int, destination_id: int,
+                   departure_after: datetime,
+                   min_transfer: timedelta) -> Optional[list[int]]:
+    return get_timetable().earliest_arrival(
+        source_id, destination_id, departure_after, min_transfer
+    )
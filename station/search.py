@@ -0,0 +1,133 @@
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Iterable
+
+from django.conf import settings
+
+from station.models import Station
+
+
+def normalize_name(value: str) -> str:
+    """Casefold a name, drop accents and collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(value: str) -> set[str]:
+    """Trigrams of every word padded the way pg_trgm does it"""
+    grams = set()
+    for word in value.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class StationNameIndex:
+    """In-memory trigram index over normalized station names"""
+
+    def __init__(self, stations: Iterable[tuple[int, str]]):
+        self.names = {}
+        self.postings = defaultdict(set)
+        for station_id, name in stations:
+            normalized = normalize_name(name)
+            self.names[station_id] = normalized
+            for gram in trigrams(normalized):
+                self.postings[gram].add(station_id)
+
+    def _candidates(self, grams: set[str]) -> set[int]:
+        postings = sorted(
+            (self.postings.get(gram, set()) for gram in grams), key=len
+        )
+        if not postings:
+            return set()
+        return set.intersection(*postings)
+
+    def contains(self, query: str) -> set[int]:
+        """Ids of stations whose name contains the query"""
+        if len(query) < 3:
+            return {
+                station_id
+                for station_id, name in self.names.items()
+                if query in name
+            }
+        # Inner trigrams of the query appear in every name containing it
+        inner = {
+            query[i:i + 3]
+            for i in range(len(query) - 2)
+            if " " not in query[i:i + 3]
+        }
+        candidates = self._candidates(inner) if inner else self.names.keys()
+        return {
+            station_id
+            for station_id in candidates
+            if query in self.names[station_id]
+        }
+
+    def similar(self, query: str, threshold: float) -> set[int]:
+        """Ids of stations sharing enough trigrams with the query"""
+        grams = trigrams(query)
+        if not grams:
+            return set()
+        hits = defaultdict(int)
+        for gram in grams:
+            for station_id in self.postings.get(gram, ()):
+                hits[station_id] += 1
+        return {
+            station_id
+            for station_id, count in hits.items()
+            if count / len(grams) >= threshold
+        }
+
+    def search(self, query: str) -> set[int]:
+        """Substring and prefix matches, falling back to fuzzy ones"""
+        normalized = normalize_name(query)
+        if not normalized:
+            return set()
+        found = self.contains(normalized)
+        if found:
+            return found
+        return self.similar(
+            normalized, settings.STATION_SEARCH_SIMILARITY
+        )
+
+
+_index = None
+_index_built_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_station_index() -> StationNameIndex:
+    """Return the process index, rebuilding it when stale or invalidated"""
+    global _index, _index_built_at
+    index = _index
+    if (
+        index is not None
+        and time.monotonic() - _index_built_at
+        < settings.STATION_SEARCH_INDEX_TTL
+    ):
+        return index
+    with _index_lock:
+        # Another thread may have rebuilt or invalidated it meanwhile
+        current = _index
+        if current is index or current is None:
+            current = StationNameIndex(
+                Station.objects.values_list("id", "name").iterator()
+            )
+            _index = current
+            _index_built_at = time.monotonic()
+        return current
+
+
+def invalidate_station_index() -> None:
+    global _index
+    _index = None
+
+
+def find_station_ids(query: str) -> set[int]:
+    """Resolve a free-text station name to matching station ids"""
+    return get_station_index().search(query)
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import logging
+import weakref
+from itertools import islice
+from typing import Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    close_old_connections,
+    connections,
+    transaction,
+)
+
+from station.seat_map import build_seat_map
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "seat_events"
+# NOTIFY payloads are limited to 8000 bytes, a seat takes at most ~30
+SEATS_PER_NOTIFY = 200
+
+
+def _load_seat_map(journey) -> dict[str, str]:
+    # Runs in a pool thread, outside any request managing its connection
+    close_old_connections()
+    try:
+        return build_seat_map(journey)
+    finally:
+        close_old_connections()
+
+
+class Subscription:
+    def __init__(self, journey_id: int, size: int):
+        self.journey_id = journey_id
+        self.queue: asyncio.Queue[Optional[dict]] = asyncio.Queue(size)
+
+    async def get(self) -> Optional[dict]:
+        """Next change, None once the stream has to start over"""
+        return await self.queue.get()
+
+    def end(self) -> None:
+        """Make the subscriber stop after the changes it already has"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class SeatEventBroker:
+    """Fans seat changes out to the subscribers of each journey.
+
+    Subscribers live on the event loop of the ASGI server, one queue
+    each, grouped by journey; a change published from any thread makes
+    one hop onto that loop, however many clients follow the journey.
+    A subscriber that falls SEAT_EVENTS_QUEUE_SIZE changes behind is
+    dropped and reconnects to a fresh snapshot.
+    """
+
+    def __init__(self):
+        self.journeys: dict[int, set[Subscription]] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.listener: Optional[asyncio.Task] = None
+        self.listening = asyncio.Event()
+        self.snapshots: dict[int, asyncio.Future] = {}
+
+    def subscribe(self, journey_id: int) -> Subscription:
+        self.loop = asyncio.get_running_loop()
+        if connections[DEFAULT_DB_ALIAS].vendor == "postgresql":
+            self.start_listener()
+        subscription = Subscription(
+            journey_id, settings.SEAT_EVENTS_QUEUE_SIZE
+        )
+        self.journeys.setdefault(journey_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self.journeys.get(subscription.journey_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self.journeys[subscription.journey_id]
+
+    @property
+    def subscribers(self) -> int:
+        return sum(map(len, self.journeys.values()))
+
+    def publish(self, journey_id: int, change: dict) -> None:
+        """Deliver a change to this process's subscribers, from any thread"""
+        loop = self.loop
+        if loop is None or (
+            journey_id not in self.journeys
+            and journey_id not in self.snapshots
+        ):
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.fan_out(journey_id, change)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self.fan_out, journey_id, change)
+
+    def fan_out(self, journey_id: int, change: dict) -> None:
+        self.snapshots.pop(journey_id, None)
+        for subscription in list(self.journeys.get(journey_id, ())):
+            try:
+                subscription.queue.put_nowait(change)
+            except asyncio.QueueFull:
+                self.unsubscribe(subscription)
+                subscription.end()
+
+    def relay(self, payload: str) -> None:
+        """Fan out a change received as a NOTIFY payload"""
+        message = json.loads(payload)
+        self.fan_out(message.pop("journey"), message)
+
+    def end_all(self) -> None:
+        for subscribers in list(self.journeys.values()):
+            for subscription in subscribers:
+                subscription.end()
+        self.journeys.clear()
+        self.snapshots.clear()
+
+    async def snapshot(self, journey) -> dict[str, str]:
+        """Seat map for a new subscriber, read once for concurrent ones.
+
+        A load is only shared until the next change of its journey, so
+        nobody gets a map read before a change they were not sent. It
+        skips the seat map cache, which is only dropped after commit.
+        """
+        load = self.snapshots.get(journey.id)
+        if load is None:
+            load = asyncio.ensure_future(
+                sync_to_async(_load_seat_map, thread_sensitive=False)(journey)
+            )
+            self.snapshots[journey.id] = load
+            load.add_done_callback(
+                lambda _: self.forget_snapshot(journey.id, load)
+            )
+        return await asyncio.shield(load)
+
+    def forget_snapshot(self, journey_id: int, load: asyncio.Future) -> None:
+        if self.snapshots.get(journey_id) is load:
+            del self.snapshots[journey_id]
+
+    async def ready(self) -> None:
+        """Wait a little for the listener, so a snapshot misses nothing"""
+        if self.listener is None:
+            return
+        try:
+            await asyncio.wait_for(
+                self.listening.wait(), settings.SEAT_EVENTS_RECONNECT
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    def start_listener(self) -> None:
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self) -> None:
+        """Relay NOTIFYs of every process from one connection per process"""
+        import psycopg
+
+        params = connections[DEFAULT_DB_ALIAS].settings_dict
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    dbname=params["NAME"],
+                    user=params["USER"],
+                    password=params["PASSWORD"],
+                    host=params["HOST"],
+                    port=params["PORT"] or None,
+                    autocommit=True,
+                ) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    self.listening.set()
+                    async for notify in conn.notifies():
+                        self.relay(notify.payload)
+            except psycopg.Error:
+                logger.exception("Listening for seat events failed")
+            self.listening.clear()
+            # Changes may have been missed, streams restart from snapshots
+            self.end_all()
+            await asyncio.sleep(settings.SEAT_EVENTS_RECONNECT)
+
+
+broker = SeatEventBroker()
+
+
+def _chunks(seats, size: int) -> Iterable[list]:
+    seats = iter(seats)
+    while chunk := list(islice(seats, size)):
+        yield chunk
+
+
+def seat_changes(seats: dict[tuple[int, int], str]) -> list[dict]:
+    """Changes of at most SEATS_PER_NOTIFY seats from "taken"/"released"
+    flags by (cargo, seat)
+    """
+    changes = []
+    for chunk in _chunks(seats.items(), SEATS_PER_NOTIFY):
+        change = {"taken": [], "released": []}
+        for (cargo, seat), kind in chunk:
+            change[kind].append({"cargo": cargo, "seat": seat})
+        changes.append(change)
+    return changes
+
+
+def notify_payloads(journeys: dict[int, dict]) -> list[str]:
+    return [
+        json.dumps({"journey": journey_id, **change})
+        for journey_id, seats in journeys.items()
+        for change in seat_changes(seats)
+    ]
+
+
+def _send_seat_changes(journeys: dict[int, dict]) -> None:
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor != "postgresql":
+        for journey_id, seats in journeys.items():
+            for change in seat_changes(seats):
+                broker.publish(journey_id, change)
+        return
+    payloads = notify_payloads(journeys)
+    if payloads:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, payload) "
+                "FROM unnest(%s::text[]) AS payload",
+                [CHANNEL, payloads],
+            )
+
+
+class _PendingChanges(dict):
+    pass
+
+
+# Seat flags by journey waiting for the commit of each connection's
+# transaction; only the queued send holds them, so a rollback that
+# discards it drops them too
+_pending = weakref.WeakKeyDictionary()
+
+
+def publish_seat_changes(journey_id: int, taken=(), released=()) -> None:
+    """Announce (cargo, seat) pairs taken or released in this transaction.
+
+    Changes collect per journey, the last one of a seat winning, and are
+    sent once the transaction commits: one change per journey, even for
+    a cascade deleting many tickets. On PostgreSQL they go out as
+    NOTIFYs, after the commit so that committing bookings do not queue
+    on the server's notification lock, to the listener of every
+    process; otherwise they reach this process's subscribers.
+    """
+    connection = transaction.get_connection()
+    pending = _pending.get(connection)
+    journeys = pending() if pending is not None else None
+    queue = journeys is None
+    if queue:
+        journeys = _PendingChanges()
+        _pending[connection] = pending = weakref.ref(journeys)
+
+    seats = journeys.setdefault(journey_id, {})
+    for cargo, seat in taken:
+        seats[cargo, seat] = "taken"
+    for cargo, seat in released:
+        seats[cargo, seat] = "released"
+
+    if queue:
+        def send():
+            if _pending.get(connection) is pending:
+                del _pending[connection]
+            _send_seat_changes(journeys)
+
+        transaction.on_commit(send)
@@ -0,0 +1,95 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from station.models import Journey, Ticket
+
+
+def seat_map_generation_key(journey_id: int) -> str:
+    return f"journey-seat-map-generation:{journey_id}"
+
+
+def seat_map_cache_key(journey_id: int, generation: int) -> str:
+    return f"journey-seat-map:{journey_id}:{generation}"
+
+
+def _new_generation() -> int:
+    # Never reuses the number of a generation the cache has evicted
+    return time.time_ns()
+
+
+def _taken_seats_query(journey: Journey):
+    return (
+        Ticket.objects.filter(journey_id=journey.id)
+        .order_by()
+        .values_list("cargo", "seat")
+    )
+
+
+def _render_seat_map(journey: Journey, taken_seats) -> dict[str, str]:
+    train = journey.train
+    cargos = {
+        cargo: bytearray(b"0" * train.places_in_cargo)
+        for cargo in range(1, train.cargo_num + 1)
+    }
+    for cargo, seat in taken_seats:
+        seats = cargos.setdefault(
+            cargo, bytearray(b"0" * train.places_in_cargo)
+        )
+        seats[seat - 1] = ord("1")
+    return {
+        str(cargo): seats.decode() for cargo, seats in sorted(cargos.items())
+    }
+
+
+def build_seat_map(journey: Journey) -> dict[str, str]:
+    """Occupancy per cargo as a string with one "0"/"1" flag per seat"""
+    return _render_seat_map(journey, _taken_seats_query(journey))
+
+
+def get_seat_map(journey: Journey) -> dict[str, str]:
+    """Cached map of the journey's current generation.
+
+    A map built while a booking commits is stored under the generation
+    it was read in, which invalidate_seat_maps has already left behind.
+    """
+    generation = cache.get_or_set(
+        seat_map_generation_key(journey.id), _new_generation, None
+    )
+    key = seat_map_cache_key(journey.id, generation)
+    seat_map = cache.get(key)
+    if seat_map is None:
+        seat_map = build_seat_map(journey)
+        cache.set(key, seat_map, settings.SEAT_MAP_CACHE_TIMEOUT)
+    return seat_map
+
+
+async def aget_seat_map(journey: Journey) -> dict[str, str]:
+    generation = await cache.aget_or_set(
+        seat_map_generation_key(journey.id), _new_generation, None
+    )
+    key = seat_map_cache_key(journey.id, generation)
+    seat_map = await cache.aget(key)
+    if seat_map is None:
+        seat_map = _render_seat_map(
+            journey, [row async for row in _taken_seats_query(journey)]
+        )
+        await cache.aset(key, seat_map, settings.SEAT_MAP_CACHE_TIMEOUT)
+    return seat_map
+
+
+def _next_generations(journey_ids) -> None:
+    for journey_id in journey_ids:
+        key = seat_map_generation_key(journey_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_generation(), None)
+
+
+def invalidate_seat_maps(journey_ids) -> None:
+    """Move the journeys to a new generation once the transaction commits"""
+    journey_ids = set(journey_ids)
+    transaction.on_commit(lambda: _next_generations(journey_ids))
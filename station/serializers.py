@@ -1,7 +1,9 @@
 from django.db import transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from station.booking import create_order_tickets, hold_seats
 from station.models import (
     Station,
     TrainType,
@@ -11,7 +13,10 @@ from station.models import (
     Journey,
     Ticket,
     Order,
+    OrderSummary,
+    SeatHold,
 )
+from station.seat_map import get_seat_map
 
 
 class StationSerializer(serializers.ModelSerializer):
@@ -21,6 +26,14 @@ class StationSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "latitude", "longitude")
 
 
+class NearbyStationSerializer(StationSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Station
+        fields = ("id", "name", "latitude", "longitude", "distance")
+
+
 class RouteSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -76,16 +89,42 @@ class TrainListSerializer(TrainSerializer):
 
 
 class CrewSerializer(serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Crew
-        fields = ("id", "first_name", "last_name", "image")
+        fields = (
+            "id",
+            "first_name",
+            "last_name",
+            "image",
+            "image_status",
+            "image_variants",
+        )
+
+    @extend_schema_field(
+        {
+            "type": "object",
+            "additionalProperties": {"type": "string", "format": "uri"},
+        }
+    )
+    def get_image_variants(self, obj):
+        """Resized copies of the image by name, once they are rendered"""
+        storage = Crew.image.field.storage
+        request = self.context.get("request")
+        urls = {}
+        for variant, name in obj.image_variants.items():
+            url = storage.url(name)
+            urls[variant] = (
+                request.build_absolute_uri(url) if request else url
+            )
+        return urls
 
 
 class CrewImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
-        fields = ("id", "image")
+        fields = ("id", "image", "image_status")
 
 
 class JourneySerializer(serializers.ModelSerializer):
@@ -130,6 +169,13 @@ class JourneyListSerializer(JourneySerializer):
         )
 
 
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    transfers = serializers.IntegerField(read_only=True)
+    legs = JourneyListSerializer(many=True, read_only=True)
+
+
 class TakenSeatsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
@@ -161,7 +207,46 @@ class JourneyDetailSerializer(JourneySerializer):
         )
 
 
+class JourneySeatMapSerializer(JourneyDetailSerializer):
+    seat_map = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Journey
+        fields = (
+            "id",
+            "route",
+            "train",
+            "departure_time",
+            "arrival_time",
+            "crew",
+            "seat_map"
+        )
+
+    @extend_schema_field(
+        {"type": "object", "additionalProperties": {"type": "string"}}
+    )
+    def get_seat_map(self, obj):
+        """Per cargo, one "1" (taken) or "0" (free) character per seat"""
+        if "seat_map" in self.context:
+            return self.context["seat_map"]
+        return get_seat_map(obj)
+
+
+class JourneyPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """Journey lookup that reuses journeys preloaded by the parent order"""
+
+    def to_internal_value(self, data):
+        journeys = self.context.get("journeys") or {}
+        try:
+            return journeys[int(data)]
+        except (KeyError, TypeError, ValueError):
+            return super().to_internal_value(data)
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    journey = JourneyPrimaryKeyField(
+        queryset=Journey.objects.select_related("train")
+    )
 
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
@@ -176,6 +261,8 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "cargo", "seat", "journey")
+        # Taken seats are checked for the whole order at once on create
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -189,14 +276,75 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "created_at", "tickets")
 
+    def to_internal_value(self, data):
+        tickets = data.get("tickets") if hasattr(data, "get") else None
+        if isinstance(tickets, list):
+            journey_ids = {
+                int(ticket["journey"])
+                for ticket in tickets
+                if isinstance(ticket, dict)
+                and str(ticket.get("journey")).isdigit()
+            }
+            self.context["journeys"] = (
+                Journey.objects.select_related("train").in_bulk(journey_ids)
+            )
+        return super().to_internal_value(data)
+
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            create_order_tickets(order, tickets_data)
             return order
 
 
-class OrderListSerializer(OrderSerializer):
-    tickets = TicketListSerializer(many=True, read_only=True)
+@extend_schema_field(TicketListSerializer(many=True))
+class OrderHistoryTicketsField(serializers.JSONField):
+    pass
+
+
+class OrderListSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="order_id", read_only=True)
+    tickets = OrderHistoryTicketsField(read_only=True)
+
+    class Meta:
+        model = OrderSummary
+        fields = ("id", "created_at", "tickets")
+        read_only_fields = ("created_at",)
+
+
+class SeatHoldListSerializer(serializers.ListSerializer):
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("allow_empty", False)
+        super().__init__(*args, **kwargs)
+
+    def create(self, validated_data):
+        return hold_seats(validated_data[0]["user"], validated_data)
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    journey = JourneyPrimaryKeyField(
+        queryset=Journey.objects.select_related("train")
+    )
+
+    def validate(self, attrs):
+        data = super(SeatHoldSerializer, self).validate(attrs=attrs)
+        Ticket.validate_ticket(
+            attrs["seat"],
+            attrs["cargo"],
+            attrs["journey"].train,
+            ValidationError
+        )
+        return data
+
+    def create(self, validated_data):
+        return hold_seats(validated_data["user"], [validated_data])[0]
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "journey", "cargo", "seat", "expires_at")
+        read_only_fields = ("expires_at",)
+        list_serializer_class = SeatHoldListSerializer
+        # Seats are checked against tickets and other holds under a lock
+        validators = []
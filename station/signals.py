@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from station.distances import recompute_route_distances
+from station.inventory import record_tickets_released, record_tickets_sold
+from station.models import Journey, Route, Station, Ticket, Train, TrainType
+from station.order_history import (
+    refresh_journey_orders,
+    refresh_order_summaries,
+)
+from station.planner import (
+    forget_journey,
+    invalidate_timetable,
+    refresh_journey,
+)
+from station.search import invalidate_station_index
+from station.seat_events import publish_seat_changes
+from station.seat_map import invalidate_seat_maps
+from station.versions import bump_versions
+
+
+@receiver(post_save, sender=Ticket)
+def take_ticket_seat(sender, instance, created, **kwargs):
+    # Bookings insert in bulk, without signals; this covers single tickets
+    if not created:
+        return
+    record_tickets_sold([instance.journey_id])
+    invalidate_seat_maps([instance.journey_id])
+    publish_seat_changes(
+        instance.journey_id, taken=[(instance.cargo, instance.seat)]
+    )
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    record_tickets_released([instance.journey_id])
+    invalidate_seat_maps([instance.journey_id])
+    publish_seat_changes(
+        instance.journey_id, released=[(instance.cargo, instance.seat)]
+    )
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def refresh_order_summary(sender, instance, **kwargs):
+    # Bookings write summaries themselves, this covers single ticket edits
+    refresh_order_summaries([instance.order_id])
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def refresh_station_index(sender, **kwargs):
+    transaction.on_commit(invalidate_station_index)
+
+
+@receiver(post_save, sender=Station)
+def refresh_route_distances(sender, instance, created, **kwargs):
+    if not created:
+        recompute_route_distances([instance.id])
+
+
+@receiver(post_save, sender=Journey)
+def refresh_timetable_journey(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_journey(instance.id))
+
+
+@receiver(post_save, sender=Journey)
+def refresh_journey_order_summaries(sender, instance, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: refresh_journey_orders(instance.id))
+
+
+@receiver(post_delete, sender=Journey)
+def remove_timetable_journey(sender, instance, **kwargs):
+    journey_id = instance.id
+    transaction.on_commit(lambda: forget_journey(journey_id))
+
+
+@receiver(post_save, sender=Route)
+def refresh_timetable_routes(sender, created, **kwargs):
+    if not created:
+        invalidate_timetable()
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=TrainType)
+@receiver(post_delete, sender=TrainType)
+@receiver(post_save, sender=Train)
+@receiver(post_delete, sender=Train)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def bump_model_version(sender, **kwargs):
+    bump_versions(sender)
@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket
+from station.tests.test_journey_view_set import (
+    journey_detail_url,
+    test_crew,
+    test_journey,
+)
+
+ASYNC_JOURNEY_URL = reverse("station:async-journey-list")
+JOURNEY_URL = reverse("station:journey-list")
+ASYNC_STATION_URL = reverse("station:async-station-list")
+STATION_URL = reverse("station:station-list")
+
+
+def async_journey_detail_url(journey_id: int):
+    return reverse("station:async-journey-detail", args=(journey_id,))
+
+
+class UnauthenticatedAsyncViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        journey = test_journey()
+
+        for url in (
+            ASYNC_JOURNEY_URL,
+            ASYNC_STATION_URL,
+            async_journey_detail_url(journey.id),
+        ):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertIn("WWW-Authenticate", res.headers)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey = test_journey()
+        self.journey.crew.add(test_crew())
+        Ticket.objects.create(
+            journey=self.journey,
+            order=Order.objects.create(user=self.user),
+            cargo=1,
+            seat=4,
+        )
+        test_journey(departure_time="2025-01-06 10:00:00")
+
+    def assertSameResponse(self, async_url, sync_url, params=None):
+        async_res = self.client.get(async_url, params)
+        sync_res = self.client.get(sync_url, params)
+
+        self.assertEqual(async_res.status_code, sync_res.status_code)
+        self.assertEqual(
+            async_res.content.replace(b"/async/", b"/"), sync_res.content
+        )
+        return async_res
+
+    def test_journey_list(self):
+        res = self.assertSameResponse(
+            ASYNC_JOURNEY_URL, JOURNEY_URL, {"page_size": 1}
+        )
+
+        self.assertIsNotNone(res.json()["next"])
+
+    def test_journey_list_filters(self):
+        self.assertSameResponse(
+            ASYNC_JOURNEY_URL,
+            JOURNEY_URL,
+            {"date": "2025-01-05", "source_name": "Kharkiv"},
+        )
+
+    def test_journey_list_invalid_filter(self):
+        res = self.assertSameResponse(
+            ASYNC_JOURNEY_URL, JOURNEY_URL, {"date": "tomorrow"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_journey_detail(self):
+        res = self.assertSameResponse(
+            async_journey_detail_url(self.journey.id),
+            journey_detail_url(self.journey.id),
+        )
+
+        self.assertEqual(len(res.json()["taken_seats"]), 1)
+
+    def test_journey_detail_seat_map(self):
+        self.assertSameResponse(
+            async_journey_detail_url(self.journey.id),
+            journey_detail_url(self.journey.id),
+            {"seats": "compact"},
+        )
+
+    def test_journey_detail_not_found(self):
+        res = self.assertSameResponse(
+            async_journey_detail_url(0), journey_detail_url(0)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_station_list(self):
+        self.assertSameResponse(ASYNC_STATION_URL, STATION_URL)
+
+    def test_station_list_validators(self):
+        res = self.client.get(ASYNC_STATION_URL)
+        self.assertIn("ETag", res)
+        self.assertEqual(res["Cache-Control"], "private, no-cache")
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(ASYNC_STATION_URL)
+            not_modified = self.client.get(
+                ASYNC_STATION_URL, headers={"If-None-Match": res["ETag"]}
+            )
+
+        self.assertEqual(cached.content, res.content)
+        self.assertEqual(cached["ETag"], res["ETag"])
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_read_only(self):
+        res = self.client.post(ASYNC_STATION_URL, {})
+
+        self.assertEqual(
+            res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
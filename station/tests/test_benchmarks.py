@@ -0,0 +1,138 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Sum
+from django.test import TestCase
+
+from station.benchmarks import SCENARIOS, find_regressions, seed_data
+from station.models import (
+    Journey,
+    JourneyInventory,
+    Order,
+    OrderSummary,
+    Station,
+    Ticket,
+)
+
+SEED_OPTIONS = {
+    "stations": 12,
+    "routes": 20,
+    "trains": 4,
+    "crews": 10,
+    "journeys": 30,
+    "users": 5,
+    "days": 5,
+}
+
+
+def journey_snapshot():
+    return list(
+        Journey.objects.order_by("id").values_list(
+            "route__source__name",
+            "route__destination__name",
+            "train__name",
+            "departure_time",
+            "arrival_time",
+        )
+    )
+
+
+class SeedDataTests(TestCase):
+    def test_seed_creates_consistent_bookings(self):
+        counts = seed_data(**SEED_OPTIONS)
+
+        self.assertEqual(Station.objects.count(), 12)
+        self.assertEqual(counts["journeys"], Journey.objects.count())
+        self.assertEqual(counts["tickets"], Ticket.objects.count())
+        self.assertEqual(
+            JourneyInventory.objects.aggregate(
+                sold=Sum("tickets_sold")
+            )["sold"],
+            counts["tickets"],
+        )
+        self.assertEqual(OrderSummary.objects.count(), counts["orders"])
+        self.assertTrue(
+            get_user_model().objects.get(
+                email="benchmark-0@example.com"
+            ).is_staff
+        )
+
+    def test_same_seed_generates_same_data(self):
+        savepoint = transaction.savepoint()
+        seed_data(seed=3, **SEED_OPTIONS)
+        first = journey_snapshot()
+        transaction.savepoint_rollback(savepoint)
+
+        seed_data(seed=3, **SEED_OPTIONS)
+
+        self.assertEqual(journey_snapshot(), first)
+
+
+class RunBenchmarksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed_data(**SEED_OPTIONS)
+        self.directory = tempfile.TemporaryDirectory()
+        self.baseline = Path(self.directory.name) / "baseline.json"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_benchmarks(self, *args) -> str:
+        output = StringIO()
+        call_command(
+            "run_benchmarks", "--requests", "2", "--warmup", "1", *args,
+            stdout=output,
+        )
+        return output.getvalue()
+
+    def test_saves_baseline_and_removes_created_orders(self):
+        orders = Order.objects.count()
+
+        self.run_benchmarks("--save-baseline", str(self.baseline))
+
+        results = json.loads(self.baseline.read_text())["scenarios"]
+        self.assertEqual(list(results), list(SCENARIOS))
+        for summary in results.values():
+            self.assertGreater(summary["queries"], 0)
+            self.assertGreater(summary["p50_ms"], 0)
+        self.assertEqual(Order.objects.count(), orders)
+
+    def test_fails_on_query_regression(self):
+        self.run_benchmarks(
+            "--scenario", "journey_detail",
+            "--save-baseline", str(self.baseline),
+        )
+        baseline = json.loads(self.baseline.read_text())
+        baseline["scenarios"]["journey_detail"]["queries"] -= 1
+        self.baseline.write_text(json.dumps(baseline))
+
+        with self.assertRaisesMessage(CommandError, "journey_detail: queries"):
+            self.run_benchmarks(
+                "--scenario", "journey_detail",
+                "--baseline", str(self.baseline),
+                "--tolerance", "100",
+            )
+
+
+class FindRegressionsTests(TestCase):
+    def test_respects_tolerance(self):
+        baseline = {
+            "journey_search": {"p50_ms": 10, "p95_ms": 20, "queries": 2,
+                               "rows_scanned": None},
+        }
+        results = {
+            "journey_search": {"p50_ms": 12, "p95_ms": 30, "queries": 2,
+                               "rows_scanned": 500},
+        }
+
+        self.assertEqual(
+            find_regressions(results, baseline, tolerance=0.25),
+            ["journey_search: p95_ms 20 -> 30"],
+        )
@@ -1,14 +1,19 @@
+import shutil
 import tempfile
 import os
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from station import crew_images
+from station.image_variants import VARIANTS, render_variants, variant_name
 from station.models import Crew
 
 CREW_URL = reverse("station:crew-list")
@@ -25,7 +30,18 @@ def image_upload_url(crew_id):
     return reverse("station:crew-upload-image", args=[crew_id])
 
 
-class CrewImageUploadTests(TestCase):
+class MediaRootTestCase(TestCase):
+    """Uploads and their variants go to a directory removed afterwards"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root))
+        cls.addClassCleanup(shutil.rmtree, cls.media_root)
+        super().setUpClass()
+
+
+class CrewImageUploadTests(MediaRootTestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
@@ -34,9 +50,6 @@ class CrewImageUploadTests(TestCase):
         self.client.force_authenticate(self.user)
         self.crew = test_crew()
 
-    def tearDown(self):
-        self.crew.image.delete()
-
     def test_upload_image_for_crew(self):
         """Test uploading an image to movie"""
         url = image_upload_url(self.crew.id)
@@ -47,8 +60,9 @@ class CrewImageUploadTests(TestCase):
             res = self.client.post(url, {"image": ntf}, format="multipart")
         self.crew.refresh_from_db()
 
-        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
         self.assertIn("image", res.data)
+        self.assertEqual(res.data["image_status"], "processing")
         self.assertTrue(os.path.exists(self.crew.image.path))
 
     def test_upload_image_bad_request(self):
@@ -68,3 +82,125 @@ class CrewImageUploadTests(TestCase):
         res = self.client.get(CREW_URL)
 
         self.assertIn("image", res.data[0].keys())
+
+
+@override_settings(CREW_IMAGE_WORKERS=0)
+class CrewImageVariantsTests(MediaRootTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.crew = test_crew()
+
+    def upload(self, size=(1200, 800)):
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            Image.new("RGB", size, "teal").save(ntf, format="JPEG")
+            ntf.seek(0)
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(
+                    image_upload_url(self.crew.id),
+                    {"image": ntf},
+                    format="multipart",
+                )
+        self.crew.refresh_from_db()
+        return res
+
+    def test_variants_are_rendered(self):
+        self.upload()
+
+        self.assertEqual(self.crew.image_status, Crew.ImageStatus.READY)
+        self.assertEqual(set(self.crew.image_variants), set(VARIANTS))
+        storage = self.crew.image.storage
+        for variant, (box, image_format, _) in VARIANTS.items():
+            with Image.open(
+                storage.path(self.crew.image_variants[variant])
+            ) as image:
+                self.assertEqual(image.format, image_format)
+                self.assertEqual(image.width, box[0])
+                self.assertLess(image.height, box[1])
+
+    def test_variants_are_listed_as_urls(self):
+        self.upload()
+
+        res = self.client.get(CREW_URL)
+
+        variants = res.data[0]["image_variants"]
+        self.assertEqual(res.data[0]["image_status"], "ready")
+        self.assertTrue(
+            variants["thumbnail_webp"].startswith("http://testserver/media/")
+        )
+        self.assertTrue(variants["thumbnail_webp"].endswith(".webp"))
+
+    def test_failed_rendering_is_recorded(self):
+        with mock.patch(
+            "station.crew_images.render_variants", side_effect=OSError
+        ), self.assertLogs("station.crew_images", "ERROR"):
+            self.upload()
+
+        self.assertEqual(self.crew.image_status, Crew.ImageStatus.FAILED)
+        self.assertEqual(self.crew.image_variants, {})
+
+    def test_new_upload_replaces_variants(self):
+        self.upload()
+        storage = self.crew.image.storage
+        old_variants = list(self.crew.image_variants.values())
+
+        self.upload()
+
+        for name in old_variants:
+            self.assertFalse(storage.exists(name))
+        self.assertEqual(self.crew.image_status, Crew.ImageStatus.READY)
+
+    def test_clearing_image_drops_variants(self):
+        self.upload()
+        storage = self.crew.image.storage
+        old_variants = list(self.crew.image_variants.values())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                image_upload_url(self.crew.id), {"image": None}, format="json"
+            )
+        self.crew.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.crew.image_status, "")
+        self.assertEqual(self.crew.image_variants, {})
+        for name in old_variants:
+            self.assertFalse(storage.exists(name))
+
+    def test_missing_original_is_recorded_as_failed(self):
+        self.upload()
+
+        with mock.patch.object(
+            Crew.image.field.storage, "path", side_effect=OSError
+        ), self.assertLogs("station.crew_images", "ERROR"):
+            crew_images.render_crew_image(self.crew.id, self.crew.image.name)
+        self.crew.refresh_from_db()
+
+        self.assertEqual(self.crew.image_status, Crew.ImageStatus.FAILED)
+
+
+class CrewImageProcessPoolTests(TestCase):
+    @override_settings(CREW_IMAGE_WORKERS=1)
+    def test_worker_process_renders_variants(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "crew.png")
+            Image.new("RGBA", (300, 300)).save(path)
+
+            crew_images.submit(render_variants, path).result(timeout=60)
+
+            for variant in VARIANTS:
+                self.assertTrue(os.path.exists(variant_name(path, variant)))
+
+    @override_settings(CREW_IMAGE_WORKERS=1)
+    def test_broken_pool_is_replaced(self):
+        broken = mock.Mock(**{"submit.side_effect": BrokenProcessPool})
+        with mock.patch.object(crew_images, "_executor", broken):
+            future = crew_images.submit(pow, 2, 10)
+
+            self.assertEqual(future.result(timeout=60), 1024)
+            self.assertIsNot(crew_images._executor, broken)
+            crew_images._executor.shutdown()
+        broken.shutdown.assert_called_once_with(wait=False)
@@ -0,0 +1,112 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from train_station.views import pool_stats
+
+
+class WaitForDbTests(SimpleTestCase):
+    def setUp(self):
+        self.db_conn = mock.MagicMock()
+        patcher = mock.patch(
+            "station.management.commands.wait_for_db.connections",
+            {"default": self.db_conn},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sleep = mock.patch(
+            "station.management.commands.wait_for_db.time.sleep"
+        )
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_retries_until_query_succeeds(self):
+        cursor = self.db_conn.cursor.return_value.__enter__.return_value
+        self.db_conn.cursor.side_effect = [
+            OperationalError,
+            OperationalError,
+            self.db_conn.cursor.return_value,
+        ]
+
+        call_command("wait_for_db", stdout=StringIO())
+
+        cursor.execute.assert_called_once_with("SELECT 1")
+        self.assertEqual(self.db_conn.close.call_count, 2)
+        delays = [call.args[0] for call in self.sleep.call_args_list]
+        self.assertEqual(delays, sorted(delays))
+
+    def test_gives_up_after_timeout(self):
+        self.db_conn.cursor.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", timeout=0, stdout=StringIO())
+
+
+class HealthViewTests(TestCase):
+    def test_live(self):
+        res = self.client.get(reverse("health-live"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_ready_runs_a_query(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(reverse("health-ready"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"status": "ok"})
+
+    def test_ready_reports_unavailable_database(self):
+        with mock.patch(
+            "django.db.backends.base.base.BaseDatabaseWrapper.cursor",
+            side_effect=OperationalError,
+        ):
+            res = self.client.get(reverse("health-ready"))
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @mock.patch("train_station.views.pool_stats", return_value={"idle": 1})
+    def test_pool_stats_are_for_staff(self, _):
+        staff = get_user_model().objects.create_user(
+            email="admin@admin.com", password="password", is_staff=True
+        )
+        user = get_user_model().objects.create_user(
+            email="sample@test.com", password="password"
+        )
+
+        for caller, shown in ((None, False), (user, False), (staff, True)):
+            headers = {}
+            if caller is not None:
+                token = AccessToken.for_user(caller)
+                headers["Authorization"] = f"Bearer {token}"
+            res = self.client.get(reverse("health-ready"), headers=headers)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual("pool" in res.json(), shown)
+
+        with override_settings(HEALTH_POOL_STATS=True):
+            res = self.client.get(reverse("health-ready"))
+        self.assertEqual(res.json()["pool"], {"idle": 1})
+
+    def test_pool_stats(self):
+        connection = mock.Mock()
+        connection.pool.get_stats.return_value = {
+            "pool_min": 2,
+            "pool_max": 10,
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_num": 20,
+            "requests_wait_ms": 35,
+        }
+
+        stats = pool_stats(connection)
+
+        self.assertEqual(stats["in_use"], 3)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["wait_ms"], 35)
+        self.assertEqual(stats["waiting"], 0)
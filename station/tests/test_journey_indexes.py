@@ -0,0 +1,70 @@
+import os
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from station.tests.test_journey_view_set import (
+    test_route,
+    test_station,
+    test_train,
+)
+from station.views import JourneyViewSet
+
+SEEDED_JOURNEYS = int(os.environ.get("JOURNEY_PLAN_TEST_ROWS", 1_000_000))
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Query plans are only checked on PostgreSQL",
+)
+class JourneyIndexPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        routes = [
+            test_route(
+                source=test_station(name=f"Source {i}"),
+                destination=test_station(name=f"Destination {i}"),
+            ).id
+            for i in range(50)
+        ]
+        trains = [test_train(name=f"Train {i}").id for i in range(20)]
+        cls.route_id = routes[0]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO station_journey
+                    (route_id, train_id, departure_time, arrival_time)
+                SELECT
+                    (%s::bigint[])[1 + i %% %s],
+                    (%s::bigint[])[1 + i %% %s],
+                    timestamptz '2025-01-01' + i * interval '1 minute',
+                    timestamptz '2025-01-01' + i * interval '1 minute'
+                        + interval '6 hours'
+                FROM generate_series(1, %s) AS i
+                """,
+                [routes, len(routes), trains, len(trains), SEEDED_JOURNEYS],
+            )
+            cursor.execute("ANALYZE station_journey")
+
+    def plan(self, **params) -> str:
+        view = JourneyViewSet(action="list", format_kwarg=None)
+        view.request = Request(APIRequestFactory().get("/", params))
+        view.request.user = get_user_model()(is_staff=True)
+        queryset = view.paginator.get_page_queryset(
+            view.get_queryset(), view.request
+        )
+        return queryset.explain()
+
+    def test_date_filter_uses_departure_index(self):
+        plan = self.plan(date="2025-03-01")
+
+        self.assertIn("journey_departure_id_idx", plan)
+
+    def test_route_and_date_filter_uses_composite_index(self):
+        plan = self.plan(date="2025-03-01", route=self.route_id)
+
+        self.assertIn("journey_route_departure_idx", plan)
@@ -0,0 +1,105 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.models import JourneyInventory, Order, Ticket
+from station.seat_map import get_seat_map
+from station.tests.test_journey_view_set import JOURNEY_URL, test_journey
+
+ORDER_URL = reverse("station:order-list")
+
+
+class JourneyInventoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = test_journey()
+
+    def book(self, *seats):
+        payload = {
+            "tickets": [
+                {"cargo": 1, "seat": seat, "journey": self.journey.id}
+                for seat in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, payload, format="json")
+
+    def test_order_updates_counters(self):
+        res = self.book(1, 2, 3)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        inventory = JourneyInventory.objects.get(journey=self.journey)
+        self.assertEqual(inventory.tickets_sold, 3)
+        self.assertEqual(
+            inventory.tickets_available, self.journey.train.capacity - 3
+        )
+
+    def test_journey_list_reads_counters(self):
+        self.book(1, 2)
+
+        res = self.client.get(JOURNEY_URL)
+
+        self.assertEqual(
+            res.data["results"][0]["tickets_available"],
+            self.journey.train.capacity - 2
+        )
+
+    def test_ticket_deletion_releases_seats(self):
+        self.book(1, 2)
+        self.book(3)
+
+        Order.objects.filter(tickets__seat=3).delete()
+
+        inventory = JourneyInventory.objects.get(journey=self.journey)
+        self.assertEqual(inventory.tickets_sold, 2)
+
+    def test_ticket_created_directly_takes_seat(self):
+        get_seat_map(self.journey)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(
+                journey=self.journey,
+                order=Order.objects.create(user=self.user),
+                cargo=1,
+                seat=5,
+            )
+
+        inventory = JourneyInventory.objects.get(journey=self.journey)
+        self.assertEqual(inventory.tickets_sold, 1)
+        self.assertEqual(get_seat_map(self.journey)["1"][4], "1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+
+        inventory.refresh_from_db()
+        self.assertEqual(inventory.tickets_sold, 0)
+        self.assertEqual(get_seat_map(self.journey)["1"][4], "0")
+
+    def test_journey_without_counter_row_verifies(self):
+        JourneyInventory.objects.all().delete()
+
+        call_command("rebuild_inventory", verify=True, stdout=StringIO())
+
+    def test_verify_and_rebuild_command(self):
+        self.book(1, 2)
+        JourneyInventory.objects.filter(journey=self.journey).update(
+            tickets_sold=10
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_inventory", verify=True, stdout=StringIO())
+
+        call_command("rebuild_inventory", stdout=StringIO())
+        call_command("rebuild_inventory", verify=True, stdout=StringIO())
+        inventory = JourneyInventory.objects.get(journey=self.journey)
+        self.assertEqual(inventory.tickets_sold, 2)
@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.models import Journey, Route
+from station.planner import invalidate_timetable
+from station.tests.test_journey_view_set import test_station, test_train
+
+CONNECTIONS_URL = reverse("station:journey-connections")
+
+
+class JourneyPlannerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_timetable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        self.start = timezone.now().replace(microsecond=0) + timedelta(1)
+        self.kharkiv = test_station(name="Kharkiv")
+        self.poltava = test_station(name="Poltava", latitude=49.58)
+        self.kyiv = test_station(name="Kyiv", latitude=50.45)
+        self.lviv = test_station(name="Lviv", latitude=49.83)
+        self.train = test_train()
+
+    def journey(self, source, destination, departs, arrives):
+        route = Route.objects.create(source=source, destination=destination)
+        return Journey.objects.create(
+            route=route,
+            train=self.train,
+            departure_time=self.start + timedelta(hours=departs),
+            arrival_time=self.start + timedelta(hours=arrives),
+        )
+
+    def search(self, source, destination, **params):
+        return self.client.get(
+            CONNECTIONS_URL,
+            {
+                "source": source.id,
+                "destination": destination.id,
+                "departure_after": self.start.isoformat(),
+                **params,
+            },
+        )
+
+    def leg_ids(self, res):
+        return [leg["id"] for leg in res.data["legs"]]
+
+    def test_direct_journey(self):
+        journey = self.journey(self.kharkiv, self.kyiv, 1, 6)
+
+        res = self.search(self.kharkiv, self.kyiv)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.leg_ids(res), [journey.id])
+        self.assertEqual(res.data["transfers"], 0)
+
+    def test_itinerary_with_transfers(self):
+        first = self.journey(self.kharkiv, self.poltava, 1, 3)
+        second = self.journey(self.poltava, self.kyiv, 4, 7)
+        third = self.journey(self.kyiv, self.lviv, 8, 14)
+        self.journey(self.kharkiv, self.lviv, 2, 20)
+
+        res = self.search(self.kharkiv, self.lviv)
+
+        self.assertEqual(self.leg_ids(res), [first.id, second.id, third.id])
+        self.assertEqual(res.data["transfers"], 2)
+        self.assertIn("tickets_available", res.data["legs"][0])
+
+    def test_minimum_transfer_time(self):
+        self.journey(self.kharkiv, self.poltava, 1, 3)
+        self.journey(self.poltava, self.kyiv, 3.1, 6)
+        direct = self.journey(self.kharkiv, self.kyiv, 2, 9)
+
+        res = self.search(self.kharkiv, self.kyiv, min_transfer=30)
+
+        self.assertEqual(self.leg_ids(res), [direct.id])
+
+    def test_departed_journeys_are_skipped(self):
+        self.journey(self.kharkiv, self.kyiv, 1, 6)
+
+        res = self.search(
+            self.kharkiv,
+            self.kyiv,
+            departure_after=(self.start + timedelta(hours=2)).isoformat(),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_timetable_follows_journey_changes(self):
+        self.journey(self.kharkiv, self.kyiv, 5, 10)
+        self.search(self.kharkiv, self.kyiv)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            earlier = self.journey(self.kharkiv, self.kyiv, 1, 6)
+        res = self.search(self.kharkiv, self.kyiv)
+        self.assertEqual(self.leg_ids(res), [earlier.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            earlier.delete()
+        res = self.search(self.kharkiv, self.kyiv)
+        self.assertNotEqual(self.leg_ids(res), [earlier.id])
+
+    def test_deleted_journeys_are_planned_around(self):
+        earlier = self.journey(self.kharkiv, self.kyiv, 1, 6)
+        later = self.journey(self.kharkiv, self.kyiv, 2, 8)
+        self.search(self.kharkiv, self.kyiv)
+
+        # Not committed, so the loaded timetable still has it, as it
+        # would after a delete in another process
+        earlier.delete()
+        res = self.search(self.kharkiv, self.kyiv)
+        self.assertEqual(self.leg_ids(res), [later.id])
+
+        later.delete()
+        res = self.search(self.kharkiv, self.kyiv)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(TIMETABLE_FUTURE_DAYS=1)
+    def test_journeys_after_the_window_are_not_planned(self):
+        inside = self.journey(self.kharkiv, self.kyiv, -1, 8)
+        # Departs an hour after the window ends, but arrives first
+        self.journey(self.kharkiv, self.kyiv, 1, 6)
+        departure_after = (self.start - timedelta(hours=2)).isoformat()
+
+        res = self.search(
+            self.kharkiv, self.kyiv, departure_after=departure_after
+        )
+        self.assertEqual(self.leg_ids(res), [inside.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey(self.kharkiv, self.kyiv, 0.5, 2)
+        res = self.search(
+            self.kharkiv, self.kyiv, departure_after=departure_after
+        )
+        self.assertEqual(self.leg_ids(res), [inside.id])
+
+    @override_settings(TIMETABLE_FUTURE_DAYS=1)
+    def test_departure_after_the_window_is_rejected(self):
+        self.journey(self.kharkiv, self.kyiv, 1, 6)
+
+        res = self.search(
+            self.kharkiv,
+            self.kyiv,
+            departure_after=(self.start + timedelta(minutes=1)).isoformat(),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(TIMETABLE_PAST_DAYS=1)
+    def test_departure_before_the_window_is_rejected(self):
+        res = self.search(
+            self.kharkiv,
+            self.kyiv,
+            departure_after=(self.start - timedelta(days=2, minutes=1))
+            .isoformat(),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_station_ids_are_required(self):
+        res = self.client.get(CONNECTIONS_URL, {"source": self.kyiv.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
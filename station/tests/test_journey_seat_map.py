@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket
+from station.seat_map import build_seat_map, get_seat_map
+from station.tests.test_journey_view_set import (
+    journey_detail_url,
+    test_journey,
+    test_train,
+)
+
+ORDER_URL = reverse("station:order-list")
+
+
+class JourneySeatMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = test_journey(
+            train=test_train(cargo_num=2, places_in_cargo=4)
+        )
+        self.url = journey_detail_url(self.journey.id)
+
+    def book(self, cargo, seat):
+        payload = {
+            "tickets": [
+                {"cargo": cargo, "seat": seat, "journey": self.journey.id}
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(ORDER_URL, payload, format="json")
+
+    def test_compact_seat_map(self):
+        self.book(1, 2)
+        self.book(2, 4)
+
+        res = self.client.get(self.url, {"seats": "compact"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["seat_map"], {"1": "0100", "2": "0001"})
+        self.assertNotIn("taken_seats", res.data)
+
+    def test_default_detail_keeps_taken_seats(self):
+        self.book(1, 2)
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.data["taken_seats"], [{"cargo": 1, "seat": 2}])
+
+    def test_seat_map_is_invalidated_on_ticket_writes(self):
+        self.client.get(self.url, {"seats": "compact"})
+        self.book(1, 1)
+
+        res = self.client.get(self.url, {"seats": "compact"})
+        self.assertEqual(res.data["seat_map"]["1"], "1000")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(tickets__isnull=False).delete()
+
+        res = self.client.get(self.url, {"seats": "compact"})
+        self.assertEqual(res.data["seat_map"]["1"], "0000")
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_map_built_during_a_booking_is_not_cached(self):
+        stale = build_seat_map(self.journey)
+
+        def build_while_booking(journey):
+            self.book(1, 3)
+            return stale
+
+        with mock.patch(
+            "station.seat_map.build_seat_map", side_effect=build_while_booking
+        ):
+            self.assertEqual(get_seat_map(self.journey)["1"], "0000")
+
+        self.assertEqual(get_seat_map(self.journey)["1"], "0010")
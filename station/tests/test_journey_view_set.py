@@ -1,3 +1,4 @@
+from base64 import urlsafe_b64encode
 from datetime import datetime
 from django.db.models import F, Count
 
@@ -143,7 +144,7 @@ class AuthenticatedJourneyViewSetTests(TestCase):
         )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, expected_data)
+        self.assertEqual(res.data["results"], expected_data)
 
     def test_filter_journey_by_route_id(self):
         source = test_station(
@@ -164,7 +165,7 @@ class AuthenticatedJourneyViewSetTests(TestCase):
         )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, expected_data)
+        self.assertEqual(res.data["results"], expected_data)
 
     #
 
@@ -176,29 +177,82 @@ class AuthenticatedJourneyViewSetTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
         expected_data = self.serializer_data_with_tickets_available([journey])
-        self.assertEqual(res.data, expected_data)
+        self.assertEqual(res.data["results"], expected_data)
 
     def test_filter_journey_by_source_name(self):
-        journey = test_journey()
+        with self.captureOnCommitCallbacks(execute=True):
+            journey = test_journey()
 
         res = self.client.get(JOURNEY_URL, {"source_name": "Kharkiv"})
         expected_data = self.serializer_data_with_tickets_available([journey])
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, expected_data)
+        self.assertEqual(res.data["results"], expected_data)
 
     def test_filter_journey_by_destination_name(self):
-        destination = test_station(
-            name="Donetsk", latitude=48.04401, longitude=37.74616
-        )
-        route = test_route(destination=destination)
-        journey = test_journey(route=route)
+        with self.captureOnCommitCallbacks(execute=True):
+            destination = test_station(
+                name="Donetsk", latitude=48.04401, longitude=37.74616
+            )
+            route = test_route(destination=destination)
+            journey = test_journey(route=route)
 
         res = self.client.get(JOURNEY_URL, {"dest_name": "Donetsk"})
         expected_data = self.serializer_data_with_tickets_available([journey])
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, expected_data)
+        self.assertEqual(res.data["results"], expected_data)
+
+    def test_filter_journey_by_departure_range(self):
+        test_journey(departure_time="2025-01-04 23:00:00")
+        journey = test_journey(departure_time="2025-01-05 08:00:00")
+        test_journey(departure_time="2025-01-06 00:00:00")
+
+        res = self.client.get(
+            JOURNEY_URL,
+            {
+                "departure_after": "2025-01-05",
+                "departure_before": "2025-01-06",
+            },
+        )
+        expected_data = self.serializer_data_with_tickets_available([journey])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], expected_data)
+
+    def test_invalid_departure_range(self):
+        res = self.client.get(JOURNEY_URL, {"departure_after": "soon"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_journey_list_pages_by_departure_time(self):
+        late = test_journey(departure_time="2025-01-07 10:00:00")
+        early = test_journey(departure_time="2025-01-05 10:00:00")
+        same_time = test_journey(departure_time="2025-01-05 10:00:00")
+
+        res = self.client.get(JOURNEY_URL, {"page_size": 2})
+        next_page = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [journey["id"] for journey in res.data["results"]],
+            [early.id, same_time.id],
+        )
+        self.assertEqual(
+            [journey["id"] for journey in next_page.data["results"]],
+            [late.id],
+        )
+        self.assertIsNone(next_page.data["next"])
+
+    def test_invalid_cursor(self):
+        for cursor in (
+            "garbage",
+            urlsafe_b64encode(b'["2025-01-05T10:00:00", 1e400]').decode(),
+            urlsafe_b64encode(b'["2025-01-05T10:00:00", 1e30]').decode(),
+            urlsafe_b64encode(b'["2025-01-05T10:00:00", "1"]').decode(),
+        ):
+            res = self.client.get(JOURNEY_URL, {"cursor": cursor})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
 
 
 class AdminJourneyTests(TestCase):
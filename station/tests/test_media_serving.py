@@ -0,0 +1,175 @@
+import tempfile
+import uuid
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from train_station.media import byte_range
+
+CONTENT = bytes(range(256)) * 1024
+
+
+def media_url(name: str) -> str:
+    return reverse("media", args=(name,))
+
+
+class ByteRangeTests(TestCase):
+    def test_ranges(self):
+        for header, expected in (
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=-100", (900, 999)),
+            ("bytes=900-5000", (900, 999)),
+            ("bytes=-5000", (0, 999)),
+            (None, None),
+            ("bytes=5-1", None),
+            ("bytes=0-1,5-9", None),
+            ("items=0-1", None),
+        ):
+            self.assertEqual(byte_range(header, 1000), expected, header)
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=1000-", "bytes=-0"):
+            with self.assertRaises(ValueError):
+                byte_range(header, 1000)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.directory.name)
+        self.settings.enable()
+        self.name = f"uploads/crews/jane-doe-{uuid.uuid4()}.jpg"
+        path = Path(self.directory.name) / self.name
+        path.parent.mkdir(parents=True)
+        path.write_bytes(CONTENT)
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_serves_file_with_validators(self):
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertFalse(res["ETag"].startswith("W/"))
+        self.assertIn("Last-Modified", res)
+
+    def test_uuid_names_are_immutable(self):
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+
+        Path(self.directory.name, "notes.txt").write_text("notes")
+        res = self.client.get(media_url("notes.txt"))
+
+        self.assertEqual(res["Cache-Control"], "public, no-cache")
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+
+    def test_conditional_requests(self):
+        etag = self.client.get(media_url(self.name))["ETag"]
+
+        res = self.client.get(
+            media_url(self.name), headers={"If-None-Match": etag}
+        )
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], etag)
+        self.assertIn("immutable", res["Cache-Control"])
+
+        res = self.client.get(
+            media_url(self.name), headers={"If-None-Match": '"stale"'}
+        )
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_range_request(self):
+        res = self.client.get(
+            media_url(self.name), headers={"Range": "bytes=1000-70999"}
+        )
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(
+            res["Content-Range"], f"bytes 1000-70999/{len(CONTENT)}"
+        )
+        self.assertEqual(res["Content-Length"], "70000")
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[1000:71000])
+
+    def test_unsatisfiable_range(self):
+        res = self.client.get(
+            media_url(self.name), headers={"Range": f"bytes={len(CONTENT)}-"}
+        )
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_if_range(self):
+        etag = self.client.get(media_url(self.name))["ETag"]
+
+        for if_range, status in ((etag, 206), ('"changed"', 200)):
+            res = self.client.get(
+                media_url(self.name),
+                headers={"Range": "bytes=0-9", "If-Range": if_range},
+            )
+
+            self.assertEqual(res.status_code, status)
+
+    def test_head(self):
+        res = self.client.head(media_url(self.name))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(res.content, b"")
+
+    def test_missing_and_outside_files(self):
+        for name in ("uploads/missing.jpg", "uploads", "../settings.py"):
+            res = self.client.get(media_url(name))
+
+            self.assertEqual(res.status_code, 404, name)
+
+    def test_only_safe_methods(self):
+        res = self.client.post(media_url(self.name))
+
+        self.assertEqual(res.status_code, 405)
+
+    async def test_async_range_request(self):
+        res = await self.async_client.get(
+            media_url(self.name), headers={"Range": "bytes=-70000"}
+        )
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(
+            b"".join([chunk async for chunk in res.streaming_content]),
+            CONTENT[-70000:],
+        )
+
+    @override_settings(
+        MEDIA_OFFLOAD="x-accel-redirect",
+        MEDIA_ACCEL_REDIRECT_PREFIX="/internal-media/",
+    )
+    def test_accel_redirect(self):
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/internal-media/{self.name}"
+        )
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", res["Cache-Control"])
+
+    @override_settings(MEDIA_OFFLOAD="x-sendfile")
+    def test_sendfile(self):
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(
+            res["X-Sendfile"], str(Path(self.directory.name) / self.name)
+        )
+        self.assertEqual(res.content, b"")
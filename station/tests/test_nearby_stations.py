@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.geo import encode_geohash
+from station.tests.test_journey_view_set import test_station
+
+NEARBY_URL = reverse("station:station-nearby")
+KYIV = {"lat": 50.4501, "lon": 30.5234}
+
+
+class NearbyStationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        self.darnytsia = test_station(
+            name="Kyiv-Darnytsia", latitude=50.4558, longitude=30.6282
+        )
+        self.passenger = test_station(
+            name="Kyiv-Pasazhyrskyi", latitude=50.4410, longitude=30.4884
+        )
+        self.fastiv = test_station(
+            name="Fastiv", latitude=50.0780, longitude=29.9177
+        )
+        self.lviv = test_station(
+            name="Lviv", latitude=49.8397, longitude=24.0297
+        )
+
+    def names(self, res):
+        return [station["name"] for station in res.data]
+
+    def test_station_stores_geohash(self):
+        self.assertEqual(
+            self.lviv.geohash, encode_geohash(49.8397, 24.0297)
+        )
+
+    def test_nearest_stations(self):
+        res = self.client.get(NEARBY_URL, {**KYIV, "k": 3})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.names(res),
+            ["Kyiv-Pasazhyrskyi", "Kyiv-Darnytsia", "Fastiv"],
+        )
+        self.assertAlmostEqual(res.data[0]["distance"], 2.8, delta=0.2)
+
+    def test_k_larger_than_station_count(self):
+        res = self.client.get(NEARBY_URL, {**KYIV, "k": 50})
+
+        self.assertEqual(len(res.data), 4)
+        self.assertEqual(res.data[-1]["name"], "Lviv")
+
+    def test_stations_within_radius(self):
+        res = self.client.get(NEARBY_URL, {**KYIV, "radius": 60})
+
+        self.assertEqual(
+            self.names(res),
+            ["Kyiv-Pasazhyrskyi", "Kyiv-Darnytsia", "Fastiv"],
+        )
+
+    def test_small_radius(self):
+        res = self.client.get(NEARBY_URL, {**KYIV, "radius": 1})
+
+        self.assertEqual(res.data, [])
+
+    def test_coordinates_are_required(self):
+        res = self.client.get(NEARBY_URL, {"lat": 50})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
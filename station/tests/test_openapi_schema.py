@@ -0,0 +1,70 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+SCHEMA_URL = reverse("schema")
+
+
+class OpenApiSchemaTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        self.settings = override_settings(OPENAPI_SCHEMA_DIR=self.path)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_build_schema_writes_yaml_and_json(self):
+        call_command("build_schema", stdout=StringIO())
+
+        self.assertTrue(
+            (self.path / "schema.yaml").read_text().startswith("openapi:")
+        )
+        schema = json.loads((self.path / "schema.json").read_text())
+        self.assertIn("/api/station/journeys/", schema["paths"])
+        self.assertIn("jwtAuth", schema["components"]["securitySchemes"])
+
+    def test_serves_prebuilt_file_with_etag(self):
+        (self.path / "schema.yaml").write_text("openapi: prebuilt\n")
+
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"openapi: prebuilt\n")
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi")
+        self.assertIn("no-cache", res["Cache-Control"])
+
+        res = self.client.get(
+            SCHEMA_URL, headers={"If-None-Match": res["ETag"]}
+        )
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_json_format(self):
+        (self.path / "schema.json").write_text('{"openapi": "3.0.3"}')
+
+        for params, headers in (
+            ({"format": "json"}, {}),
+            ({}, {"Accept": "application/vnd.oai.openapi+json"}),
+        ):
+            res = self.client.get(SCHEMA_URL, params, headers=headers)
+
+            self.assertEqual(res.json(), {"openapi": "3.0.3"})
+            self.assertEqual(
+                res["Content-Type"], "application/vnd.oai.openapi+json"
+            )
+
+    def test_generates_schema_without_build(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.content.startswith(b"openapi: 3"))
+        self.assertIn(b"/api/station/journeys/", res.content)
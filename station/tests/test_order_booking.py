@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.models import Ticket
+from station.tests.test_journey_view_set import test_journey
+
+ORDER_URL = reverse("station:order-list")
+
+
+class OrderBookingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = test_journey()
+
+    def book(self, seats, journey=None):
+        journey = journey or self.journey
+        payload = {
+            "tickets": [
+                {"cargo": cargo, "seat": seat, "journey": journey.id}
+                for cargo, seat in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, payload, format="json")
+
+    def test_group_booking_creates_all_tickets(self):
+        res = self.book([(1, seat) for seat in range(1, 41)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 40)
+        self.assertEqual(Ticket.objects.count(), 40)
+
+    def test_query_count_does_not_grow_with_tickets(self):
+        self.book([(3, 1)])
+
+        with CaptureQueriesContext(connection) as small:
+            self.book([(1, seat) for seat in range(1, 3)])
+        with CaptureQueriesContext(connection) as large:
+            self.book([(2, seat) for seat in range(1, 41)])
+
+        self.assertEqual(len(small), len(large))
+
+    def test_taken_seats_are_reported_by_position(self):
+        self.book([(1, 5)])
+
+        res = self.book([(1, 4), (1, 5)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("already taken", str(res.data["tickets"][1]["seat"]))
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_seat_booked_twice_in_one_order(self):
+        res = self.book([(1, 7), (1, 7)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("twice", str(res.data["tickets"][1]["seat"]))
+
+    def test_seat_outside_train_is_rejected(self):
+        res = self.book([(1, self.journey.train.places_in_cargo + 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_same_seat_on_other_journey(self):
+        other = test_journey()
+        self.book([(1, 1)])
+
+        res = self.book([(1, 1)], journey=other)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket
+from station.tests.test_journey_view_set import test_journey
+
+EXPORT_URL = reverse("station:order-export")
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@admin.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.customer = get_user_model().objects.create_user(
+            email="user@user.com", password="password"
+        )
+        journey = test_journey()
+        self.orders = []
+        for number in range(3):
+            order = Order.objects.create(user=self.customer)
+            for seat in range(1, number + 2):
+                Ticket.objects.create(
+                    order=order, journey=journey, cargo=number + 1, seat=seat
+                )
+            self.orders.append(order)
+        self.since = (timezone.now() - timedelta(days=1)).date().isoformat()
+
+    def read(self, response) -> str:
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_has_one_line_per_order(self):
+        res = self.client.get(EXPORT_URL, {"created_after": self.since})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in self.read(res).splitlines()]
+        self.assertEqual(
+            [line["id"] for line in lines],
+            [order.id for order in self.orders],
+        )
+        self.assertEqual(
+            [len(line["tickets"]) for line in lines], [1, 2, 3]
+        )
+        self.assertEqual(lines[0]["user"], "user@user.com")
+
+    def test_csv_has_one_row_per_ticket(self):
+        res = self.client.get(
+            EXPORT_URL, {"created_after": self.since, "format": "csv"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("orders.csv", res["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(self.read(res))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(
+            {row["order_id"] for row in rows},
+            {str(order.id) for order in self.orders},
+        )
+
+    def test_json_is_an_array_of_orders(self):
+        res = self.client.get(
+            EXPORT_URL,
+            {"created_after": self.since},
+            HTTP_ACCEPT="application/json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/json")
+        orders = json.loads(self.read(res))
+        self.assertEqual(
+            [order["id"] for order in orders],
+            [order.id for order in self.orders],
+        )
+
+    def test_empty_json_export_is_an_empty_array(self):
+        future = (timezone.now() + timedelta(days=1)).date().isoformat()
+
+        res = self.client.get(
+            EXPORT_URL, {"created_after": future, "format": "json"}
+        )
+
+        self.assertEqual(json.loads(self.read(res)), [])
+
+    def test_errors_are_sent_as_json(self):
+        for export_format in ("ndjson", "csv", "json"):
+            with self.subTest(export_format):
+                res = self.client.get(EXPORT_URL, {"format": export_format})
+
+                self.assertEqual(
+                    res.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                self.assertEqual(res["Content-Type"], "application/json")
+                self.assertIn("created_after", json.loads(res.content))
+
+    def test_range_excludes_other_orders(self):
+        future = (timezone.now() + timedelta(days=1)).date().isoformat()
+
+        res = self.client.get(EXPORT_URL, {"created_after": future})
+
+        self.assertEqual(self.read(res), "")
+
+    def test_range_is_required(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_is_staff_only(self):
+        self.client.force_authenticate(self.customer)
+
+        res = self.client.get(EXPORT_URL, {"created_after": self.since})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(res["Content-Type"], "application/json")
+
+    def test_command_writes_same_export(self):
+        output = io.StringIO()
+        call_command("export_orders", after=self.since, stdout=output)
+
+        res = self.client.get(EXPORT_URL, {"created_after": self.since})
+        exported = [json.loads(line) for line in self.read(res).splitlines()]
+        written = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(written, exported)
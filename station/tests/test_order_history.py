@@ -0,0 +1,160 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.inventory import tickets_available_expression
+from station.models import Journey, OrderSummary, Ticket
+from station.serializers import TicketListSerializer
+from station.tests.test_journey_view_set import test_journey
+
+ORDER_URL = reverse("station:order-list")
+
+
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = test_journey()
+
+    def book(self, seats):
+        payload = {
+            "tickets": [
+                {"cargo": cargo, "seat": seat, "journey": self.journey.id}
+                for cargo, seat in seats
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data["id"]
+
+    def history(self, **params):
+        res = self.client.get(ORDER_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["results"]
+
+    def test_matches_nested_serializer_output(self):
+        order_id = self.book([(1, 2), (1, 1)])
+
+        tickets = Ticket.objects.filter(order_id=order_id).select_related(
+            "journey__route__source", "journey__route__destination",
+            "journey__train",
+        )
+        journey = Journey.objects.annotate(
+            tickets_available=tickets_available_expression()
+        ).get(pk=self.journey.pk)
+        for ticket in tickets:
+            ticket.journey.tickets_available = journey.tickets_available
+        expected = json.loads(
+            json.dumps(TicketListSerializer(tickets, many=True).data)
+        )
+
+        [order] = self.history()
+        self.assertEqual(order["id"], order_id)
+        self.assertEqual(order["tickets"], expected)
+        self.assertEqual(
+            order["tickets"][0]["journey"]["tickets_available"],
+            self.journey.train.capacity - 2,
+        )
+
+    def test_page_read_does_not_grow_with_tickets(self):
+        self.book([(1, 1)])
+        with self.assertNumQueries(3):
+            self.history()
+
+        self.book([(2, seat) for seat in range(1, 41)])
+        with self.assertNumQueries(3):
+            self.history(page_size=2)
+
+    def test_other_users_orders_are_hidden(self):
+        self.book([(1, 1)])
+        other = get_user_model().objects.create_user(
+            email="other@admin.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.history(), [])
+
+    def test_deleted_ticket_leaves_history(self):
+        order_id = self.book([(1, 1), (1, 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.get(order_id=order_id, seat=2).delete()
+
+        [order] = self.history()
+        self.assertEqual([ticket["seat"] for ticket in order["tickets"]], [1])
+
+    def test_cascade_refreshes_each_order_once(self):
+        first = self.book([(1, 1), (1, 2)])
+        second = self.book([(1, 3)])
+
+        with mock.patch(
+            "station.order_history.record_order_summaries"
+        ) as record, self.captureOnCommitCallbacks(execute=True):
+            self.journey.delete()
+
+        record.assert_called_once_with({first, second})
+
+    def test_rolled_back_refresh_does_not_hold_later_ones(self):
+        order_id = self.book([(1, 1), (1, 2)])
+
+        try:
+            with transaction.atomic():
+                Ticket.objects.get(order_id=order_id, seat=1).delete()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.get(order_id=order_id, seat=2).delete()
+
+        [order] = self.history()
+        self.assertEqual([ticket["seat"] for ticket in order["tickets"]], [1])
+
+    def test_each_commit_refreshes_its_orders(self):
+        order_id = self.book([(1, 1), (1, 2), (1, 3)])
+
+        for seat in (1, 2):
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.get(order_id=order_id, seat=seat).delete()
+
+            [order] = self.history()
+            self.assertNotIn(
+                seat, [ticket["seat"] for ticket in order["tickets"]]
+            )
+
+    def test_rescheduled_journey_is_shown(self):
+        self.book([(1, 1)])
+        self.journey.refresh_from_db()
+        self.journey.departure_time += timedelta(hours=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey.save()
+
+        [order] = self.history()
+        self.assertEqual(
+            order["tickets"][0]["journey"]["departure_time"],
+            "2025-01-05T16:00:00Z",
+        )
+
+    def test_rebuild_command(self):
+        order_id = self.book([(1, 1)])
+        before = OrderSummary.objects.get(pk=order_id).tickets
+        OrderSummary.objects.all().delete()
+
+        call_command("rebuild_order_history", stdout=StringIO())
+
+        self.assertEqual(OrderSummary.objects.get(pk=order_id).tickets, before)
@@ -0,0 +1,152 @@
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.serializers import BaseSerializer
+from rest_framework.test import APIClient
+
+from station.models import Journey, Order, Ticket
+from station.instrumentation import RequestStats, _current, timed_serializer
+from station.serializers import JourneySerializer, StationSerializer
+from station.tests.test_journey_view_set import (
+    journey_detail_url,
+    test_crew,
+    test_journey,
+)
+
+JOURNEY_URL = reverse("station:journey-list")
+ASYNC_JOURNEY_URL = reverse("station:async-journey-list")
+ORDER_URL = reverse("station:order-list")
+ROUTE_URL = reverse("station:route-list")
+TRAIN_URL = reverse("station:train-list")
+
+# Queries an endpoint may run with a cold cache, however many rows it
+# returns; route and train lists also read their model versions
+QUERY_BUDGETS = {
+    JOURNEY_URL: 1,
+    ASYNC_JOURNEY_URL: 1,
+    ROUTE_URL: 2,
+    TRAIN_URL: 2,
+    ORDER_URL: 3,
+}
+
+
+def server_timing(response) -> dict[str, str]:
+    return dict(
+        re.match(r"(\w+);(.*)", metric.strip()).groups()
+        for metric in response["Server-Timing"].split(",")
+    )
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = test_journey()
+
+    def test_server_timing_header(self):
+        with self.assertNumQueries(3):
+            res = self.client.get(journey_detail_url(self.journey.id))
+
+        metrics = server_timing(res)
+        self.assertEqual(set(metrics), {"db", "serialize", "view"})
+        self.assertIn('desc="3 queries"', metrics["db"])
+        serialize = float(metrics["serialize"].removeprefix("dur="))
+        view = float(metrics["view"].removeprefix("dur="))
+        self.assertGreater(serialize, 0)
+        self.assertLessEqual(serialize, view)
+
+    def test_list_serialization_is_timed(self):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            with mock.patch(
+                "station.instrumentation.time.perf_counter",
+                side_effect=[1.0, 3.5],
+            ):
+                serializer = timed_serializer(
+                    StationSerializer([self.journey.route.source], many=True)
+                )
+                self.assertEqual(len(serializer.data), 1)
+        finally:
+            _current.reset(token)
+
+        self.assertEqual(stats.serialize, 2.5)
+
+    def test_drf_serializers_are_left_alone(self):
+        data = BaseSerializer.__dict__["data"].fget
+        self.assertEqual(data.__module__, "rest_framework.serializers")
+
+        serializer = JourneySerializer(self.journey)
+        self.assertIs(type(serializer), JourneySerializer)
+
+    def test_async_view_queries_are_counted(self):
+        res = self.client.get(ASYNC_JOURNEY_URL)
+
+        self.assertIn('desc="1 queries"', server_timing(res)["db"])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_header_can_be_disabled(self):
+        res = self.client.get(JOURNEY_URL)
+
+        self.assertNotIn("Server-Timing", res)
+
+    @override_settings(REQUEST_LOG_SAMPLE_RATE=1)
+    def test_sampled_request_is_logged(self):
+        with self.assertLogs("station.requests") as logs:
+            self.client.get(JOURNEY_URL)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "station:journey-list")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["queries"], 1)
+        self.assertGreaterEqual(record["view_ms"], record["db_ms"])
+
+    @override_settings(REQUEST_LOG_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_logged(self):
+        with self.assertNoLogs("station.requests"):
+            self.client.get(JOURNEY_URL)
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        journey = test_journey()
+        crew = test_crew()
+        start = datetime(2025, 1, 5, tzinfo=timezone.utc)
+        with self.captureOnCommitCallbacks(execute=True):
+            for hour in range(30):
+                journey = Journey.objects.create(
+                    route=journey.route,
+                    train=journey.train,
+                    departure_time=start + timedelta(hours=hour),
+                    arrival_time=start + timedelta(hours=hour + 3),
+                )
+                journey.crew.add(crew)
+                order = Order.objects.create(user=self.user)
+                for seat in (1, 2):
+                    Ticket.objects.create(journey=journey, order=order,
+                                          cargo=1, seat=seat)
+
+    def test_lists_stay_within_query_budget(self):
+        for url, budget in QUERY_BUDGETS.items():
+            for page_size in (1, 10, 30):
+                with self.subTest(url=url, page_size=page_size):
+                    cache.clear()
+                    with self.assertNumQueries(budget):
+                        res = self.client.get(url, {"page_size": page_size})
+                    self.assertEqual(res.status_code, 200)
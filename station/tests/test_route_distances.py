@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from station.distances import haversine_km, recompute_route_distances
+from station.models import Route, Station
+from station.tests.test_journey_view_set import test_station
+
+COORDINATES = [
+    ("Kharkiv", 49.98956, 36.2043),
+    ("Kyiv", 50.44056, 30.48944),
+    ("Lviv", 49.83826, 24.02324),
+    ("Odesa", 46.48572, 30.74383),
+    ("Uzhhorod", 48.62083, 22.28778),
+]
+
+
+class RouteDistanceTests(TestCase):
+    def setUp(self):
+        self.stations = [
+            test_station(name=name, latitude=latitude, longitude=longitude)
+            for name, latitude, longitude in COORDINATES
+        ]
+        self.routes = [
+            Route.objects.create(source=source, destination=destination)
+            for source in self.stations
+            for destination in self.stations
+            if source != destination
+        ]
+
+    def test_vectorized_matches_route_calculation(self):
+        distances = haversine_km(
+            [route.source.latitude for route in self.routes],
+            [route.source.longitude for route in self.routes],
+            [route.destination.latitude for route in self.routes],
+            [route.destination.longitude for route in self.routes],
+        )
+
+        self.assertEqual(
+            distances.tolist(),
+            [route.calculate_distance() for route in self.routes],
+        )
+
+    def test_recompute_only_routes_of_changed_stations(self):
+        kyiv = self.stations[1]
+        Station.objects.filter(id=kyiv.id).update(latitude=51.0)
+
+        written = recompute_route_distances([kyiv.id])
+
+        self.assertEqual(written, 8)
+        for route in Route.objects.select_related("source", "destination"):
+            self.assertEqual(route.distance, route.calculate_distance())
+
+    def test_nothing_written_when_distances_are_current(self):
+        self.assertEqual(recompute_route_distances(), 0)
+
+    def test_saving_station_updates_its_routes(self):
+        kyiv = self.stations[1]
+        kyiv.latitude = 51.0
+        kyiv.save()
+
+        route = Route.objects.get(source=self.stations[0], destination=kyiv)
+        self.assertEqual(route.distance, route.calculate_distance())
+
+    def test_recompute_command(self):
+        Route.objects.update(distance=None)
+        out = StringIO()
+
+        call_command("recompute_distances", stdout=out)
+
+        self.assertIn("20 routes", out.getvalue())
+        self.assertFalse(Route.objects.filter(distance=None).exists())
@@ -0,0 +1,284 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.booking import create_order_tickets
+from station.models import Order, Ticket
+from station.seat_events import (
+    broker,
+    notify_payloads,
+    publish_seat_changes,
+)
+from station.tests.test_journey_view_set import test_journey
+
+
+def seat_events_url(journey_id: int):
+    return reverse("station:async-journey-seat-events", args=(journey_id,))
+
+
+def parse_event(chunk) -> tuple[str, dict]:
+    lines = dict(
+        line.split(": ", 1) for line in chunk.decode().strip().split("\n")
+    )
+    return lines["event"], json.loads(lines["data"])
+
+
+class SeatEventBrokerTests(TestCase):
+    def tearDown(self):
+        broker.end_all()
+
+    async def test_fan_out_per_journey(self):
+        first, second = broker.subscribe(1), broker.subscribe(1)
+        other = broker.subscribe(2)
+
+        broker.publish(1, {"taken": [{"cargo": 1, "seat": 2}]})
+
+        self.assertEqual(broker.subscribers, 3)
+        for subscription in (first, second):
+            self.assertEqual(
+                subscription.queue.get_nowait(),
+                {"taken": [{"cargo": 1, "seat": 2}]},
+            )
+        self.assertTrue(other.queue.empty())
+
+    @override_settings(SEAT_EVENTS_QUEUE_SIZE=2)
+    async def test_slow_subscriber_is_ended(self):
+        subscription = broker.subscribe(1)
+
+        for seat in range(3):
+            broker.publish(1, {"taken": [{"cargo": 1, "seat": seat}]})
+
+        self.assertEqual(broker.subscribers, 0)
+        self.assertIsNotNone(await subscription.get())
+        self.assertIsNone(await subscription.get())
+
+    async def test_changes_are_published_on_commit(self):
+        subscription = broker.subscribe(7)
+
+        def release():
+            with self.captureOnCommitCallbacks() as callbacks:
+                publish_seat_changes(
+                    7, released=[(1, seat) for seat in range(1, 251)]
+                )
+            self.assertTrue(subscription.queue.empty())
+            for callback in callbacks:
+                callback()
+
+        await sync_to_async(release)()
+        changes = [
+            await asyncio.wait_for(subscription.get(), 1) for _ in range(2)
+        ]
+
+        self.assertEqual(
+            [len(change["released"]) for change in changes], [200, 50]
+        )
+        self.assertEqual(changes[0]["taken"], [])
+
+    async def test_one_change_per_journey_and_transaction(self):
+        seven, eight = broker.subscribe(7), broker.subscribe(8)
+
+        def cancel():
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                publish_seat_changes(7, released=[(1, 1)])
+                publish_seat_changes(7, released=[(1, 2)])
+                publish_seat_changes(8, released=[(2, 1)])
+                publish_seat_changes(7, taken=[(1, 1)])
+            self.assertEqual(len(callbacks), 1)
+
+        await sync_to_async(cancel)()
+
+        self.assertEqual(
+            await asyncio.wait_for(seven.get(), 1),
+            {"taken": [{"cargo": 1, "seat": 1}],
+             "released": [{"cargo": 1, "seat": 2}]},
+        )
+        self.assertEqual(
+            await asyncio.wait_for(eight.get(), 1),
+            {"taken": [], "released": [{"cargo": 2, "seat": 1}]},
+        )
+        self.assertTrue(seven.queue.empty())
+
+    async def test_rolled_back_changes_are_not_published(self):
+        subscription = broker.subscribe(7)
+
+        def book():
+            try:
+                with transaction.atomic():
+                    publish_seat_changes(7, taken=[(1, 1)])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            with self.captureOnCommitCallbacks(execute=True):
+                publish_seat_changes(7, taken=[(1, 2)])
+
+        await sync_to_async(book)()
+
+        self.assertEqual(
+            (await asyncio.wait_for(subscription.get(), 1))["taken"],
+            [{"cargo": 1, "seat": 2}],
+        )
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_notify_payload_is_relayed(self):
+        subscription = broker.subscribe(5)
+
+        [payload] = notify_payloads({5: {(1, 2): "taken", (1, 3): "released"}})
+        self.assertEqual(json.loads(payload), {
+            "journey": 5,
+            "taken": [{"cargo": 1, "seat": 2}],
+            "released": [{"cargo": 1, "seat": 3}],
+        })
+        broker.relay(payload)
+
+        self.assertEqual(
+            subscription.queue.get_nowait(),
+            {"taken": [{"cargo": 1, "seat": 2}],
+             "released": [{"cargo": 1, "seat": 3}]},
+        )
+
+    async def test_snapshot_is_shared_until_a_change(self):
+        broker.subscribe(5)
+        journey = SimpleNamespace(id=5)
+
+        with mock.patch(
+            "station.seat_events.build_seat_map", return_value={"1": "00"}
+        ) as build:
+            await asyncio.gather(
+                broker.snapshot(journey), broker.snapshot(journey)
+            )
+            self.assertEqual(build.call_count, 1)
+
+            first = asyncio.ensure_future(broker.snapshot(journey))
+            await asyncio.sleep(0)
+            broker.publish(5, {"taken": [{"cargo": 1, "seat": 1}]})
+            second = await broker.snapshot(journey)
+
+        self.assertEqual(await first, second)
+        self.assertEqual(build.call_count, 3)
+
+
+# Snapshots are read from a pool thread, which needs committed data
+class JourneySeatEventsTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password"
+        )
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+        self.journey = test_journey()
+
+    def tearDown(self):
+        broker.end_all()
+
+    def book(self, seats):
+        with transaction.atomic():
+            order = Order.objects.create(user=self.user)
+            create_order_tickets(order, [
+                {"journey": self.journey, "cargo": cargo, "seat": seat}
+                for cargo, seat in seats
+            ])
+        return order
+
+    def cancel(self, order):
+        with transaction.atomic():
+            order.delete()
+
+    async def open_stream(self):
+        res = await self.async_client.get(
+            seat_events_url(self.journey.id), headers=self.headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        self.assertEqual(res["Cache-Control"], "no-cache")
+        return res.streaming_content
+
+    async def next_chunk(self, stream):
+        return await asyncio.wait_for(anext(stream), 1)
+
+    async def test_snapshot_then_updates(self):
+        await sync_to_async(self.book)([(1, 3)])
+        stream = await self.open_stream()
+
+        self.assertTrue((await self.next_chunk(stream)).startswith(b"retry:"))
+        event, seat_map = parse_event(await self.next_chunk(stream))
+        self.assertEqual(event, "snapshot")
+        self.assertEqual(seat_map["1"][:4], "0010")
+
+        order = await sync_to_async(self.book)([(2, 1), (2, 2)])
+        self.assertEqual(
+            parse_event(await self.next_chunk(stream)),
+            ("update", {
+                "taken": [{"cargo": 2, "seat": 1}, {"cargo": 2, "seat": 2}],
+                "released": [],
+            }),
+        )
+
+        # The cascade's tickets are announced in one update
+        await sync_to_async(self.cancel)(order)
+        event, change = parse_event(await self.next_chunk(stream))
+        self.assertEqual(event, "update")
+        self.assertCountEqual(
+            change["released"],
+            [{"cargo": 2, "seat": 1}, {"cargo": 2, "seat": 2}],
+        )
+
+        # A client disconnect cancels the task sending the response
+        waiting = asyncio.create_task(anext(stream))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(broker.subscribers, 0)
+
+    async def test_ticket_created_directly_is_published(self):
+        stream = await self.open_stream()
+        await self.next_chunk(stream)
+        await self.next_chunk(stream)
+
+        ticket = await Ticket.objects.acreate(
+            journey=self.journey,
+            order=await Order.objects.acreate(user=self.user),
+            cargo=1,
+            seat=6,
+        )
+        self.assertEqual(
+            parse_event(await self.next_chunk(stream))[1]["taken"],
+            [{"cargo": 1, "seat": 6}],
+        )
+
+        await ticket.adelete()
+        self.assertEqual(
+            parse_event(await self.next_chunk(stream))[1]["released"],
+            [{"cargo": 1, "seat": 6}],
+        )
+        await stream.aclose()
+
+    @override_settings(SEAT_EVENTS_HEARTBEAT=0.01)
+    async def test_heartbeat(self):
+        stream = await self.open_stream()
+        await self.next_chunk(stream)
+        await self.next_chunk(stream)
+
+        self.assertEqual(await self.next_chunk(stream), b": keep-alive\n\n")
+        await stream.aclose()
+
+    async def test_auth_required_and_missing_journey(self):
+        res = await self.async_client.get(seat_events_url(self.journey.id))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = await self.async_client.get(
+            seat_events_url(self.journey.id + 1), headers=self.headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.models import SeatHold, Ticket
+from station.tests.test_journey_view_set import test_journey
+
+ORDER_URL = reverse("station:order-list")
+SEAT_HOLD_URL = reverse("station:seathold-list")
+
+
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="password", is_staff=True
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@admin.com", password="password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = test_journey()
+
+    def seats(self, *numbers):
+        return [
+            {"journey": self.journey.id, "cargo": 1, "seat": number}
+            for number in numbers
+        ]
+
+    def hold(self, *numbers):
+        return self.client.post(
+            SEAT_HOLD_URL, self.seats(*numbers), format="json"
+        )
+
+    def test_hold_seats(self):
+        res = self.hold(1, 2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertIsNotNone(res.data[0]["expires_at"])
+        self.assertEqual(self.client.get(SEAT_HOLD_URL).data, res.data)
+
+    def test_hold_single_seat(self):
+        res = self.client.post(
+            SEAT_HOLD_URL, self.seats(3)[0], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["seat"], 3)
+
+    def test_empty_hold_is_rejected(self):
+        res = self.client.post(SEAT_HOLD_URL, [], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SEAT_HOLD_LIMIT=3)
+    def test_holds_per_journey_are_limited(self):
+        self.assertEqual(self.hold(1, 2).status_code, status.HTTP_201_CREATED)
+        # Holding the same seats again only extends them
+        self.assertEqual(self.hold(1, 2).status_code, status.HTTP_201_CREATED)
+
+        res = self.hold(3, 4)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("At most 3 seats", str(res.data["holds"]))
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(self.hold(3).status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(self.other_user)
+        self.assertEqual(self.hold(4).status_code, status.HTTP_201_CREATED)
+
+    def test_seat_held_by_other_user_is_unavailable(self):
+        self.hold(1)
+        self.client.force_authenticate(self.other_user)
+
+        hold = self.hold(1)
+        order = self.client.post(
+            ORDER_URL, {"tickets": self.seats(1)}, format="json"
+        )
+
+        self.assertEqual(hold.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already taken", str(hold.data["holds"][0]["seat"]))
+        self.assertEqual(order.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_hold_does_not_block(self):
+        self.hold(1)
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+        self.client.force_authenticate(self.other_user)
+
+        res = self.hold(1)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.other_user)
+
+    def test_checkout_converts_holds(self):
+        self.hold(1, 2)
+
+        res = self.client.post(
+            ORDER_URL, {"tickets": self.seats(1)}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Ticket.objects.filter(seat=1).exists())
+        self.assertEqual(
+            list(SeatHold.objects.values_list("seat", flat=True)), [2]
+        )
+
+    def test_release_hold(self):
+        hold_id = self.hold(1).data[0]["id"]
+
+        res = self.client.delete(
+            reverse("station:seathold-detail", args=[hold_id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_sweep_expired_holds(self):
+        self.hold(1, 2)
+        SeatHold.objects.filter(seat=1).update(
+            expires_at=timezone.now() - timedelta(1)
+        )
+
+        call_command("sweep_seat_holds", stdout=StringIO())
+
+        self.assertEqual(
+            list(SeatHold.objects.values_list("seat", flat=True)), [2]
+        )
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from station import search
+
+from station.search import StationNameIndex, find_station_ids
+from station.tests.test_journey_view_set import test_station
+
+
+class StationNameIndexTests(TestCase):
+    def setUp(self):
+        self.index = StationNameIndex(
+            [
+                (1, "Kharkiv-Pasazhyrskyi"),
+                (2, "Kyiv"),
+                (3, "Kyiv-Darnytsia"),
+                (4, "Zhytomyr"),
+                (5, "Lviv"),
+            ]
+        )
+
+    def test_substring_is_case_insensitive(self):
+        self.assertEqual(self.index.search("kYIV"), {2, 3})
+        self.assertEqual(self.index.search("darnyts"), {3})
+
+    def test_short_queries_match_by_substring(self):
+        self.assertEqual(self.index.search("iv"), {1, 2, 3, 5})
+
+    def test_prefix_of_word(self):
+        self.assertEqual(self.index.search("Zhyt"), {4})
+
+    def test_typos_fall_back_to_similar_names(self):
+        self.assertEqual(self.index.search("Kharkov"), {1})
+        self.assertEqual(self.index.search("Zhitomyr"), {4})
+
+    def test_accents_are_ignored(self):
+        self.assertEqual(self.index.search("Lvív"), {5})
+
+    def test_unknown_name(self):
+        self.assertEqual(self.index.search("Odesa"), set())
+
+
+class FindStationIdsTests(TestCase):
+    def tearDown(self):
+        # Indexes built here hold stations the test rollback removes
+        search.invalidate_station_index()
+
+    def test_index_sees_new_stations(self):
+        self.assertEqual(find_station_ids("Kremenchuk"), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            station = test_station(name="Kremenchuk")
+
+        self.assertEqual(find_station_ids("kremench"), {station.id})
+
+    def test_index_is_not_rebuilt_before_commit(self):
+        find_station_ids("Kremenchuk")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            test_station(name="Kremenchuk")
+
+        self.assertEqual(find_station_ids("Kremenchuk"), set())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(find_station_ids("Kremenchuk")), 1)
+
+    def test_invalidation_while_waiting_for_rebuild(self):
+        test_station(name="Kremenchuk")
+        search.invalidate_station_index()
+
+        class InvalidatingLock:
+            def __enter__(self):
+                search.invalidate_station_index()
+
+            def __exit__(self, *exc_info):
+                pass
+
+        with mock.patch.object(search, "_index_lock", InvalidatingLock()):
+            self.assertEqual(len(find_station_ids("Kremenchuk")), 1)
@@ -0,0 +1,119 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from station.throttling import (
+    CacheThrottleStore,
+    SQLiteThrottleStore,
+    SlidingAnonRateThrottle,
+)
+
+STATION_URL = reverse("station:station-list")
+
+
+class ThrottleStoreTests:
+    def test_counts_current_and_previous_window(self):
+        self.assertEqual(self.store.hit("a:2", "a:1", 60), (1, 0))
+        self.assertEqual(self.store.hit("a:2", "a:1", 60), (2, 0))
+        self.assertEqual(self.store.hit("a:3", "a:2", 60), (1, 2))
+
+    def test_release_undoes_a_hit(self):
+        self.store.hit("a:2", "a:1", 60)
+        self.store.hit("a:2", "a:1", 60)
+
+        self.store.release("a:2")
+
+        self.assertEqual(self.store.hit("a:2", "a:1", 60), (2, 0))
+
+
+class CacheThrottleStoreTests(ThrottleStoreTests, SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = CacheThrottleStore()
+
+
+class SQLiteThrottleStoreTests(ThrottleStoreTests, SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = SQLiteThrottleStore(Path(directory.name) / "t.sqlite3")
+
+    def test_processes_share_counters(self):
+        other = SQLiteThrottleStore(self.store.path)
+        self.store.hit("a:2", "a:1", 60)
+
+        self.assertEqual(other.hit("a:2", "a:1", 60), (2, 0))
+
+
+class ThreePerMinuteThrottle(SlidingAnonRateThrottle):
+    rate = "3/min"
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().get("/")
+        self.request.user = None
+
+    def allow_at(self, moment) -> bool:
+        throttle = ThreePerMinuteThrottle()
+        with mock.patch.object(throttle, "timer", return_value=moment):
+            allowed = throttle.allow_request(self.request, None)
+        self.wait = throttle.wait() if not allowed else None
+        return allowed
+
+    def test_limit_within_a_window(self):
+        self.assertEqual(
+            [self.allow_at(600 + second) for second in range(4)],
+            [True, True, True, False],
+        )
+        self.assertEqual(self.wait, 57)
+
+    def test_previous_window_is_weighted(self):
+        for second in range(3):
+            self.allow_at(630 + second)
+
+        # A quarter into the next window 3 * 0.75 of the old hits remain
+        self.assertFalse(self.allow_at(675))
+        self.assertAlmostEqual(self.wait, 5)
+        # Two thirds in only one of them remains
+        self.assertTrue(self.allow_at(700))
+        self.assertTrue(self.allow_at(701))
+        self.assertFalse(self.allow_at(702))
+
+    def test_rejected_requests_are_not_counted(self):
+        for second in range(10):
+            self.allow_at(600 + second)
+
+        self.assertTrue(self.allow_at(720))
+
+
+class ThrottledApiTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store_settings = override_settings(
+            THROTTLE_STORE="station.throttling.SQLiteThrottleStore",
+            THROTTLE_SQLITE_PATH=str(Path(directory.name) / "t.sqlite3"),
+        )
+        store_settings.enable()
+        self.addCleanup(store_settings.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@user.com", password="password"
+            )
+        )
+
+    def test_user_rate_applies_through_the_store(self):
+        codes = [self.client.get(STATION_URL).status_code for _ in range(31)]
+
+        self.assertEqual(codes[:30], [status.HTTP_200_OK] * 30)
+        self.assertEqual(codes[30], status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,224 @@
+import csv
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from station.distances import haversine_km
+from station.geo import encode_geohash
+from station.models import (
+    Crew,
+    Journey,
+    JourneyInventory,
+    Order,
+    OrderSummary,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.seat_map import get_seat_map
+from station.tests.test_journey_view_set import test_station
+
+TIMETABLE = {
+    "stations": [
+        {"name": "Kharkiv", "latitude": 49.98956, "longitude": 36.2043},
+        {"name": "Kyiv", "latitude": 50.44056, "longitude": 30.48944},
+        {"name": "Lviv", "latitude": 49.83826, "longitude": 24.02324},
+    ],
+    "trains": [
+        {
+            "name": "Hyundai Rotem HRCS2",
+            "train_type": "Intercity+",
+            "cargo_num": 9,
+            "places_in_cargo": 69,
+        },
+        {
+            "name": "Skoda EJ 675",
+            "train_type": "Intercity",
+            "cargo_num": 6,
+            "places_in_cargo": 50,
+        },
+    ],
+    "crews": [
+        {"first_name": "Harry", "last_name": "Potter"},
+        {"first_name": "Ron", "last_name": "Weasley"},
+    ],
+    "routes": [{"source": "Kyiv", "destination": "Kharkiv"}],
+    "journeys": [
+        {
+            "source": "Kyiv",
+            "destination": "Lviv",
+            "train": "Hyundai Rotem HRCS2",
+            "departure_time": "2025-01-05T07:00:00+02:00",
+            "arrival_time": "2025-01-05T12:30:00+02:00",
+            "crew": ["Harry Potter", "Ron Weasley"],
+        },
+        {
+            "source": "Lviv",
+            "destination": "Kyiv",
+            "train": "Skoda EJ 675",
+            "departure_time": "2025-01-05T15:00:00+02:00",
+            "arrival_time": "2025-01-05T20:10:00+02:00",
+            "crew": ["Ron Weasley"],
+        },
+    ],
+}
+
+
+class TimetableImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_json(self, timetable) -> str:
+        path = self.path / "timetable.json"
+        path.write_text(json.dumps(timetable))
+        return str(path)
+
+    def import_timetable(self, path) -> str:
+        output = StringIO()
+        call_command("import_timetable", path, stdout=output)
+        return output.getvalue()
+
+    def snapshot(self):
+        return [
+            list(model.objects.order_by("pk").values())
+            for model in (Station, TrainType, Train, Crew, Route, Journey)
+        ] + [list(Journey.crew.through.objects.order_by("pk").values())]
+
+    def test_import_creates_timetable(self):
+        output = self.import_timetable(self.write_json(TIMETABLE))
+
+        self.assertEqual(Station.objects.count(), 3)
+        self.assertEqual(TrainType.objects.count(), 2)
+        self.assertEqual(Train.objects.count(), 2)
+        self.assertEqual(Crew.objects.count(), 2)
+        self.assertEqual(Route.objects.count(), 3)
+        self.assertEqual(Journey.objects.count(), 2)
+        self.assertEqual(JourneyInventory.objects.count(), 2)
+        journey = Journey.objects.get(route__source__name="Kyiv",
+                                      route__destination__name="Lviv")
+        self.assertEqual(
+            sorted(crew.full_name for crew in journey.crew.all()),
+            ["Harry Potter", "Ron Weasley"],
+        )
+        self.assertEqual(journey.departure_time.isoformat(),
+                         "2025-01-05T05:00:00+00:00")
+        self.assertIn("rows/s", output)
+
+    def test_import_sets_geohash_and_distances(self):
+        self.import_timetable(self.write_json(TIMETABLE))
+
+        kyiv = Station.objects.get(name="Kyiv")
+        self.assertEqual(
+            kyiv.geohash, encode_geohash(kyiv.latitude, kyiv.longitude)
+        )
+        for route in Route.objects.select_related("source", "destination"):
+            self.assertEqual(route.distance, route.calculate_distance())
+
+    def test_reimport_is_idempotent(self):
+        path = self.write_json(TIMETABLE)
+        self.import_timetable(path)
+        before = self.snapshot()
+
+        self.import_timetable(path)
+
+        self.assertEqual(self.snapshot(), before)
+
+    def test_reimport_updates_changed_rows(self):
+        self.import_timetable(self.write_json(TIMETABLE))
+        changed = json.loads(json.dumps(TIMETABLE))
+        changed["stations"][2]["latitude"] = 48.62083
+        changed["journeys"][0]["arrival_time"] = "2025-01-05T13:00:00+02:00"
+
+        self.import_timetable(self.write_json(changed))
+
+        self.assertEqual(Journey.objects.count(), 2)
+        journey = Journey.objects.get(route__destination__name="Lviv")
+        self.assertEqual(journey.arrival_time.isoformat(),
+                         "2025-01-05T11:00:00+00:00")
+        route = journey.route
+        self.assertEqual(
+            route.distance,
+            int(haversine_km(50.44056, 30.48944, 48.62083, 24.02324)),
+        )
+
+    def test_reimport_refreshes_seat_maps_and_order_history(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.import_timetable(self.write_json(TIMETABLE))
+        journey = Journey.objects.select_related("train").get(
+            route__destination__name="Lviv"
+        )
+        user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                journey=journey,
+                order=Order.objects.create(user=user),
+                cargo=1,
+                seat=1,
+            )
+        self.assertEqual(len(get_seat_map(journey)["1"]), 69)
+        changed = json.loads(json.dumps(TIMETABLE))
+        changed["trains"][0]["places_in_cargo"] = 70
+        changed["journeys"][0]["arrival_time"] = "2025-01-05T13:00:00+02:00"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.import_timetable(self.write_json(changed))
+
+        journey.refresh_from_db()
+        journey.train.refresh_from_db()
+        self.assertEqual(len(get_seat_map(journey)["1"]), 70)
+        entry = OrderSummary.objects.get().tickets[0]["journey"]
+        self.assertEqual(entry["arrival_time"], "2025-01-05T11:00:00Z")
+        self.assertEqual(entry["train_capacity"], 9 * 70)
+
+    def test_references_existing_stations(self):
+        test_station(name="Odesa", latitude=46.48572, longitude=30.74383)
+        timetable = {
+            "stations": TIMETABLE["stations"],
+            "routes": [{"source": "Odesa", "destination": "Kyiv"}],
+        }
+
+        self.import_timetable(self.write_json(timetable))
+
+        self.assertEqual(Station.objects.filter(name="Odesa").count(), 1)
+        self.assertTrue(
+            Route.objects.filter(source__name="Odesa").exists()
+        )
+
+    def test_unknown_reference_rolls_back(self):
+        timetable = json.loads(json.dumps(TIMETABLE))
+        timetable["journeys"][0]["train"] = "Missing train"
+
+        with self.assertRaisesMessage(CommandError, "Missing train"):
+            self.import_timetable(self.write_json(timetable))
+
+        self.assertEqual(Station.objects.count(), 0)
+
+    def test_csv_directory(self):
+        for section, records in TIMETABLE.items():
+            with open(self.path / f"{section}.csv", "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=list(records[0]))
+                writer.writeheader()
+                for record in records:
+                    if "crew" in record:
+                        record = {**record, "crew": ";".join(record["crew"])}
+                    writer.writerow(record)
+
+        self.import_timetable(str(self.path))
+
+        self.assertEqual(Journey.objects.count(), 2)
+        self.assertEqual(Journey.crew.through.objects.count(), 3)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.fast_serializers import (
+    JourneyListValuesSerializer,
+    RouteListValuesSerializer,
+    TrainListValuesSerializer,
+)
+from station.inventory import tickets_available_expression
+from station.models import Journey, Route, Train
+from station.serializers import (
+    JourneyListSerializer,
+    RouteListSerializer,
+    TrainListSerializer,
+)
+from station.tests.test_journey_view_set import (
+    test_journey,
+    test_station,
+    test_train,
+)
+
+ROUTE_URL = reverse("station:route-list")
+TRAIN_URL = reverse("station:train-list")
+JOURNEY_URL = reverse("station:journey-list")
+
+
+class ValuesSerializerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="admin@admin.com", password="password", is_staff=True
+            )
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            journey = test_journey()
+            lviv = test_station(name="Lviv", latitude=49.83826,
+                                longitude=24.02324)
+        route = Route.objects.create(
+            source=journey.route.destination, destination=lviv
+        )
+        Route.objects.filter(pk=route.pk).update(distance=None)
+        train = test_train(name="Skoda EJ 675", cargo_num=6,
+                           places_in_cargo=50)
+        start = timezone.now().replace(microsecond=123456)
+        for hours in range(5):
+            Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=start + timedelta(hours=hours),
+                arrival_time=start + timedelta(hours=hours, minutes=90),
+            )
+
+    def assertSameOutput(self, serializer_class, values_class, queryset):
+        expected = serializer_class(queryset, many=True).data
+        rows = values_class.select(queryset)
+
+        self.assertEqual(values_class(rows, many=True).data, expected)
+
+    def test_route_list(self):
+        self.assertSameOutput(
+            RouteListSerializer,
+            RouteListValuesSerializer,
+            Route.objects.select_related("source", "destination"),
+        )
+
+    def test_train_list(self):
+        self.assertSameOutput(
+            TrainListSerializer,
+            TrainListValuesSerializer,
+            Train.objects.select_related("train_type"),
+        )
+
+    def test_journey_list(self):
+        self.assertSameOutput(
+            JourneyListSerializer,
+            JourneyListValuesSerializer,
+            Journey.objects.select_related(
+                "route__source", "route__destination", "train"
+            ).annotate(tickets_available=tickets_available_expression()),
+        )
+
+    def get_both(self, url, params=None):
+        with override_settings(VALUES_SERIALIZERS=False):
+            expected = self.client.get(url, params)
+        with override_settings(VALUES_SERIALIZERS=True):
+            actual = self.client.get(url, params)
+        self.assertEqual(actual.status_code, status.HTTP_200_OK)
+        self.assertEqual(actual.content, expected.content)
+
+    def test_endpoints_return_same_json(self):
+        self.get_both(ROUTE_URL)
+        self.get_both(TRAIN_URL)
+        self.get_both(JOURNEY_URL)
+        self.get_both(JOURNEY_URL, {"page_size": 2})
+        self.get_both(JOURNEY_URL, {"source_name": "kyiv"})
+
+    def test_create_still_uses_model_serializer(self):
+        with override_settings(VALUES_SERIALIZERS=True):
+            res = self.client.post(
+                ROUTE_URL,
+                {"source": Route.objects.first().source_id,
+                 "destination": Route.objects.first().destination_id},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
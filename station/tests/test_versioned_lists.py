@@ -0,0 +1,167 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from station.distances import recompute_route_distances
+from station.models import ModelVersion, Route, Station, Train, TrainType
+from station.tests.test_journey_view_set import (
+    test_route,
+    test_station,
+    test_train,
+)
+from station.timetable import import_timetable
+from station.versions import bump_versions, get_versions
+
+STATION_URL = reverse("station:station-list")
+ROUTE_URL = reverse("station:route-list")
+TRAIN_URL = reverse("station:train-list")
+TRAIN_TYPE_URL = reverse("station:traintype-list")
+
+
+class ModelVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_save_and_delete_bump_version(self):
+        self.assertEqual(get_versions((Station,)), [(0, None)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            station = test_station()
+        with self.captureOnCommitCallbacks(execute=True):
+            station.delete()
+
+        [(version, changed_at)] = get_versions((Station,))
+        self.assertEqual(version, 2)
+        self.assertIsNotNone(changed_at)
+
+    def test_versions_are_cached(self):
+        get_versions((Station, Route))
+
+        with self.assertNumQueries(0):
+            get_versions((Station, Route))
+
+        ModelVersion.objects.update(version=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(Route)
+
+        self.assertEqual(
+            [version for version, _ in get_versions((Station, Route))],
+            [0, 1],
+        )
+
+    def test_bulk_paths_bump_versions(self):
+        route = test_route()
+        Station.objects.filter(id=route.source_id).update(latitude=48)
+        versions = get_versions((Route,))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recompute_route_distances()
+
+        self.assertGreater(get_versions((Route,)), versions)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_timetable({
+                "trains": [{
+                    "name": "Skoda EJ 675",
+                    "train_type": "Intercity",
+                    "cargo_num": 6,
+                    "places_in_cargo": 50,
+                }],
+            })
+
+        self.assertEqual(
+            [version for version, _ in get_versions((Train, TrainType))],
+            [1, 1],
+        )
+
+
+class VersionedListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sample@test.com", password="test_password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.route = test_route()
+            self.train = test_train()
+
+    def test_validators(self):
+        res = self.client.get(STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", res)
+        self.assertEqual(res["Cache-Control"], "private, no-cache")
+
+    def test_not_modified_without_queries(self):
+        for url in (STATION_URL, ROUTE_URL, TRAIN_URL, TRAIN_TYPE_URL):
+            etag = self.client.get(url)["ETag"]
+
+            with self.assertNumQueries(0):
+                res = self.client.get(url, headers={"If-None-Match": etag})
+
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(res["ETag"], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(ROUTE_URL)["Last-Modified"]
+
+        res = self.client.get(
+            ROUTE_URL, headers={"If-Modified-Since": last_modified}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_full_response_is_cached(self):
+        first = self.client.get(ROUTE_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(ROUTE_URL)
+
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second["Content-Type"], "application/json")
+
+    def test_change_invalidates_list(self):
+        first = self.client.get(STATION_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                STATION_URL,
+                {"name": "Odesa", "latitude": 46.48, "longitude": 30.72},
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.get(
+            STATION_URL, headers={"If-None-Match": first["ETag"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], first["ETag"])
+        self.assertIn("Odesa", [station["name"] for station in res.json()])
+
+    def test_related_model_change_invalidates_list(self):
+        for url, related in (
+            (ROUTE_URL, self.route.source),
+            (TRAIN_URL, self.train.train_type),
+        ):
+            etag = self.client.get(url)["ETag"]
+
+            with self.captureOnCommitCallbacks(execute=True):
+                related.name = "Renamed"
+                related.save()
+            res = self.client.get(url, headers={"If-None-Match": etag})
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIn(b"Renamed", res.content)
+
+    def test_etag_depends_on_query(self):
+        plain = self.client.get(STATION_URL)["ETag"]
+
+        self.assertNotEqual(
+            self.client.get(STATION_URL, {"unused": 1})["ETag"], plain
+        )
@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+
+class CacheThrottleStore:
+    """Window counters in a Django cache, shared when the cache is"""
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or settings.THROTTLE_CACHE]
+
+    def hit(self, key: str, previous_key: str, ttl: int) -> tuple[int, int]:
+        """Count a request in a window, return it with the previous one"""
+        self.cache.add(key, 0, ttl)
+        try:
+            current = self.cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr
+            self.cache.set(key, 1, ttl)
+            current = 1
+        return current, self.cache.get(previous_key, 0)
+
+    def release(self, key: str) -> None:
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+
+
+class SQLiteThrottleStore:
+    """Window counters in a SQLite file shared by the processes of a host"""
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.THROTTLE_SQLITE_PATH)
+        self.local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_counter ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, "
+                "expires REAL NOT NULL) WITHOUT ROWID"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS throttle_counter_expires "
+                "ON throttle_counter (expires)"
+            )
+            self.local.connection = connection
+        return connection
+
+    def hit(self, key: str, previous_key: str, ttl: int) -> tuple[int, int]:
+        now = time.time()
+        connection = self.connection()
+        (current,) = connection.execute(
+            "INSERT INTO throttle_counter VALUES (?, 1, ?) "
+            "ON CONFLICT (key) DO UPDATE SET count = count + 1 "
+            "RETURNING count",
+            (key, now + ttl),
+        ).fetchone()
+        previous = connection.execute(
+            "SELECT count FROM throttle_counter WHERE key = ?",
+            (previous_key,),
+        ).fetchone()
+        if current == 1:
+            # A window just started, a cheap moment to drop stale ones
+            connection.execute(
+                "DELETE FROM throttle_counter WHERE expires < ?", (now,)
+            )
+        return current, previous[0] if previous else 0
+
+    def release(self, key: str) -> None:
+        self.connection().execute(
+            "UPDATE throttle_counter SET count = count - 1 WHERE key = ?",
+            (key,),
+        )
+
+
+@lru_cache
+def _load_store(path: str):
+    return import_string(path)()
+
+
+def get_throttle_store():
+    return _load_store(settings.THROTTLE_STORE)
+
+
+@receiver(setting_changed)
+def reset_throttle_store(setting, **kwargs):
+    if setting.startswith("THROTTLE_"):
+        _load_store.cache_clear()
+
+
+class SlidingWindowThrottleMixin:
+    """Sliding window rate limit kept as two counters per client.
+
+    The request rate is estimated from the current fixed window plus the
+    part of the previous window still inside the sliding one, so a check
+    costs two counter reads and one increment however high the rate is.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        current, previous = get_throttle_store().hit(
+            current_key, f"{self.key}:{int(window) - 1}", 2 * self.duration
+        )
+        elapsed = offset / self.duration
+        if previous * (1 - elapsed) + current <= self.num_requests:
+            return True
+
+        get_throttle_store().release(current_key)
+        if current > self.num_requests or not previous:
+            self.wait_time = self.duration - offset
+        else:
+            # Until enough of the previous window has slid out
+            needed = 1 - (self.num_requests - current) / previous
+            self.wait_time = max(needed - elapsed, 0) * self.duration
+        return False
+
+    def wait(self):
+        return self.wait_time
+
+
+class SlidingAnonRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SlidingUserRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    pass
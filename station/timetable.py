@@ -0,0 +1,604 @@
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from station.distances import recompute_route_distances
+from station.geo import MAX_PRECISION, encode_geohash
+from station.models import (
+    Crew,
+    Journey,
+    JourneyInventory,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.order_history import refresh_order_summaries
+from station.planner import invalidate_timetable
+from station.search import invalidate_station_index
+from station.seat_map import invalidate_seat_maps
+from station.versions import bump_versions
+
+SECTIONS = ("stations", "trains", "crews", "routes", "journeys")
+
+
+class TimetableError(Exception):
+    pass
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    elapsed: float = 0.0
+    created: dict[str, int] = field(default_factory=dict)
+    updated: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def changed_models(self) -> list[type[models.Model]]:
+        """Versioned models the import wrote rows of"""
+        sections = {
+            Station: "stations",
+            TrainType: "train types",
+            Train: "trains",
+            Route: "routes",
+        }
+        return [
+            model for model, name in sections.items()
+            if self.created.get(name) or self.updated.get(name)
+        ]
+
+
+def read_timetable(path) -> dict[str, Iterator[dict]]:
+    """Records of a JSON document or of a directory of CSV files.
+
+    The JSON document maps section names to lists of objects; the
+    directory holds one <section>.csv per section, with journey crews
+    separated by semicolons.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return {
+            section: _read_csv(path / f"{section}.csv")
+            for section in SECTIONS
+            if (path / f"{section}.csv").exists()
+        }
+    with open(path) as document:
+        data = json.load(document)
+    return {
+        section: iter(data[section]) for section in SECTIONS if section in data
+    }
+
+
+def _read_csv(path: Path) -> Iterator[dict]:
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            if "crew" in row:
+                row["crew"] = [
+                    name.strip() for name in row["crew"].split(";")
+                    if name.strip()
+                ]
+            yield row
+
+
+def _parse_moment(value) -> datetime:
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        raise ValueError(f"invalid date/time {value!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _collect(records: Iterable[dict], section: str, key, convert) -> dict:
+    """Converted rows by natural key, the last duplicate winning"""
+    rows = {}
+    for number, record in enumerate(records, start=1):
+        try:
+            row = convert(record)
+        except (KeyError, TypeError, ValueError) as error:
+            raise TimetableError(f"{section} row {number}: {error}")
+        rows[key(row)] = row
+    return rows
+
+
+class StagingTable:
+    """Temporary table loaded with COPY on PostgreSQL.
+
+    Other backends get a batched executemany of the same rows, so the
+    set-based statements that follow run unchanged everywhere.
+    """
+
+    batch_size = 10000
+
+    def __init__(self, cursor, name: str, columns: dict[str, models.Field]):
+        self.cursor = cursor
+        self.name = name
+        self.columns = columns
+
+    def create(self) -> None:
+        definitions = ", ".join(
+            f"{column} {field.db_type(connection)}"
+            for column, field in self.columns.items()
+        )
+        self.cursor.execute(f"DROP TABLE IF EXISTS {self.name}")
+        self.cursor.execute(
+            f"CREATE TEMPORARY TABLE {self.name} ({definitions})"
+        )
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            if connection.vendor == "postgresql":
+                self.copy(batch)
+            else:
+                self.insert(batch)
+
+    def copy(self, batch: list[tuple]) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        statement = (
+            f"COPY {self.name} ({', '.join(self.columns)}) "
+            f"FROM STDIN WITH (FORMAT csv)"
+        )
+        if hasattr(self.cursor, "copy_expert"):
+            self.cursor.copy_expert(statement, buffer)
+        else:
+            with self.cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+
+    def insert(self, batch: list[tuple]) -> None:
+        fields = list(self.columns.values())
+        placeholders = ", ".join(["%s"] * len(fields))
+        self.cursor.executemany(
+            f"INSERT INTO {self.name} VALUES ({placeholders})",
+            [
+                [
+                    field.get_db_prep_value(value, connection)
+                    for field, value in zip(fields, row)
+                ]
+                for row in batch
+            ],
+        )
+
+
+def _name_field() -> models.Field:
+    return models.CharField(max_length=255)
+
+
+class TimetableImport:
+    """Upsert a timetable through staging tables and set-based SQL.
+
+    Stations, train types, trains and crews are matched by name, routes
+    by their station names and journeys by route, train and departure
+    time, so importing the same file twice changes nothing. The updates
+    bypass model signals, so journeys of resized trains and orders on
+    changed journeys are collected for the caller to refresh.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.result = ImportResult()
+        self.tables = []
+        self.resized_journey_ids: list[int] = []
+        self.changed_order_ids: list[int] = []
+        self.station = Station._meta.db_table
+        self.train_type = TrainType._meta.db_table
+        self.train = Train._meta.db_table
+        self.crew = Crew._meta.db_table
+        self.route = Route._meta.db_table
+        self.journey = Journey._meta.db_table
+        self.journey_crew = Journey.crew.through._meta.db_table
+        self.inventory = JourneyInventory._meta.db_table
+        self.ticket = Ticket._meta.db_table
+
+    def run(self, sections: dict[str, Iterable[dict]]) -> ImportResult:
+        started = time.perf_counter()
+        stations = _collect(
+            sections.get("stations", ()),
+            "stations",
+            key=lambda row: row[0],
+            convert=lambda record: (
+                record["name"],
+                float(record["latitude"]),
+                float(record["longitude"]),
+                encode_geohash(
+                    float(record["latitude"]), float(record["longitude"])
+                ),
+            ),
+        )
+        trains = _collect(
+            sections.get("trains", ()),
+            "trains",
+            key=lambda row: row[0],
+            convert=lambda record: (
+                record["name"],
+                record["train_type"],
+                int(record["cargo_num"]),
+                int(record["places_in_cargo"]),
+            ),
+        )
+        crews = _collect(
+            sections.get("crews", ()),
+            "crews",
+            key=lambda row: row,
+            convert=lambda record: (
+                record["first_name"], record["last_name"]
+            ),
+        )
+        routes = _collect(
+            sections.get("routes", ()),
+            "routes",
+            key=lambda row: row,
+            convert=lambda record: (record["source"], record["destination"]),
+        )
+        journeys = _collect(
+            sections.get("journeys", ()),
+            "journeys",
+            key=lambda row: row[:4],
+            convert=lambda record: (
+                record["source"],
+                record["destination"],
+                record["train"],
+                _parse_moment(record["departure_time"]),
+                _parse_moment(record["arrival_time"]),
+                tuple(record.get("crew") or ()),
+            ),
+        )
+        for source, destination, *_ in journeys.values():
+            routes.setdefault((source, destination), (source, destination))
+        self.result.rows = sum(
+            map(len, (stations, trains, crews, routes, journeys))
+        )
+
+        self.stage(
+            "import_station",
+            {
+                "name": _name_field(),
+                "latitude": models.FloatField(),
+                "longitude": models.FloatField(),
+                "geohash": models.CharField(max_length=MAX_PRECISION),
+            },
+            stations.values(),
+        )
+        self.stage(
+            "import_train",
+            {
+                "name": _name_field(),
+                "train_type": _name_field(),
+                "cargo_num": models.IntegerField(),
+                "places_in_cargo": models.IntegerField(),
+            },
+            trains.values(),
+        )
+        self.stage(
+            "import_crew",
+            {"first_name": _name_field(), "last_name": _name_field()},
+            crews.values(),
+        )
+        self.stage(
+            "import_route",
+            {"source": _name_field(), "destination": _name_field()},
+            routes.values(),
+        )
+        self.stage(
+            "import_journey",
+            {
+                "n": models.IntegerField(),
+                "source": _name_field(),
+                "destination": _name_field(),
+                "train": _name_field(),
+                "departure_time": models.DateTimeField(),
+                "arrival_time": models.DateTimeField(),
+            },
+            (
+                (n, *row[:5])
+                for n, row in enumerate(journeys.values())
+            ),
+        )
+        self.stage(
+            "import_journey_crew",
+            {"n": models.IntegerField(), "name": _name_field()},
+            (
+                (n, name)
+                for n, row in enumerate(journeys.values())
+                for name in set(row[5])
+            ),
+        )
+
+        self.import_stations()
+        self.import_trains()
+        self.import_crews()
+        self.import_routes()
+        self.import_journeys()
+        self.collect_changes()
+        for table in self.tables:
+            self.cursor.execute(f"DROP TABLE {table}")
+
+        self.result.elapsed = time.perf_counter() - started
+        return self.result
+
+    def stage(self, name, columns, rows) -> None:
+        table = StagingTable(self.cursor, name, columns)
+        table.create()
+        table.load(rows)
+        self.tables.append(name)
+
+    def execute(self, sql: str) -> int:
+        self.cursor.execute(sql)
+        return self.cursor.rowcount
+
+    def create_key_table(self, name: str, select: str) -> None:
+        self.cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        self.cursor.execute(f"CREATE TEMPORARY TABLE {name} AS {select}")
+        self.tables.append(name)
+
+    def select_ids(self, sql: str) -> list[int]:
+        self.cursor.execute(sql)
+        return [row_id for row_id, in self.cursor.fetchall()]
+
+    def check_resolved(self, section: str, select: str) -> None:
+        """Fail with a few examples if references did not resolve"""
+        self.cursor.execute(f"{select} LIMIT 5")
+        missing = self.cursor.fetchall()
+        if missing:
+            examples = "; ".join(
+                " / ".join(map(str, row)) for row in missing
+            )
+            raise TimetableError(f"Unknown {section}: {examples}")
+
+    def import_stations(self) -> None:
+        self.result.updated["stations"] = self.execute(f"""
+            UPDATE {self.station}
+            SET latitude = s.latitude, longitude = s.longitude,
+                geohash = s.geohash
+            FROM import_station s
+            WHERE {self.station}.name = s.name
+            AND ({self.station}.latitude <> s.latitude
+                 OR {self.station}.longitude <> s.longitude)
+        """)
+        self.result.created["stations"] = self.execute(f"""
+            INSERT INTO {self.station} (name, latitude, longitude, geohash)
+            SELECT s.name, s.latitude, s.longitude, s.geohash
+            FROM import_station s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.station} t WHERE t.name = s.name
+            )
+        """)
+        self.create_key_table("import_station_key", f"""
+            SELECT t.name, MIN(t.id) AS id
+            FROM {self.station} t
+            WHERE t.name IN (
+                SELECT name FROM import_station
+                UNION SELECT source FROM import_route
+                UNION SELECT destination FROM import_route
+            )
+            GROUP BY t.name
+        """)
+
+    def import_trains(self) -> None:
+        self.result.created["train types"] = self.execute(f"""
+            INSERT INTO {self.train_type} (name)
+            SELECT DISTINCT s.train_type
+            FROM import_train s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.train_type} t
+                WHERE t.name = s.train_type
+            )
+        """)
+        self.create_key_table("import_train_type_key", f"""
+            SELECT t.name, MIN(t.id) AS id
+            FROM {self.train_type} t
+            WHERE t.name IN (SELECT train_type FROM import_train)
+            GROUP BY t.name
+        """)
+        self.create_key_table("import_train_resized", f"""
+            SELECT t.id
+            FROM {self.train} t
+            JOIN import_train s ON s.name = t.name
+            WHERE t.cargo_num <> s.cargo_num
+            OR t.places_in_cargo <> s.places_in_cargo
+        """)
+        self.result.updated["trains"] = self.execute(f"""
+            UPDATE {self.train}
+            SET cargo_num = s.cargo_num,
+                places_in_cargo = s.places_in_cargo,
+                train_type_id = k.id
+            FROM import_train s
+            JOIN import_train_type_key k ON k.name = s.train_type
+            WHERE {self.train}.name = s.name
+            AND ({self.train}.cargo_num <> s.cargo_num
+                 OR {self.train}.places_in_cargo <> s.places_in_cargo
+                 OR {self.train}.train_type_id <> k.id)
+        """)
+        self.result.created["trains"] = self.execute(f"""
+            INSERT INTO {self.train}
+                (name, cargo_num, places_in_cargo, train_type_id)
+            SELECT s.name, s.cargo_num, s.places_in_cargo, k.id
+            FROM import_train s
+            JOIN import_train_type_key k ON k.name = s.train_type
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.train} t WHERE t.name = s.name
+            )
+        """)
+        self.create_key_table("import_train_key", f"""
+            SELECT t.name, MIN(t.id) AS id
+            FROM {self.train} t
+            WHERE t.name IN (
+                SELECT name FROM import_train
+                UNION SELECT train FROM import_journey
+            )
+            GROUP BY t.name
+        """)
+
+    def import_crews(self) -> None:
+        self.result.created["crews"] = self.execute(f"""
+            INSERT INTO {self.crew}
+                (first_name, last_name, image_status, image_variants)
+            SELECT s.first_name, s.last_name, '', '{{}}'
+            FROM import_crew s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.crew} t
+                WHERE t.first_name = s.first_name
+                AND t.last_name = s.last_name
+            )
+        """)
+        self.create_key_table("import_crew_key", f"""
+            SELECT t.first_name || ' ' || t.last_name AS name,
+                   MIN(t.id) AS id
+            FROM {self.crew} t
+            WHERE t.first_name || ' ' || t.last_name IN (
+                SELECT name FROM import_journey_crew
+            )
+            GROUP BY t.first_name, t.last_name
+        """)
+
+    def import_routes(self) -> None:
+        self.check_resolved("stations", """
+            SELECT r.source, r.destination
+            FROM import_route r
+            LEFT JOIN import_station_key a ON a.name = r.source
+            LEFT JOIN import_station_key b ON b.name = r.destination
+            WHERE a.id IS NULL OR b.id IS NULL
+        """)
+        self.result.created["routes"] = self.execute(f"""
+            INSERT INTO {self.route} (source_id, destination_id)
+            SELECT a.id, b.id
+            FROM import_route r
+            JOIN import_station_key a ON a.name = r.source
+            JOIN import_station_key b ON b.name = r.destination
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.route} t
+                WHERE t.source_id = a.id AND t.destination_id = b.id
+            )
+        """)
+        self.create_key_table("import_route_key", f"""
+            SELECT r.source, r.destination, MIN(t.id) AS id
+            FROM import_route r
+            JOIN import_station_key a ON a.name = r.source
+            JOIN import_station_key b ON b.name = r.destination
+            JOIN {self.route} t
+                ON t.source_id = a.id AND t.destination_id = b.id
+            GROUP BY r.source, r.destination
+        """)
+        self.cursor.execute("SELECT id FROM import_station_key")
+        self.result.updated["route distances"] = recompute_route_distances(
+            [station_id for station_id, in self.cursor.fetchall()]
+        )
+
+    def import_journeys(self) -> None:
+        self.check_resolved("trains", """
+            SELECT DISTINCT s.train
+            FROM import_journey s
+            LEFT JOIN import_train_key k ON k.name = s.train
+            WHERE k.id IS NULL
+        """)
+        self.check_resolved("crews", """
+            SELECT DISTINCT s.name
+            FROM import_journey_crew s
+            LEFT JOIN import_crew_key k ON k.name = s.name
+            WHERE k.id IS NULL
+        """)
+        matched = """
+            FROM import_journey s
+            JOIN import_route_key r
+                ON r.source = s.source AND r.destination = s.destination
+            JOIN import_train_key k ON k.name = s.train
+        """
+        self.create_key_table("import_journey_changed", f"""
+            SELECT t.id
+            {matched}
+            JOIN {self.journey} t
+                ON t.route_id = r.id AND t.train_id = k.id
+                AND t.departure_time = s.departure_time
+            WHERE t.arrival_time <> s.arrival_time
+        """)
+        self.result.updated["journeys"] = self.execute(f"""
+            UPDATE {self.journey}
+            SET arrival_time = s.arrival_time
+            {matched}
+            WHERE {self.journey}.route_id = r.id
+            AND {self.journey}.train_id = k.id
+            AND {self.journey}.departure_time = s.departure_time
+            AND {self.journey}.arrival_time <> s.arrival_time
+        """)
+        self.result.created["journeys"] = self.execute(f"""
+            INSERT INTO {self.journey}
+                (route_id, train_id, departure_time, arrival_time)
+            SELECT r.id, k.id, s.departure_time, s.arrival_time
+            {matched}
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.journey} t
+                WHERE t.route_id = r.id AND t.train_id = k.id
+                AND t.departure_time = s.departure_time
+            )
+        """)
+        self.create_key_table("import_journey_key", f"""
+            SELECT s.n, MIN(t.id) AS id
+            {matched}
+            JOIN {self.journey} t
+                ON t.route_id = r.id AND t.train_id = k.id
+                AND t.departure_time = s.departure_time
+            GROUP BY s.n
+        """)
+        self.execute(f"""
+            INSERT INTO {self.inventory} (journey_id, tickets_sold)
+            SELECT j.id, 0
+            FROM import_journey_key j
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.inventory} i WHERE i.journey_id = j.id
+            )
+        """)
+        self.result.created["crew assignments"] = self.execute(f"""
+            INSERT INTO {self.journey_crew} (journey_id, crew_id)
+            SELECT DISTINCT j.id, c.id
+            FROM import_journey_crew s
+            JOIN import_journey_key j ON j.n = s.n
+            JOIN import_crew_key c ON c.name = s.name
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self.journey_crew} t
+                WHERE t.journey_id = j.id AND t.crew_id = c.id
+            )
+        """)
+
+    def collect_changes(self) -> None:
+        """Journeys whose seat maps and orders whose summaries are stale"""
+        self.resized_journey_ids = self.select_ids(f"""
+            SELECT j.id
+            FROM {self.journey} j
+            JOIN import_train_resized t ON t.id = j.train_id
+        """)
+        self.changed_order_ids = self.select_ids(f"""
+            SELECT DISTINCT t.order_id
+            FROM {self.ticket} t
+            JOIN {self.journey} j ON j.id = t.journey_id
+            WHERE j.id IN (SELECT id FROM import_journey_changed)
+            OR j.train_id IN (SELECT id FROM import_train_resized)
+        """)
+
+
+def import_timetable(sections: dict[str, Iterable[dict]]) -> ImportResult:
+    """Import timetable records in one transaction"""
+    with transaction.atomic(), connection.cursor() as cursor:
+        timetable_import = TimetableImport(cursor)
+        result = timetable_import.run(sections)
+        bump_versions(*result.changed_models())
+        invalidate_seat_maps(timetable_import.resized_journey_ids)
+        refresh_order_summaries(timetable_import.changed_order_ids)
+        transaction.on_commit(invalidate_station_index)
+        transaction.on_commit(invalidate_timetable)
+    return result
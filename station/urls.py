@@ -1,6 +1,12 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from station.async_views import (
+    journey_detail,
+    journey_list,
+    journey_seat_events,
+    station_list,
+)
 from station.views import (
     StationViewSet,
     RouteViewSet,
@@ -9,6 +15,7 @@ from station.views import (
     CrewViewSet,
     JourneyViewSet,
     OrderViewSet,
+    SeatHoldViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -19,8 +26,23 @@ router.register("trains", TrainViewSet)
 router.register("crews", CrewViewSet)
 router.register("journeys", JourneyViewSet)
 router.register("orders", OrderViewSet)
+router.register("seat_holds", SeatHoldViewSet)
 
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("async/stations/", station_list, name="async-station-list"),
+    path("async/journeys/", journey_list, name="async-journey-list"),
+    path(
+        "async/journeys/<int:pk>/",
+        journey_detail,
+        name="async-journey-detail"
+    ),
+    path(
+        "async/journeys/<int:pk>/seats/",
+        journey_seat_events,
+        name="async-journey-seat-events",
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "station"
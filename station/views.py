@@ -1,13 +1,39 @@
-from django.db.models import F, Count
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from station.crew_images import save_crew_image
+from station.dates import parse_moment, start_of_day
+from station.exports import (
+    EXPORT_FORMATS,
+    CSVRenderer,
+    NDJSONRenderer,
+    aiter_chunks,
+    iter_chunks,
+    iter_ticket_rows,
+)
+from station.fast_serializers import (
+    JourneyListValuesSerializer,
+    RouteListValuesSerializer,
+    TrainListValuesSerializer,
+    ValuesListMixin,
+)
+from station.instrumentation import TimedSerializerMixin, timed_serializer
+from station.inventory import tickets_available_expression
 from station.models import (
     Station,
     Route,
@@ -15,10 +41,19 @@ from station.models import (
     Train,
     Crew,
     Journey,
-    Order
+    Order,
+    OrderSummary,
+    SeatHold,
 )
+from station.nearby import find_nearby_stations
+from station.order_history import attach_tickets_available
+from station.pagination import JourneyKeysetPagination
+from station.planner import find_itinerary, forget_journey, timetable_window
+from station.search import find_station_ids
+from station.versions import VersionedListMixin
 from station.serializers import (
     StationSerializer,
+    NearbyStationSerializer,
     RouteSerializer,
     TrainTypeSerializer,
     TrainSerializer,
@@ -29,22 +64,89 @@ from station.serializers import (
     TrainListSerializer,
     JourneyListSerializer,
     JourneyDetailSerializer,
+    JourneySeatMapSerializer,
+    ItinerarySerializer,
     OrderSerializer,
     OrderListSerializer,
     CrewImageSerializer,
+    SeatHoldSerializer,
 )
 
 
 class StationViewSet(
+    VersionedListMixin,
+    TimedSerializerMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = Station.objects.all()
     serializer_class = StationSerializer
+    version_models = (Station,)
+
+    def get_serializer_class(self):
+        if self.action == "nearby":
+            return NearbyStationSerializer
+        return StationSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "lat",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Latitude of the point (ex. ?lat=50.45)",
+            ),
+            OpenApiParameter(
+                "lon",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Longitude of the point (ex. ?lon=30.52)",
+            ),
+            OpenApiParameter(
+                "radius",
+                type=OpenApiTypes.FLOAT,
+                description="Only stations within this many km "
+                            "(ex. ?radius=25)",
+            ),
+            OpenApiParameter(
+                "k",
+                type=OpenApiTypes.INT,
+                description="Number of stations to return, 10 by default "
+                            "and at most 100 (ex. ?k=5)",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="nearby")
+    def nearby(self, request):
+        """Stations nearest to a point, closest first"""
+        params = request.query_params
+        try:
+            latitude = float(params["lat"])
+            longitude = float(params["lon"])
+            radius = float(params["radius"]) if "radius" in params else None
+            k = int(params.get("k", 10))
+        except (KeyError, ValueError):
+            raise ValidationError(
+                "lat and lon are required numbers, "
+                "radius and k must be numbers"
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError("lat or lon is out of range")
+        if radius is not None and radius < 0:
+            raise ValidationError("radius must not be negative")
+
+        stations = find_nearby_stations(
+            latitude, longitude, min(max(k, 1), 100), radius
+        )
+        serializer = self.get_serializer(stations, many=True)
+        return Response(serializer.data)
 
 
 class RouteViewSet(
+    VersionedListMixin,
+    ValuesListMixin,
+    TimedSerializerMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -52,6 +154,9 @@ class RouteViewSet(
 ):
     queryset = Route.objects.all().select_related()
     serializer_class = RouteSerializer
+    values_serializer_class = RouteListValuesSerializer
+    # Routes are listed with their station names
+    version_models = (Route, Station)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -62,21 +167,30 @@ class RouteViewSet(
 
 
 class TrainTypeViewSet(
+    VersionedListMixin,
+    TimedSerializerMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = TrainType.objects.all()
     serializer_class = TrainTypeSerializer
+    version_models = (TrainType,)
 
 
 class TrainViewSet(
+    VersionedListMixin,
+    ValuesListMixin,
+    TimedSerializerMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = Train.objects.all().select_related()
     serializer_class = TrainSerializer
+    values_serializer_class = TrainListValuesSerializer
+    # Trains are listed with their train type names
+    version_models = (Train, TrainType)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -85,6 +199,7 @@ class TrainViewSet(
 
 
 class CrewViewSet(
+    TimedSerializerMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet
@@ -98,6 +213,9 @@ class CrewViewSet(
 
         return CrewSerializer
 
+    @extend_schema(
+        responses={202: CrewImageSerializer, 200: CrewImageSerializer}
+    )
     @action(
         methods=["POST"],
         detail=True,
@@ -105,20 +223,28 @@ class CrewViewSet(
         permission_classes=[IsAdminUser],
     )
     def upload_image(self, request, pk=None):
-        """Endpoint for uploading image for exact crew"""
+        """Upload an image for the crew, resized copies follow later"""
         crew = self.get_object()
         serializer = self.get_serializer(crew, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            crew = save_crew_image(serializer)
+            return Response(
+                serializer.data,
+                status=(
+                    status.HTTP_202_ACCEPTED if crew.image
+                    else status.HTTP_200_OK
+                ),
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class JourneyViewSet(ModelViewSet):
+class JourneyViewSet(ValuesListMixin, TimedSerializerMixin, ModelViewSet):
     queryset = Journey.objects.all()
     serializer_class = JourneySerializer
+    values_serializer_class = JourneyListValuesSerializer
+    pagination_class = JourneyKeysetPagination
 
     def get_queryset(self):
         """Retrieve journeys with filters"""
@@ -127,21 +253,45 @@ class JourneyViewSet(ModelViewSet):
         route_id = self.request.query_params.get("route")
         source_name = self.request.query_params.get("source_name")
         dest_name = self.request.query_params.get("dest_name")
+        departure_after = self.request.query_params.get("departure_after")
+        departure_before = self.request.query_params.get("departure_before")
 
         if date:
-            queryset = queryset.filter(departure_time__date=date)
+            day = parse_date(date)
+            if day is None:
+                raise ValidationError({"date": "Enter a valid date."})
+            queryset = queryset.filter(
+                departure_time__gte=start_of_day(day),
+                departure_time__lt=start_of_day(
+                    day + timedelta(days=1)
+                ),
+            )
+
+        if departure_after:
+            queryset = queryset.filter(
+                departure_time__gte=parse_moment(
+                    departure_after, "departure_after"
+                )
+            )
+
+        if departure_before:
+            queryset = queryset.filter(
+                departure_time__lt=parse_moment(
+                    departure_before, "departure_before"
+                )
+            )
 
         if route_id:
             queryset = queryset.filter(route_id=route_id)
 
         if source_name:
             queryset = queryset.filter(
-                route__source__name__icontains=source_name
+                route__source_id__in=find_station_ids(source_name)
             )
 
         if dest_name:
             queryset = queryset.filter(
-                route__destination__name__icontains=dest_name
+                route__destination_id__in=find_station_ids(dest_name)
             )
 
         if self.action == "list":
@@ -150,13 +300,7 @@ class JourneyViewSet(ModelViewSet):
                     "route__source", "route__destination", "train__train_type"
                 )
                 .prefetch_related("train__train_type")
-                .annotate(
-                    tickets_available=(
-                        F("train__cargo_num") * F("train__places_in_cargo")
-                        - Count("tickets")
-                        )
-                )
-                .order_by("id")
+                .annotate(tickets_available=tickets_available_expression())
             )
 
         if self.action == "retrieve":
@@ -164,12 +308,14 @@ class JourneyViewSet(ModelViewSet):
                 "route__source", "route__destination", "train__train_type"
             ).prefetch_related("train__train_type")
 
-        return queryset.distinct()
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
             return JourneyListSerializer
         if self.action == "retrieve":
+            if self.request.query_params.get("seats") == "compact":
+                return JourneySeatMapSerializer
             return JourneyDetailSerializer
         return JourneySerializer
 
@@ -183,6 +329,22 @@ class JourneyViewSet(ModelViewSet):
                         "(ex. ?date=2022-10-23)"
                 ),
             ),
+            OpenApiParameter(
+                "departure_after",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                        "Only journeys departing at or after this moment "
+                        "(ex. ?departure_after=2022-10-23T08:00)"
+                ),
+            ),
+            OpenApiParameter(
+                "departure_before",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                        "Only journeys departing before this moment "
+                        "(ex. ?departure_before=2022-10-24)"
+                ),
+            ),
             OpenApiParameter(
                 "route",
                 type={"type": "list", "items": {"type": "number"}},
@@ -191,20 +353,140 @@ class JourneyViewSet(ModelViewSet):
             OpenApiParameter(
                 "source_name",
                 type=OpenApiTypes.STR,
-                description="Filter by route source name "
-                            "(ex. ?source_name=Kharkiv)",
+                description="Filter by route source name, tolerates "
+                            "typos (ex. ?source_name=Kharkiv)",
             ),
             OpenApiParameter(
                 "dest_name",
                 type=OpenApiTypes.STR,
-                description="Filter by route destination name "
-                            "(ex. ?dest_name=Kyiv)",
+                description="Filter by route destination name, "
+                            "tolerates typos (ex. ?dest_name=Kyiv)",
             ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "seats",
+                type=OpenApiTypes.STR,
+                enum=["compact"],
+                description=(
+                        "Return seat_map, a string of taken (1) and free "
+                        "(0) seats per cargo, instead of taken_seats "
+                        "(ex. ?seats=compact)"
+                ),
+            ),
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Departure station id (ex. ?source=1)",
+            ),
+            OpenApiParameter(
+                "destination",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Arrival station id (ex. ?destination=4)",
+            ),
+            OpenApiParameter(
+                "departure_after",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                        "Earliest departure, defaults to now and must be "
+                        "within the planned days around it "
+                        "(ex. ?departure_after=2022-10-23T08:00)"
+                ),
+            ),
+            OpenApiParameter(
+                "min_transfer",
+                type=OpenApiTypes.INT,
+                description=(
+                        "Minutes needed to change trains "
+                        "(ex. ?min_transfer=15)"
+                ),
+            ),
+        ],
+        responses=ItinerarySerializer,
+    )
+    @action(methods=["GET"], detail=False, url_path="connections")
+    def connections(self, request):
+        """Earliest arriving itinerary between two stations, with changes"""
+        params = request.query_params
+        try:
+            source_id = int(params["source"])
+            destination_id = int(params["destination"])
+            min_transfer = int(
+                params.get("min_transfer", settings.MIN_TRANSFER_MINUTES)
+            )
+        except (KeyError, ValueError):
+            raise ValidationError(
+                "source and destination station ids are required, "
+                "min_transfer must be a number of minutes"
+            )
+        departure_after = timezone.now()
+        if params.get("departure_after"):
+            departure_after = parse_moment(
+                params["departure_after"], "departure_after"
+            )
+        # Journeys outside the window are not planned with, so results
+        # there would be wrong rather than empty
+        since, until = timetable_window()
+        if not since <= departure_after < until:
+            raise ValidationError({
+                "departure_after": (
+                    f"Connections are planned from {since.isoformat()} "
+                    f"to {until.isoformat()}"
+                )
+            })
+
+        while True:
+            journey_ids = find_itinerary(
+                source_id,
+                destination_id,
+                departure_after,
+                timedelta(minutes=max(min_transfer, 0)),
+            )
+            if not journey_ids:
+                raise NotFound("No connection found")
+
+            journeys = (
+                Journey.objects.filter(id__in=journey_ids)
+                .select_related(
+                    "route__source", "route__destination", "train"
+                )
+                .annotate(tickets_available=tickets_available_expression())
+                .in_bulk()
+            )
+            missing = set(journey_ids) - set(journeys)
+            if not missing:
+                break
+            # Deleted since the timetable was loaded, plan without them
+            for journey_id in missing:
+                forget_journey(journey_id)
+        legs = [journeys[journey_id] for journey_id in journey_ids]
+        serializer = timed_serializer(
+            ItinerarySerializer(
+                {
+                    "departure_time": legs[0].departure_time,
+                    "arrival_time": legs[-1].arrival_time,
+                    "transfers": len(legs) - 1,
+                    "legs": legs,
+                },
+                context=self.get_serializer_context(),
+            )
+        )
+        return Response(serializer.data)
+
 
 class OrderSetPagination(PageNumberPagination):
     page_size = 1
@@ -213,17 +495,19 @@ class OrderSetPagination(PageNumberPagination):
 
 
 class OrderViewSet(
+    TimedSerializerMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet
 ):
-    queryset = Order.objects.prefetch_related(
-        "tickets__journey__route", "tickets__journey__train"
-    ).all()
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
     pagination_class = OrderSetPagination
 
     def get_queryset(self):
+        if self.action == "list":
+            return OrderSummary.objects.filter(user=self.request.user)
+
         return self.queryset.filter(user=self.request.user)
 
     def get_serializer_class(self):
@@ -232,5 +516,102 @@ class OrderViewSet(
 
         return OrderSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Order history is read from the precomputed summaries
+        page = self.paginate_queryset(self.get_queryset())
+        attach_tickets_available(page)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def handle_exception(self, exc):
+        if self.action == "export":
+            # The NDJSON and CSV renderers only label streamed rows, so
+            # error bodies are always sent as JSON
+            self.request.accepted_renderer = JSONRenderer()
+            self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "created_after",
+                type=OpenApiTypes.DATETIME,
+                required=True,
+                description="Orders created at or after this moment "
+                            "(ex. ?created_after=2024-05-01)",
+            ),
+            OpenApiParameter(
+                "created_before",
+                type=OpenApiTypes.DATETIME,
+                description="Orders created before this moment, "
+                            "now by default (ex. ?created_before=2024-06-01)",
+            ),
+            OpenApiParameter(
+                "format",
+                type=OpenApiTypes.STR,
+                enum=sorted(EXPORT_FORMATS),
+                description="ndjson (one order per line, by default), "
+                            "csv (one ticket per line) or json (an array "
+                            "of orders)",
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        permission_classes=[IsAdminUser],
+        renderer_classes=[NDJSONRenderer, CSVRenderer, JSONRenderer],
+    )
+    def export(self, request):
+        """Stream orders of every user with their tickets"""
+        created_after = request.query_params.get("created_after")
+        if not created_after:
+            raise ValidationError({"created_after": "This field is required."})
+        created_before = request.query_params.get("created_before")
+        rows = iter_ticket_rows(
+            parse_moment(created_after, "created_after"),
+            parse_moment(created_before, "created_before")
+            if created_before
+            else timezone.now(),
+        )
+
+        export_format = request.accepted_renderer.format
+        serialize, content_type = EXPORT_FORMATS[export_format]
+        content = iter_chunks(serialize(rows))
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_chunks(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="orders.{export_format}"'
+        )
+        return response
+
+
+class SeatHoldViewSet(
+    TimedSerializerMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+
+    def get_queryset(self):
+        return self.queryset.filter(
+            user=self.request.user, expires_at__gt=timezone.now()
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        """Accept a list of seats to hold them all at once"""
+        if isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -0,0 +1,194 @@
+import mimetypes
+import os
+import re
+from typing import Optional
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import (
+    ImproperlyConfigured,
+    SuspiciousFileOperation,
+)
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Bytes per read, and so per worker-thread hop on the ASGI path
+CHUNK_SIZE = 256 * 1024
+# Uploads get a uuid4 in their name (image_file_path), so their content
+# never changes and clients may keep them for a year
+IMMUTABLE_NAME = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}"
+)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+BYTE_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def resolve(path: str) -> str:
+    """Absolute path of a media file, 404 outside MEDIA_ROOT"""
+    try:
+        return safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Media file not found")
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def byte_range(header: Optional[str],
+               size: int) -> Optional[tuple[int, int]]:
+    """First and last byte of a single Range header, None to send it all.
+
+    Raises ValueError for a range that starts past the end of the file.
+    Malformed and multi-part ranges are ignored, which RFC 9110 allows.
+    """
+    match = BYTE_RANGE.fullmatch(header or "")
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first:
+        first = int(first)
+        if last and int(last) < first:
+            return None
+        if first >= size:
+            raise ValueError(header)
+        return first, (min(int(last), size - 1) if last else size - 1)
+    if last:
+        if int(last) == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - int(last), 0), size - 1
+    return None
+
+
+def range_applies(request, etag: str, stat: os.stat_result) -> bool:
+    """Whether If-Range, when sent, still matches the file"""
+    if_range = request.headers.get("If-Range")
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(stat.st_mtime)
+
+
+def read_chunks(path: str, start: int, length: int):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+async def aread_chunks(path: str, start: int, length: int):
+    # Reads run in the thread pool so the event loop keeps serving
+    chunks = read_chunks(path, start, length)
+    read = sync_to_async(next, thread_sensitive=False)
+    try:
+        while True:
+            chunk = await read(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def offload(path: str, name: str) -> HttpResponse:
+    """Empty response telling the front proxy which file to send"""
+    response = HttpResponse()
+    if settings.MEDIA_OFFLOAD == "x-accel-redirect":
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        )
+    elif settings.MEDIA_OFFLOAD == "x-sendfile":
+        response["X-Sendfile"] = path
+    else:
+        raise ImproperlyConfigured(
+            f"Unknown MEDIA_OFFLOAD {settings.MEDIA_OFFLOAD!r}"
+        )
+    # Proxies keep Content-Type and Cache-Control of the upstream response
+    del response["Content-Type"]
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Media file with validators, byte ranges and far-future caching.
+
+    With MEDIA_OFFLOAD the front proxy sends the file, which then also
+    answers ranges and conditional requests.
+    """
+    full_path = resolve(path)
+    if settings.MEDIA_OFFLOAD:
+        response = offload(full_path, path)
+    else:
+        try:
+            stat = os.stat(full_path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise Http404("Media file not found")
+        if not os.path.isfile(full_path):
+            raise Http404("Media file not found")
+        response = file_response(request, full_path, stat)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    if response.status_code != 304 and encoding is None:
+        response["Content-Type"] = content_type or "application/octet-stream"
+    if IMMUTABLE_NAME.search(os.path.basename(path)):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def file_response(request, path: str, stat: os.stat_result):
+    etag = file_etag(stat)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Accept-Ranges": "bytes",
+    }
+    # 304 or 412 carrying the validators, the given response otherwise
+    validators = HttpResponse(headers=headers)
+    conditional = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(stat.st_mtime),
+        response=validators,
+    )
+    if conditional is not validators:
+        return conditional
+
+    size = stat.st_size
+    try:
+        requested = (
+            byte_range(request.headers.get("Range"), size)
+            if range_applies(request, etag, stat) else None
+        )
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{size}"
+        return HttpResponse(status=416, headers=headers)
+    status = 200
+    start, length = 0, size
+    if requested is not None:
+        start, last = requested
+        status, length = 206, last - start + 1
+        headers["Content-Range"] = f"bytes {start}-{last}/{size}"
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD":
+        return HttpResponse(status=status, headers=headers)
+    chunks = (
+        aread_chunks(path, start, length)
+        if isinstance(request, ASGIRequest)
+        else read_chunks(path, start, length)
+    )
+    return StreamingHttpResponse(chunks, status=status, headers=headers)
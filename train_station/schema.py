@@ -0,0 +1,73 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+
+# File name and content type of each rendering of the schema
+SCHEMA_FORMATS = {
+    "yaml": ("schema.yaml", "application/vnd.oai.openapi"),
+    "json": ("schema.json", "application/vnd.oai.openapi+json"),
+}
+
+
+def render_schema(schema_format: str) -> bytes:
+    """Generate the OpenAPI document by introspecting every view"""
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import (
+        OpenApiJsonRenderer,
+        OpenApiYamlRenderer,
+    )
+
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    renderer = {
+        "yaml": OpenApiYamlRenderer,
+        "json": OpenApiJsonRenderer,
+    }[schema_format]()
+    return renderer.render(schema, renderer_context={})
+
+
+@lru_cache
+def load_schema(schema_format: str) -> tuple[bytes, str]:
+    """Prebuilt schema with its ETag, generated once if not built"""
+    file_name, _ = SCHEMA_FORMATS[schema_format]
+    path = Path(settings.OPENAPI_SCHEMA_DIR) / file_name
+    try:
+        content = path.read_bytes()
+    except FileNotFoundError:
+        content = render_schema(schema_format)
+    return content, f'"{hashlib.sha256(content).hexdigest()}"'
+
+
+@receiver(setting_changed)
+def reset_schema(setting, **kwargs):
+    if setting == "OPENAPI_SCHEMA_DIR":
+        load_schema.cache_clear()
+
+
+def requested_format(request) -> str:
+    schema_format = request.GET.get("format")
+    if schema_format in SCHEMA_FORMATS:
+        return schema_format
+    if "json" in request.headers.get("Accept", ""):
+        return "json"
+    return "yaml"
+
+
+@require_safe
+@condition(etag_func=lambda request: load_schema(requested_format(request))[1])
+def schema(request):
+    """OpenAPI document, answered with 304 while the ETag matches"""
+    schema_format = requested_format(request)
+    content, _ = load_schema(schema_format)
+    response = HttpResponse(
+        content, content_type=SCHEMA_FORMATS[schema_format][1]
+    )
+    patch_cache_control(response, public=True, no_cache=True)
+    patch_vary_headers(response, ["Accept"])
+    return response
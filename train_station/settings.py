@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import sys
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -27,9 +29,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.environ["DEBUG"]
+DEBUG = os.environ.get("DEBUG", "False").lower() == "true"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("ALLOWED_HOSTS", "").split(",") if host
+]
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -46,7 +50,6 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "drf_spectacular",
-    "debug_toolbar",
     "station",
     "user",
 ]
@@ -57,12 +60,13 @@ REST_FRAMEWORK = {
         "station.permissions.IsAdminOrIfAuthenticatedReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ],
+    # THROTTLING=False turns rate limits off, e.g. for the loadtest command
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
-    ],
+        "station.throttling.SlidingAnonRateThrottle",
+        "station.throttling.SlidingUserRateThrottle"
+    ] if os.environ.get("THROTTLING", "True").lower() == "true" else [],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "10/minute",
         "user": "30/minute"
@@ -71,15 +75,29 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "station.instrumentation.RequestTimingMiddleware",
 ]
 
+# Development only: the debug toolbar is neither imported nor routed in
+# production processes, nor are the Swagger and Redoc pages unless
+# API_DOCS is set
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+API_DOCS = os.environ.get("API_DOCS", str(DEBUG)).lower() == "true"
+
+# Written by the build_schema command and served as is from /api/schema/;
+# without it the schema is generated on the first request of a process
+OPENAPI_SCHEMA_DIR = os.environ.get(
+    "OPENAPI_SCHEMA_DIR", BASE_DIR / "openapi"
+)
+
 ROOT_URLCONF = "train_station.urls"
 
 TEMPLATES = [
@@ -115,6 +133,29 @@ DATABASES = {
     }
 }
 
+# A psycopg connection pool per process by default; without it, reuse
+# connections for CONN_MAX_AGE seconds and check them before each request
+DATABASE_POOL = os.environ.get("DATABASE_POOL", "True").lower() == "true"
+if DATABASE_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("CONN_MAX_AGE", 60)
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Pool usage on /health/ready/ is shown to staff only, or to every caller
+# when the health endpoints are reachable from inside the deployment only
+HEALTH_POOL_STATS = (
+    os.environ.get("HEALTH_POOL_STATS", "False").lower() == "true"
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -156,11 +197,116 @@ STATIC_URL = "static/"
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
+# Let the front proxy send media files: "x-accel-redirect" for nginx,
+# with an internal location at MEDIA_ACCEL_REDIRECT_PREFIX aliased to
+# MEDIA_ROOT, or "x-sendfile" for Apache and lighttpd. Empty streams
+# them from Django.
+MEDIA_OFFLOAD = os.environ.get("MEDIA_OFFLOAD", "").lower()
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get(
+    "MEDIA_ACCEL_REDIRECT_PREFIX", "/internal-media/"
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Station name search used by the journey filters
+STATION_SEARCH_INDEX_TTL = int(os.environ.get("STATION_SEARCH_INDEX_TTL", 60))
+STATION_SEARCH_SIMILARITY = float(
+    os.environ.get("STATION_SEARCH_SIMILARITY", 0.5)
+)
+
+# Processes rendering resized crew images; with 0 they are rendered in
+# the request thread once the upload commits
+CREW_IMAGE_WORKERS = int(os.environ.get("CREW_IMAGE_WORKERS", 2))
+
+# Larger uploads are streamed to a temporary file instead of memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(
+    os.environ.get("FILE_UPLOAD_MAX_MEMORY_SIZE", 256 * 1024)
+)
+
+# Seconds a compact journey seat map stays cached between ticket writes
+SEAT_MAP_CACHE_TIMEOUT = int(os.environ.get("SEAT_MAP_CACHE_TIMEOUT", 300))
+
+# Seconds a selected seat stays reserved for the user before checkout,
+# and seats of one journey a user may hold at a time
+SEAT_HOLD_TTL = int(os.environ.get("SEAT_HOLD_TTL", 600))
+SEAT_HOLD_LIMIT = int(os.environ.get("SEAT_HOLD_LIMIT", 10))
+
+# Journey planner: timetable reload interval and default change time
+TIMETABLE_TTL = int(os.environ.get("TIMETABLE_TTL", 300))
+MIN_TRANSFER_MINUTES = int(os.environ.get("MIN_TRANSFER_MINUTES", 10))
+# Days of journeys the planner keeps, departed ones and upcoming ones
+TIMETABLE_PAST_DAYS = int(os.environ.get("TIMETABLE_PAST_DAYS", 1))
+TIMETABLE_FUTURE_DAYS = int(os.environ.get("TIMETABLE_FUTURE_DAYS", 60))
+
+# Serve journey, route and train lists from .values() rows instead of
+# model instances and DRF serializers
+VALUES_SERIALIZERS = (
+    os.environ.get("VALUES_SERIALIZERS", "True").lower() == "true"
+)
+
+# Live seat events per journey: seconds between keep-alive comments,
+# changes a subscriber may fall behind before it is dropped, and seconds
+# before reconnecting the PostgreSQL listener
+SEAT_EVENTS_HEARTBEAT = float(os.environ.get("SEAT_EVENTS_HEARTBEAT", 15))
+SEAT_EVENTS_QUEUE_SIZE = int(os.environ.get("SEAT_EVENTS_QUEUE_SIZE", 100))
+SEAT_EVENTS_RECONNECT = float(os.environ.get("SEAT_EVENTS_RECONNECT", 2))
+
+# Station, train type, train and route lists answer with ETags from
+# per-model version counters: seconds a process may reuse a version
+# before reading it again, and seconds a rendered list stays cached
+MODEL_VERSION_TTL = int(os.environ.get("MODEL_VERSION_TTL", 5))
+VERSIONED_LIST_CACHE_TIMEOUT = int(
+    os.environ.get("VERSIONED_LIST_CACHE_TIMEOUT", 3600)
+)
+
+# Where throttle counters live: the cache (shared with a shared CACHES
+# backend) or station.throttling.SQLiteThrottleStore for a single host
+THROTTLE_STORE = os.environ.get(
+    "THROTTLE_STORE", "station.throttling.CacheThrottleStore"
+)
+THROTTLE_CACHE = os.environ.get("THROTTLE_CACHE", "default")
+THROTTLE_SQLITE_PATH = os.environ.get(
+    "THROTTLE_SQLITE_PATH",
+    os.path.join(tempfile.gettempdir(), "train_station_throttle.sqlite3"),
+)
+
+# Query count, database, serializer and view time of every request in a
+# Server-Timing header, and as a JSON log line for a sample of requests
+# (none while running the tests, to keep them out of the test output)
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "True").lower() == "true"
+REQUEST_LOG_SAMPLE_RATE = float(
+    os.environ.get(
+        "REQUEST_LOG_SAMPLE_RATE", 0 if sys.argv[1:2] == ["test"] else 0.01
+    )
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "requests": {
+            "class": "logging.StreamHandler",
+            "formatter": "message",
+        },
+    },
+    "loggers": {
+        "station.requests": {
+            "handlers": ["requests"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# Seconds an authenticated user is served from the cache
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
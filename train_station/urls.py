@@ -14,30 +14,57 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+from urllib.parse import urlsplit
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView
-)
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from django.urls import path, include, re_path
+
+from train_station.media import serve_media
+from train_station.schema import schema
+from train_station.views import live, ready
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/station/", include("station.urls", namespace="station")),
     path("api/user/", include("user.urls", namespace="user")),
-    path("__debug__/", include("debug_toolbar.urls")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-      "api/doc/swagger/",
-      SpectacularSwaggerView.as_view(url_name="schema"),
-      name="swagger-ui",
-    ),
-    path(
-      "api/doc/redoc/",
-      SpectacularRedocView.as_view(url_name="schema"),
-      name="redoc",
-    ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path("health/live/", live, name="health-live"),
+    path("health/ready/", ready, name="health-ready"),
+    path("api/schema/", schema, name="schema"),
+]
+
+# Media on another host (a CDN or bucket) is not routed here
+if not urlsplit(settings.MEDIA_URL).netloc:
+    urlpatterns.append(re_path(
+        rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$",
+        serve_media,
+        name="media",
+    ))
+
+# Development tools are only imported when enabled
+if settings.API_DOCS:
+    from drf_spectacular.views import (
+        SpectacularSwaggerView,
+        SpectacularRedocView
+    )
+
+    urlpatterns += [
+        path(
+          "api/doc/swagger/",
+          SpectacularSwaggerView.as_view(url_name="schema"),
+          name="swagger-ui",
+        ),
+        path(
+          "api/doc/redoc/",
+          SpectacularRedocView.as_view(url_name="schema"),
+          name="redoc",
+        ),
+    ]
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
+
+# runserver serves static files by itself, ASGI servers do not
+urlpatterns += staticfiles_urlpatterns()
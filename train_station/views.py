@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import OperationalError
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from user.authentication import CachedJWTAuthentication
+
+
+def pool_stats(connection):
+    """Usage of the connection pool, None without pooling"""
+    pool = getattr(connection, "pool", None)
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    idle = stats.get("pool_available", 0)
+    return {
+        "min_size": stats.get("pool_min", 0),
+        "max_size": stats.get("pool_max", 0),
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": stats.get("requests_num", 0),
+        "wait_ms": stats.get("requests_wait_ms", 0),
+        "timeouts": stats.get("requests_errors", 0),
+    }
+
+
+def shows_pool_stats(request) -> bool:
+    """Pool usage is for staff, unless HEALTH_POOL_STATS shows it to all"""
+    if settings.HEALTH_POOL_STATS:
+        return True
+    try:
+        authenticated = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].is_staff
+
+
+def live(request):
+    """The process answers requests"""
+    return JsonResponse({"status": "ok"})
+
+
+def ready(request):
+    """The database answers queries, with pool usage for staff"""
+    connection = connections[DEFAULT_DB_ALIAS]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except OperationalError:
+        return JsonResponse({"status": "unavailable"}, status=503)
+
+    data = {"status": "ok"}
+    stats = pool_stats(connection)
+    if stats is not None and shows_pool_stats(request):
+        data["pool"] = stats
+    return JsonResponse(data)
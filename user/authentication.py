@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+
+# What permission checks read from request.user; the rest of the row,
+# password hash included, stays out of the cache
+CACHED_USER_FIELDS = ("id", "is_active", "is_staff", "is_superuser")
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth-user:{user_id}"
+
+
+def invalidate_cached_user(user_id) -> None:
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that keeps resolved users in the cache.
+
+    Only CACHED_USER_FIELDS are cached and request.user is rebuilt from
+    them, so views needing the rest of the row load it themselves.
+    Saving, updating or deleting a user drops its entry; USER_CACHE_TTL
+    bounds how long other processes may serve a stale copy with a
+    per-process cache. Checking revoke tokens needs the password hash,
+    so the cache is bypassed when CHECK_REVOKE_TOKEN is set.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        fields = cache.get(user_cache_key(user_id))
+        if fields is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                user_cache_key(user_id),
+                {field: getattr(user, field) for field in CACHED_USER_FIELDS},
+                settings.USER_CACHE_TTL,
+            )
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not fields["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        user = get_user_model()(**fields)
+        user._state.adding = False
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the same bearer JWT scheme"""
+
+    target_class = "user.authentication.CachedJWTAuthentication"
@@ -2,15 +2,36 @@ from django.contrib.auth.models import (
     AbstractUser,
     BaseUserManager,
 )
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext as _
 
+from user.authentication import invalidate_cached_user
+
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """Drop the cached users as well, update() sends no signals"""
+        user_ids = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+
+        def invalidate():
+            for user_id in user_ids:
+                invalidate_cached_user(user_id)
+
+        invalidate()
+        # A request may cache the old row again before the change commits
+        transaction.on_commit(invalidate)
+        return rows
+
 
 class UserManager(BaseUserManager):
     """Define a model manager for User model with no username field."""
 
     use_in_migrations = True
 
+    def get_queryset(self):
+        return UserQuerySet(self.model, using=self._db)
+
     def _create_user(self, email, password, **extra_fields):
         """Create and save a User with the given email and password."""
         if not email:
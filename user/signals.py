@@ -0,0 +1,14 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import invalidate_cached_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    # A request may cache the old row again before the change commits
+    transaction.on_commit(lambda: invalidate_cached_user(instance.pk))
@@ -0,0 +1,115 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import CACHED_USER_FIELDS, user_cache_key
+
+STATION_URL = reverse("station:station-list")
+ME_URL = reverse("user:manage")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_is_loaded_once(self):
+        # The station list reads its version and rows once, then both
+        # come from the cache as well
+        with self.assertNumQueries(3):
+            first = self.client.get(STATION_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(STATION_URL)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(STATION_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_deactivated_user_is_rejected(self):
+        self.client.get(STATION_URL)
+
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        res = self.client.get(STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(STATION_URL)
+
+        self.assertEqual(
+            set(cache.get(user_cache_key(self.user.pk))),
+            set(CACHED_USER_FIELDS),
+        )
+
+    def test_password_change_drops_cached_user(self):
+        self.client.get(STATION_URL)
+
+        self.user.set_password("new-password")
+        self.user.save()
+
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_revoked_token_is_rejected(self):
+        with mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True):
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+            )
+            first = self.client.get(STATION_URL)
+            self.user.set_password("new-password")
+            self.user.save()
+            second = self.client.get(STATION_URL)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(STATION_URL)
+
+        self.user.delete()
+        res = self.client.get(STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_promoted_user_gets_staff_access(self):
+        self.client.get(STATION_URL)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.post(
+            STATION_URL,
+            {"name": "Lviv", "latitude": 49.83826, "longitude": 24.02324},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_profile_update_drops_cached_user(self):
+        self.client.get(STATION_URL)
+
+        self.client.patch(ME_URL, {"password": "new-password"})
+
+        # Only the user is read again, the station list is cached
+        with self.assertNumQueries(1):
+            self.client.get(STATION_URL)